@@ -0,0 +1,36 @@
+"""login throttle buckets
+
+Revision ID: 3f6b2a9d1c84
+Revises: 8ac724215843
+Create Date: 2026-10-19 17:42:10.215306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6b2a9d1c84'
+down_revision: Union[str, None] = '8ac724215843'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('login_throttle_buckets',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('allowed', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index(op.f('ix_login_throttle_buckets_updated_at'), 'login_throttle_buckets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_login_throttle_buckets_updated_at'), table_name='login_throttle_buckets')
+    op.drop_table('login_throttle_buckets')
@@ -0,0 +1,106 @@
+"""partition refresh_tokens by expires_at
+
+Revision ID: a7d3e5f19b20
+Revises: 3f6b2a9d1c84
+Create Date: 2026-10-19 19:12:47.603518
+
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e5f19b20'
+down_revision: Union[str, None] = '3f6b2a9d1c84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_COLUMNS = "id, user_id, jti, device_name, ip_address, user_agent, issued_at, last_used_at, expires_at"
+
+
+def _week_start(moment: datetime) -> datetime:
+    day = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.rename_table('refresh_tokens', 'refresh_tokens_unpartitioned')
+    op.drop_index('ix_refresh_tokens_jti', table_name='refresh_tokens_unpartitioned')
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens_unpartitioned')
+    op.execute("ALTER TABLE refresh_tokens_unpartitioned RENAME CONSTRAINT refresh_tokens_pkey TO refresh_tokens_unpartitioned_pkey")
+    op.execute("ALTER TABLE refresh_tokens_unpartitioned RENAME CONSTRAINT refresh_tokens_user_id_fkey TO refresh_tokens_unpartitioned_user_id_fkey")
+
+    op.execute("""
+        CREATE TABLE refresh_tokens (
+            id INTEGER NOT NULL DEFAULT nextval('refresh_tokens_id_seq'),
+            user_id VARCHAR(26) NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            jti VARCHAR(26) NOT NULL,
+            device_name VARCHAR,
+            ip_address VARCHAR,
+            user_agent VARCHAR,
+            issued_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            last_used_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            CONSTRAINT refresh_tokens_pkey PRIMARY KEY (id, expires_at),
+            CONSTRAINT uq_refresh_tokens_jti_expires_at UNIQUE (jti, expires_at)
+        ) PARTITION BY RANGE (expires_at)
+    """)
+    op.execute("ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id")
+    op.create_index(op.f('ix_refresh_tokens_jti'), 'refresh_tokens', ['jti'], unique=False)
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
+
+    # Недельные секции от текущей недели до самого позднего из живых
+    # токенов; дальнейшие создаёт app.commands.maintain_refresh_tokens
+    now = datetime.now(timezone.utc)
+    latest = op.get_bind().execute(sa.text(
+        "SELECT max(expires_at) FROM refresh_tokens_unpartitioned"
+    )).scalar()
+    horizon = max(latest or now, now + timedelta(weeks=6))
+    start = _week_start(now)
+    while start <= horizon:
+        end = start + timedelta(days=7)
+        op.execute(
+            f"CREATE TABLE refresh_tokens_p{start:%Y%m%d} PARTITION OF refresh_tokens "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    op.execute(f"""
+        INSERT INTO refresh_tokens ({_COLUMNS})
+        SELECT {_COLUMNS} FROM refresh_tokens_unpartitioned
+        WHERE expires_at >= '{_week_start(now).isoformat()}'
+    """)
+    op.drop_table('refresh_tokens_unpartitioned')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.rename_table('refresh_tokens', 'refresh_tokens_partitioned')
+    op.execute("ALTER TABLE refresh_tokens_partitioned RENAME CONSTRAINT refresh_tokens_pkey TO refresh_tokens_partitioned_pkey")
+    op.drop_index('ix_refresh_tokens_jti', table_name='refresh_tokens_partitioned')
+    op.drop_index('ix_refresh_tokens_user_id', table_name='refresh_tokens_partitioned')
+    op.create_table('refresh_tokens',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('refresh_tokens_id_seq')"), nullable=False),
+    sa.Column('user_id', sa.String(length=26), nullable=False),
+    sa.Column('jti', sa.String(length=26), nullable=False),
+    sa.Column('device_name', sa.String(), nullable=True),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.Column('issued_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_used_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("ALTER SEQUENCE refresh_tokens_id_seq OWNED BY refresh_tokens.id")
+    op.execute(f"""
+        INSERT INTO refresh_tokens ({_COLUMNS})
+        SELECT {_COLUMNS} FROM refresh_tokens_partitioned
+    """)
+    op.drop_table('refresh_tokens_partitioned')
+    op.create_index(op.f('ix_refresh_tokens_jti'), 'refresh_tokens', ['jti'], unique=True)
+    op.create_index(op.f('ix_refresh_tokens_user_id'), 'refresh_tokens', ['user_id'], unique=False)
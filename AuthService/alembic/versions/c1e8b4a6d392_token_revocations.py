@@ -0,0 +1,38 @@
+"""token revocations
+
+Revision ID: c1e8b4a6d392
+Revises: a7d3e5f19b20
+Create Date: 2026-10-19 20:31:05.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1e8b4a6d392'
+down_revision: Union[str, None] = 'a7d3e5f19b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('token_revocations',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('jti', sa.String(length=26), nullable=True),
+    sa.Column('user_id', sa.String(length=26), nullable=True),
+    sa.Column('revoked_before', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_token_revocations_expires_at'), 'token_revocations', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_token_revocations_expires_at'), table_name='token_revocations')
+    op.drop_table('token_revocations')
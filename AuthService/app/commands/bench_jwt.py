@@ -0,0 +1,61 @@
+"""
+Sign/verify throughput of the supported token algorithms.
+
+    python -m app.commands.bench_jwt [--seconds 1.0]
+
+Uses throwaway keys and a payload shaped like a refresh token, so the
+numbers can be compared before switching ALGORITHM. Needs no settings.
+"""
+import argparse
+import time
+
+from app.services import jws
+
+_PAYLOAD = {
+    "iss": "project-auth-service",
+    "sub": "01HZX3J6Q3R8W2Y5K7M9N1P4T6",
+    "aud": "namity_refresh",
+    "jti": "01HZX3J6Q3R8W2Y5K7M9N1P4T7",
+    "exp": 2_000_000_000,
+}
+
+
+def _rate(fn, seconds: float) -> float:
+    fn()
+    calls = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(10):
+            fn()
+        calls += 10
+    return calls / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=1.0, help="time per measurement")
+    parser.add_argument("--algorithm", choices=jws.ALGORITHMS, action="append",
+                        help="algorithm to measure (repeatable, default: all)")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10} {'sign/s':>10} {'verify/s':>10} {'sign µs':>9} {'verify µs':>10} {'token bytes':>12}")
+    for algorithm in args.algorithm or jws.ALGORITHMS:
+        private_key = jws.generate_private_key(algorithm)
+        public_key = private_key.public_key()
+        signer = jws.SigningKey(private_key, algorithm, kid="bench")
+        token = signer.sign(_PAYLOAD)
+        _, _, signing_input, signature = jws.split(token)
+
+        signs = _rate(lambda: signer.sign(_PAYLOAD), args.seconds)
+        verifies = _rate(
+            lambda: jws.verify_signature(public_key, algorithm, signing_input, signature), args.seconds
+        )
+        print(
+            f"{algorithm:<10} {signs:>10.0f} {verifies:>10.0f} "
+            f"{1e6 / signs:>9.1f} {1e6 / verifies:>10.1f} {len(token):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Stream all users out, in the format import_users reads.
+
+    python -m app.commands.export_users users.csv
+    python -m app.commands.export_users - --format ndjson > users.ndjson
+
+The output holds password hashes; the file is created readable by its
+owner only.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+from app.services.user_transfer_service import export_users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export users to CSV or NDJSON")
+    parser.add_argument("path", help="output file, '-' for stdout")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None,
+                        help="output format, by default taken from the file extension")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    if args.path == "-":
+        count = asyncio.run(export_users(sys.stdout.buffer, fmt))
+    else:
+        fd = os.open(args.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as stream:
+            count = asyncio.run(export_users(stream, fmt))
+    logging.info("exported %d users", count)
+
+
+if __name__ == "__main__":
+    main()
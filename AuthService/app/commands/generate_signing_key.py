@@ -0,0 +1,53 @@
+"""
+Generate a token signing key pair.
+
+    python -m app.commands.generate_signing_key --algorithm EdDSA --out-dir secrets/next
+
+Writes `private.pem` (PKCS#8, readable by the owner only) and
+`public.pem` (SubjectPublicKeyInfo). Point PRIVATE_KEY_PATH and
+PUBLIC_KEY_PATH at them and set ALGORITHM to the same value; see
+app/services/jwks_service.py for rotating without logging users out.
+"""
+import argparse
+import os
+from pathlib import Path
+
+from cryptography.hazmat.primitives import serialization
+
+from app.services.jws import ALGORITHMS, generate_private_key
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="EdDSA")
+    parser.add_argument("--out-dir", default="secrets")
+    parser.add_argument("--force", action="store_true", help="overwrite existing key files")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out_dir)
+    private_path = out_dir / "private.pem"
+    public_path = out_dir / "public.pem"
+    if not args.force and (private_path.exists() or public_path.exists()):
+        raise SystemExit(f"{out_dir} already has a key pair, pass --force to replace it")
+
+    private_key = generate_private_key(args.algorithm)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(private_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(private_pem)
+    public_path.write_bytes(public_pem)
+    print(f"{args.algorithm} key pair written to {private_path} and {public_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Bulk-load users exported from another system.
+
+    python -m app.commands.import_users users.csv
+    python -m app.commands.import_users users.ndjson --update-existing
+    cat users.ndjson | python -m app.commands.import_users - --format ndjson
+
+Rows need `email` and `hashed_password` (bcrypt `$2a$/$2b$/$2y$`, or
+argon2 when argon2-cffi is installed); `id` (ULID) and `created_at`
+(ISO 8601) are optional. A line that is not valid JSON is rejected on
+its own. Existing emails are skipped unless --update-existing is given.
+Rejected rows are reported with their line numbers and are not loaded.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from app.services.user_transfer_service import import_users
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import users from CSV or NDJSON")
+    parser.add_argument("path", help="input file, '-' for stdin")
+    parser.add_argument("--format", choices=("csv", "ndjson"), default=None,
+                        help="input format, by default taken from the file extension")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--update-existing", action="store_true",
+                        help="replace password hashes of users that already exist")
+    parser.add_argument("--rejects", default=None, help="write rejected rows to this NDJSON file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    if args.path == "-":
+        report = asyncio.run(import_users(sys.stdin, fmt, args.batch_size, args.update_existing))
+    else:
+        with open(args.path, newline="", encoding="utf-8") as stream:
+            report = asyncio.run(import_users(stream, fmt, args.batch_size, args.update_existing))
+
+    if args.rejects and report.rejects:
+        with open(args.rejects, "w", encoding="utf-8") as out:
+            for reject in report.rejects:
+                out.write(json.dumps(reject, ensure_ascii=False) + "\n")
+    for reject in report.rejects[:20]:
+        logging.warning("line %d (%s): %s", reject["line"], reject["email"], reject["reason"])
+    logging.info(
+        "read %d, rejected %d, written %d",
+        report.read, report.rejected, report.written
+    )
+    if report.rejected:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
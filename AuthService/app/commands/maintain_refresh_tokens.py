@@ -0,0 +1,23 @@
+"""
+Create upcoming refresh_tokens partitions, drop fully expired ones and
+purge expired token revocations.
+
+    python -m app.commands.maintain_refresh_tokens
+
+The service runs the same job at startup and every
+REFRESH_TOKEN_MAINTENANCE_INTERVAL_SECONDS; use this from cron when it
+is scaled to zero or to check the result by hand.
+"""
+import asyncio
+import logging
+
+from app.services.token_maintenance_service import maintain_refresh_tokens
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(maintain_refresh_tokens())
+
+
+if __name__ == "__main__":
+    main()
@@ -13,11 +13,42 @@ class Settings(BaseSettings):
 
     PRIVATE_KEY_PATH: str = Field(..., env="PRIVATE_KEY_PATH")
     PUBLIC_KEY_PATH: str = Field(..., env="PUBLIC_KEY_PATH")
+    ADDITIONAL_PUBLIC_KEY_PATHS: list[str] = Field([], env="ADDITIONAL_PUBLIC_KEY_PATHS")
+    JWKS_MAX_AGE_SECONDS: int = Field(300, env="JWKS_MAX_AGE_SECONDS")
 
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(..., env="ACCESS_TOKEN_EXPIRE_MINUTES")
     REFRESH_TOKEN_EXPIRE_DAYS: int = Field(..., env="REFRESH_TOKEN_EXPIRE_DAYS")
+    USER_CACHE_TTL_SECONDS: int = Field(30, env="USER_CACHE_TTL_SECONDS")
+    USER_CACHE_SIZE: int = Field(10_000, env="USER_CACHE_SIZE")
+    REVOCATION_SYNC_SECONDS: int = Field(2, env="REVOCATION_SYNC_SECONDS")
+    REVOCATION_FEED_LAG_SECONDS: int = Field(5, env="REVOCATION_FEED_LAG_SECONDS")
+    # Общий секрет сервисов для /internal/*; не задан — эндпоинты закрыты
+    INTERNAL_API_TOKEN: SecretStr | None = Field(None, env="INTERNAL_API_TOKEN")
+    REFRESH_TOKEN_MAINTENANCE_INTERVAL_SECONDS: int = Field(6 * 3600, env="REFRESH_TOKEN_MAINTENANCE_INTERVAL_SECONDS")
     ALGORITHM: str = Field(..., env="ALGORITHM")
     ISSUER: str = Field(..., env="ISSUER")
+
+    PASSWORD_HASH_WORKERS: int = Field(2, env="PASSWORD_HASH_WORKERS")
+    PASSWORD_HASH_MAX_WAIT_MS: int = Field(1000, env="PASSWORD_HASH_MAX_WAIT_MS")
+    PASSWORD_HASH_MAX_QUEUE: int = Field(64, env="PASSWORD_HASH_MAX_QUEUE")
+    PASSWORD_HASH_SCHEME: str = Field("bcrypt", env="PASSWORD_HASH_SCHEME")
+    PASSWORD_HASH_TARGET_MS: int = Field(250, env="PASSWORD_HASH_TARGET_MS")
+    BCRYPT_MIN_ROUNDS: int = Field(10, env="BCRYPT_MIN_ROUNDS")
+    BCRYPT_MAX_ROUNDS: int = Field(15, env="BCRYPT_MAX_ROUNDS")
+    ARGON2_MIN_TIME_COST: int = Field(2, env="ARGON2_MIN_TIME_COST")
+    ARGON2_MEMORY_COST_KIB: int = Field(65536, env="ARGON2_MEMORY_COST_KIB")
+    ARGON2_PARALLELISM: int = Field(1, env="ARGON2_PARALLELISM")
+
+    LOGIN_THROTTLE_BACKEND: str = Field("memory", env="LOGIN_THROTTLE_BACKEND")
+    LOGIN_IP_BURST: int = Field(20, env="LOGIN_IP_BURST")
+    LOGIN_IP_PER_MINUTE: float = Field(10, env="LOGIN_IP_PER_MINUTE")
+    LOGIN_EMAIL_BURST: int = Field(5, env="LOGIN_EMAIL_BURST")
+    LOGIN_EMAIL_PER_MINUTE: float = Field(1, env="LOGIN_EMAIL_PER_MINUTE")
+    LOGIN_THROTTLE_MAX_KEYS: int = Field(100_000, env="LOGIN_THROTTLE_MAX_KEYS")
+    LOGIN_THROTTLE_PURGE_INTERVAL_SECONDS: int = Field(300, env="LOGIN_THROTTLE_PURGE_INTERVAL_SECONDS")
+    # X-Real-IP берётся только от прокси из TRUSTED_PROXIES (адреса или подсети)
+    TRUST_X_REAL_IP: bool = Field(False, env="TRUST_X_REAL_IP")
+    TRUSTED_PROXIES: list[str] = Field([], env="TRUSTED_PROXIES")
     
     @property
     def PRIVATE_KEY(self) -> str:
@@ -1,23 +1,44 @@
-from fastapi import Depends, HTTPException, status, Cookie
+import hmac
+
+from fastapi import Depends, HTTPException, status, Cookie, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.jwt_service import verify_access_token
+from app.services.revocation_service import revocations
+from app.services.user_cache import UserSnapshot, user_cache
 from app.database import session_dependency
+from app.config import settings
 from app import models
 
 async def get_current_user(
     db: session_dependency,
     access_token: str = Cookie(None)
-):
+) -> UserSnapshot:
     if not access_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing access token cookie")
     try:
         payload = verify_access_token(access_token)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
-    user = await db.get(models.User, payload.get("sub"))
+    if revocations.is_revoked(payload):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has been revoked")
+    user_id = payload.get("sub")
+
+    async def load() -> UserSnapshot | None:
+        user = await db.get(models.User, user_id)
+        return UserSnapshot(id=user.id, email=user.email, created_at=user.created_at) if user else None
+
+    user = await user_cache.get(user_id, load)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
 
-
+async def require_internal_token(x_internal_token: str = Header(None)) -> None:
+    """
+    Lets through only other services that present INTERNAL_API_TOKEN.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if expected is None or not x_internal_token or not hmac.compare_digest(
+        x_internal_token.encode("utf-8"), expected.get_secret_value().encode("utf-8")
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token")
@@ -1,11 +1,20 @@
+import asyncio
+
 import uvicorn
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.routers.auth import router as auth_router
+from app.routers.metrics import router as metrics_router
+from app.routers.jwks import router as jwks_router
+from app.routers.revocations import router as revocations_router
 from app.dependencies import get_current_user
 from app.schemas import UserRead
+from app.services.password_service import hashing_pool, calibrate_password_hashing
+from app.services.throttle_service import run_throttle_purge_loop
+from app.services.token_maintenance_service import run_token_maintenance_loop
+from app.services.revocation_service import run_revocation_sync_loop
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -24,6 +33,9 @@ app.add_middleware(
 
 #Роутер
 app.include_router(auth_router)
+app.include_router(metrics_router)
+app.include_router(jwks_router)
+app.include_router(revocations_router)
 
 #Защищенный маршрут для получения информации о текущем пользователе
 @app.get("/me", response_model=UserRead, tags=["auth"])
@@ -33,5 +45,23 @@ async def read_current_user(
     return current_user
 
 
+@app.on_event("startup")
+async def startup():
+    await calibrate_password_hashing()
+    app.state.token_maintenance_task = asyncio.create_task(run_token_maintenance_loop())
+    app.state.revocation_sync_task = asyncio.create_task(run_revocation_sync_loop())
+    if settings.LOGIN_THROTTLE_BACKEND == "postgres":
+        app.state.throttle_purge_task = asyncio.create_task(run_throttle_purge_loop())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for name in ("throttle_purge_task", "token_maintenance_task", "revocation_sync_task"):
+        task = getattr(app.state, name, None)
+        if task:
+            task.cancel()
+    hashing_pool.shutdown()
+
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,5 @@
 import ulid
-from sqlalchemy import String, Integer, DateTime, ForeignKey, func
+from sqlalchemy import String, Integer, BigInteger, Float, Boolean, DateTime, ForeignKey, Sequence, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -33,8 +33,15 @@ class User(Base):
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    # Секционирована по expires_at (см. token_maintenance_service),
+    # поэтому expires_at входит в первичный ключ и в уникальность jti
+    __table_args__ = (
+        UniqueConstraint("jti", "expires_at", name="uq_refresh_tokens_jti_expires_at"),
+        {"postgresql_partition_by": "RANGE (expires_at)"},
+    )
     id: Mapped[int] = mapped_column(
         Integer,
+        Sequence("refresh_tokens_id_seq"),
         primary_key=True
     )
     user_id: Mapped[str] = mapped_column(
@@ -44,7 +51,6 @@ class RefreshToken(Base):
     )
     jti: Mapped[str] = mapped_column(
         String(26),
-        unique=True,
         index=True,
         default=lambda: ulid.new().str
     )
@@ -71,6 +77,62 @@ class RefreshToken(Base):
     )
     expires_at: Mapped[DateTime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True
+    )
+
+
+class LoginThrottleBucket(Base):
+    __tablename__ = "login_throttle_buckets"
+    key: Mapped[str] = mapped_column(
+        String,
+        primary_key=True
+    )
+    tokens: Mapped[float] = mapped_column(
+        Float,
+        nullable=False
+    )
+    allowed: Mapped[bool] = mapped_column(
+        Boolean,
         nullable=False
     )
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+        index=True
+    )
 
+
+class TokenRevocation(Base):
+    """
+    Either one revoked access token (`jti`) or every token of a user
+    issued before `revoked_before`. Kept until `expires_at`, when the
+    tokens it covers have expired on their own.
+    """
+    __tablename__ = "token_revocations"
+    id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True
+    )
+    jti: Mapped[str] = mapped_column(
+        String(26),
+        nullable=True
+    )
+    user_id: Mapped[str] = mapped_column(
+        String(26),
+        nullable=True
+    )
+    revoked_before: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True
+    )
+    expires_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        index=True
+    )
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
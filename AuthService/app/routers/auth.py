@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Cookie
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.dependencies import get_current_user
@@ -6,8 +6,10 @@ from app.services.auth_service import (
     register_user_service,
     authenticate_user_service,
     refresh_tokens_service,
+    logout_service,
     change_password_service
 )
+from app.services.throttle_service import client_ip, throttle_login
 from app.schemas import (
     UserCreate,
     UserRead,
@@ -36,6 +38,7 @@ async def register(
 
 @router.post("/login", status_code=status.HTTP_200_OK)
 async def login(
+    request: Request,
     response: Response,
     form_data: TokenRequest,
     db: session_dependency,
@@ -43,6 +46,7 @@ async def login(
     """
     Authenticate user and set auth cookies.
     """
+    await throttle_login(client_ip(request), form_data.email, db)
     tokens = await authenticate_user_service(form_data, db)
 
     response.set_cookie(
@@ -105,13 +109,13 @@ async def refresh(
 async def logout(
     response: Response,
     db: session_dependency,
+    access_token: str = Cookie(None, description="Access token cookie"),
     refresh_token: str = Cookie(None, description="Refresh token cookie"),
 ):
     """
     Logout user by revoking refresh token and clearing cookies.
     """
-    if refresh_token:
-        await refresh_tokens_service(RefreshRequest(refresh_token=refresh_token), db)
+    await logout_service(access_token, refresh_token, db)
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
     return {"detail": "Logged out"}
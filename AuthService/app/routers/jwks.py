@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from app.config import settings
+from app.services.jwks_service import jwks
+
+
+router = APIRouter(tags=["jwks"])
+
+
+@router.get("/.well-known/jwks.json")
+async def read_jwks(response: Response):
+    """
+    Public keys that tokens of this service may be signed with.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWKS_MAX_AGE_SECONDS}"
+    return jwks()
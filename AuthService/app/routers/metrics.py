@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+
+from app.services.password_service import hashing_pool, hashing_policy
+from app.services.throttle_service import throttle_metrics
+from app.services.user_cache import user_cache
+
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def read_metrics():
+    """
+    Runtime metrics of this worker.
+    """
+    return {
+        "password_hashing": {**hashing_pool.metrics(), "policy": hashing_policy()},
+        "login_throttle": throttle_metrics(),
+        "user_cache": user_cache.metrics(),
+    }
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.database import session_dependency
+from app.dependencies import require_internal_token
+from app.services.revocation_service import list_revocations
+
+
+# Не проксируется nginx, но порт сервиса открыт — пускаем только по токену сервисов
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/revocations")
+async def read_revocations(
+    db: session_dependency,
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call"),
+):
+    """
+    Revoked access tokens still within their lifetime, for replication.
+    """
+    return await list_revocations(since, db)
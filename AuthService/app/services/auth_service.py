@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta, timezone
-import bcrypt
 import ulid
 from fastapi import HTTPException, status
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, insert, update, literal, func, String, DateTime
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models
@@ -13,10 +12,15 @@ from app.schemas import (
 )
 from app.services.jwt_service import (
     create_access_token, create_refresh_token,
-    create_id_token, verify_refresh_token
+    create_id_token, verify_access_token, verify_refresh_token
 )
+from app.services.revocation_service import revoke_token, revoke_user_tokens
+from app.services.user_cache import UserSnapshot, user_cache
+from app.services.password_service import hash_password, verify_password, needs_rehash
 from app.config import settings
 
+_EXPIRES_AT_SLACK = timedelta(minutes=1)
+
 
 async def register_user_service(
     user: UserCreate,
@@ -36,9 +40,7 @@ async def register_user_service(
             detail="User with this email already exists"
         )
 
-    hashed_password = bcrypt.hashpw(
-        user.password.encode('utf-8'), bcrypt.gensalt()
-    ).decode('utf-8')
+    hashed_password = await hash_password(user.password)
 
     db_user = models.User(
         email=user.email,
@@ -50,6 +52,21 @@ async def register_user_service(
     return UserRead.model_validate(db_user)
 
 
+def _token_response(
+    user_id: str,
+    jti: str,
+    id_claims: dict | None = None
+) -> TokenResponse:
+    """
+    Подписывает access/refresh (и, если нужно, id) токены.
+    """
+    return TokenResponse(
+        access_token=create_access_token(user_id),
+        refresh_token=create_refresh_token(user_id, jti),
+        id_token=create_id_token(user_id, id_claims) if id_claims else None
+    )
+
+
 async def _create_tokens(
     user: models.User,
     db: AsyncSession,
@@ -72,18 +89,8 @@ async def _create_tokens(
     db.add(token_record)
     await db.commit()
 
-    # Создаём JWT
-    access_tk = create_access_token(user.id)
-    refresh_tk = create_refresh_token(user.id, jti)
-    id_tk: str | None = None
-    if scopes and "openid" in scopes:
-        id_tk = create_id_token(user.id, {"email": user.email})
-
-    return TokenResponse(
-        access_token=access_tk,
-        refresh_token=refresh_tk,
-        id_token=id_tk
-    )
+    id_claims = {"email": user.email} if scopes and "openid" in scopes else None
+    return _token_response(user.id, jti, id_claims)
 
 
 async def authenticate_user_service(
@@ -97,14 +104,20 @@ async def authenticate_user_service(
         select(models.User).filter_by(email=credentials.email)
     )
     user = result.scalars().first()
-    if not user or not bcrypt.checkpw(
-        credentials.password.encode('utf-8'),
-        user.hashed_password.encode('utf-8')
+    if not user or not await verify_password(
+        credentials.password, user.hashed_password
     ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password"
         )
+    # Хеш со старыми параметрами прозрачно пересчитываем, пока пароль
+    # у нас в руках; сохранится вместе с refresh-токеном
+    if needs_rehash(user.hashed_password):
+        try:
+            user.hashed_password = await hash_password(credentials.password)
+        except HTTPException:
+            pass  # пул перегружен — пересчитаем при следующем входе
     return await _create_tokens(user, db, scopes=credentials.scope)
 
 
@@ -127,55 +140,129 @@ async def refresh_tokens_service(
 
     jti = payload.get("jti")
     user_id = payload.get("sub")
+    # exp токена и expires_at записи считаются почти одновременно;
+    # диапазон по expires_at оставляет поиску одну-две секции
+    token_exp = datetime.fromtimestamp(payload["exp"], timezone.utc)
 
-    # Ищем запись в БД
-    result = await db.execute(
-        select(models.RefreshToken)
-        .filter_by(jti=jti, user_id=user_id)
+    # Удаление старой записи и вставка новой — один запрос в одной
+    # транзакции. Из параллельных обновлений одного токена DELETE
+    # найдёт строку только у первого, остальные получат 401.
+    # Запись токена существует только пока жив пользователь (ON DELETE CASCADE).
+    new_jti = ulid.new().str
+    expires_at = datetime.now(timezone.utc) + timedelta(
+        days=settings.REFRESH_TOKEN_EXPIRE_DAYS
+    )
+    Token = models.RefreshToken
+    revoked = (
+        delete(Token)
+        .where(
+            Token.jti == jti,
+            Token.user_id == user_id,
+            Token.expires_at.between(
+                token_exp - _EXPIRES_AT_SLACK, token_exp + _EXPIRES_AT_SLACK
+            ),
+            Token.expires_at > func.now()
+        )
+        .returning(Token.user_id, Token.device_name, Token.ip_address, Token.user_agent)
+        .cte("revoked")
+    )
+    rotate = (
+        insert(Token)
+        .from_select(
+            ["user_id", "jti", "device_name", "ip_address", "user_agent", "expires_at"],
+            select(
+                revoked.c.user_id,
+                literal(new_jti, String),
+                revoked.c.device_name,
+                revoked.c.ip_address,
+                revoked.c.user_agent,
+                literal(expires_at, DateTime(timezone=True)),
+            )
+        )
+        .returning(Token.user_id)
     )
-    record = result.scalars().first()
-    if not record or record.expires_at < datetime.now(timezone.utc):
+    result = await db.execute(rotate)
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token"
         )
-
-    # Отзываем старый JTI
-    await db.execute(delete(models.RefreshToken).filter_by(jti=jti))
     await db.commit()
 
-    # Получаем пользователя
-    user = await db.get(models.User, user_id)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="User not found")
+    return _token_response(user_id, new_jti)
 
-    # Генерируем новые токены
-    return await _create_tokens(user, db)
+
+async def logout_service(
+    access_token: str | None,
+    refresh_token: str | None,
+    db: AsyncSession
+) -> None:
+    """
+    Завершает сессию: удаляет refresh-токен и отзывает access-токен.
+    Невалидные или просроченные токены просто пропускаются.
+    """
+    if refresh_token:
+        try:
+            payload = verify_refresh_token(refresh_token)
+        except ValueError:
+            payload = None
+        if payload:
+            token_exp = datetime.fromtimestamp(payload["exp"], timezone.utc)
+            await db.execute(
+                delete(models.RefreshToken)
+                .where(
+                    models.RefreshToken.jti == payload.get("jti"),
+                    models.RefreshToken.expires_at.between(
+                        token_exp - _EXPIRES_AT_SLACK, token_exp + _EXPIRES_AT_SLACK
+                    )
+                )
+            )
+            await db.commit()
+
+    if access_token:
+        try:
+            payload = verify_access_token(access_token)
+        except ValueError:
+            return
+        if payload.get("jti"):
+            await revoke_token(payload["jti"], payload["exp"], db)
 
 
 async def change_password_service(
-    user: models.User,
+    user: UserSnapshot,
     data: ChangePassword,
     db: AsyncSession
 ) -> None:
     """
     Проверяем старый пароль, хешируем новый и сохраняем в БД.
     """
+    # Хеш не кешируется — читаем актуальный
+    hashed_password = (await db.execute(
+        select(models.User.hashed_password).where(models.User.id == user.id)
+    )).scalar_one_or_none()
+    if hashed_password is None:
+        user_cache.invalidate(user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+
     # проверяем старый
-    if not bcrypt.checkpw(
-        data.old_password.encode("utf-8"),
-        user.hashed_password.encode("utf-8")
-    ):
+    if not await verify_password(data.old_password, hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
 
     # хешируем и меняем
-    new_hashed = bcrypt.hashpw(
-        data.new_password.encode("utf-8"),
-        bcrypt.gensalt()
-    ).decode("utf-8")
-    user.hashed_password = new_hashed
-    await db.commit()
+    await db.execute(
+        update(models.User)
+        .where(models.User.id == user.id)
+        .values(hashed_password=await hash_password(data.new_password))
+    )
+
+    # Старый пароль мог утечь: завершаем все сессии пользователя
+    await db.execute(
+        delete(models.RefreshToken).where(models.RefreshToken.user_id == user.id)
+    )
+    await revoke_user_tokens(user.id, db)
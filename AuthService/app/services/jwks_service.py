@@ -0,0 +1,118 @@
+"""
+Public signing keys of this service, published as a JWK Set.
+
+Rotation: add the new public key to ADDITIONAL_PUBLIC_KEY_PATHS and
+wait for the other services to refresh their key sets, then swap
+PRIVATE_KEY_PATH/PUBLIC_KEY_PATH to the new pair and keep the old public
+key in ADDITIONAL_PUBLIC_KEY_PATHS until the tokens it signed expire.
+"""
+import base64
+import hashlib
+import json
+from functools import cache
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    PublicFormat,
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from app.config import settings
+
+_CURVES = {"secp256r1": "P-256", "secp384r1": "P-384", "secp521r1": "P-521"}
+_EC_ALGORITHMS = {"P-256": "ES256", "P-384": "ES384", "P-521": "ES512"}
+# Обязательные поля JWK, из которых считается отпечаток (RFC 7638)
+_THUMBPRINT_MEMBERS = {"RSA": ("e", "kty", "n"), "EC": ("crv", "kty", "x", "y"), "OKP": ("crv", "kty", "x")}
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _int_b64url(value: int, length: int | None = None) -> str:
+    return _b64url(value.to_bytes(length or (value.bit_length() + 7) // 8, "big"))
+
+
+def public_jwk(key) -> dict:
+    """
+    JWK members of a `cryptography` public key.
+    """
+    if isinstance(key, rsa.RSAPublicKey):
+        numbers = key.public_numbers()
+        return {"kty": "RSA", "n": _int_b64url(numbers.n), "e": _int_b64url(numbers.e)}
+    if isinstance(key, ec.EllipticCurvePublicKey):
+        numbers = key.public_numbers()
+        size = (key.curve.key_size + 7) // 8
+        return {
+            "kty": "EC",
+            "crv": _CURVES[key.curve.name],
+            "x": _int_b64url(numbers.x, size),
+            "y": _int_b64url(numbers.y, size),
+        }
+    if isinstance(key, ed25519.Ed25519PublicKey):
+        return {"kty": "OKP", "crv": "Ed25519", "x": _b64url(key.public_bytes(Encoding.Raw, PublicFormat.Raw))}
+    raise ValueError(f"Unsupported key type: {type(key).__name__}")
+
+
+def thumbprint(jwk: dict) -> str:
+    """
+    RFC 7638 JWK thumbprint (SHA-256), used as the key ID.
+    """
+    members = {name: jwk[name] for name in _THUMBPRINT_MEMBERS[jwk["kty"]]}
+    canonical = json.dumps(members, separators=(",", ":"), sort_keys=True)
+    return _b64url(hashlib.sha256(canonical.encode("utf-8")).digest())
+
+
+def _algorithm_for(jwk: dict) -> str:
+    if jwk["kty"] == "EC":
+        return _EC_ALGORITHMS[jwk["crv"]]
+    if jwk["kty"] == "OKP":
+        return "EdDSA"
+    return "RS256"
+
+
+def _entry(public_key, algorithm: str | None = None) -> dict:
+    jwk = public_jwk(public_key)
+    return {**jwk, "kid": thumbprint(jwk), "alg": algorithm or _algorithm_for(jwk), "use": "sig"}
+
+
+@cache
+def signing_private_key():
+    return load_pem_private_key(settings.PRIVATE_KEY.encode("utf-8"), password=None)
+
+
+@cache
+def signing_key_entry() -> dict:
+    """
+    JWK of the key tokens are currently signed with.
+    """
+    return _entry(signing_private_key().public_key(), settings.ALGORITHM)
+
+
+@cache
+def _published() -> list[tuple[dict, object]]:
+    published = [(signing_key_entry(), signing_private_key().public_key())]
+    for path in settings.ADDITIONAL_PUBLIC_KEY_PATHS:
+        public_key = load_pem_public_key(Path(path).read_bytes())
+        entry = _entry(public_key)
+        if entry["kid"] not in {known["kid"] for known, _ in published}:
+            published.append((entry, public_key))
+    return published
+
+
+def verification_keys() -> dict[str, tuple[str, object]]:
+    """
+    kid -> (algorithm, public key) of every published key.
+    """
+    return {entry["kid"]: (entry["alg"], public_key) for entry, public_key in _published()}
+
+
+@cache
+def jwks() -> dict:
+    """
+    The current signing key followed by the additional keys still accepted.
+    """
+    return {"keys": [entry for entry, _ in _published()]}
@@ -0,0 +1,112 @@
+"""
+Compact JWS signing and verification on `cryptography` key objects.
+
+Supported algorithms: RS256 (RSA), ES256 (P-256) and EdDSA (Ed25519).
+Kept free of settings so key tooling and benchmarks can use it directly.
+"""
+import base64
+import json
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+
+ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+
+def b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _json_b64(value: dict) -> str:
+    return b64url_encode(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def generate_private_key(algorithm: str):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise ValueError(f"Unsupported algorithm: {algorithm}")
+
+
+def check_key(key, algorithm: str) -> None:
+    """
+    Raise ValueError if `key` (private or public) cannot be used with `algorithm`.
+    """
+    if algorithm == "RS256" and isinstance(key, (rsa.RSAPrivateKey, rsa.RSAPublicKey)):
+        return
+    if (
+        algorithm == "ES256"
+        and isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey))
+        and isinstance(key.curve, ec.SECP256R1)
+    ):
+        return
+    if algorithm == "EdDSA" and isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return
+    raise ValueError(f"{type(key).__name__} cannot be used with {algorithm}")
+
+
+class SigningKey:
+    """
+    A private key with its algorithm and the encoded protected header,
+    built once so each token costs one signature.
+    """
+
+    def __init__(self, private_key, algorithm: str, kid: str | None = None) -> None:
+        check_key(private_key, algorithm)
+        self.private_key = private_key
+        self.algorithm = algorithm
+        header = {"alg": algorithm, "typ": "JWT"}
+        if kid:
+            header["kid"] = kid
+        self._header = _json_b64(header)
+
+    def _signature(self, signing_input: bytes) -> bytes:
+        if self.algorithm == "RS256":
+            return self.private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+        if self.algorithm == "ES256":
+            r, s = decode_dss_signature(self.private_key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+            return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+        return self.private_key.sign(signing_input)
+
+    def sign(self, payload: dict) -> str:
+        signing_input = f"{self._header}.{_json_b64(payload)}"
+        signature = self._signature(signing_input.encode("ascii"))
+        return f"{signing_input}.{b64url_encode(signature)}"
+
+
+def verify_signature(public_key, algorithm: str, signing_input: bytes, signature: bytes) -> None:
+    """
+    Raise InvalidSignature unless `signature` is valid.
+    """
+    check_key(public_key, algorithm)
+    if algorithm == "RS256":
+        public_key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+    elif algorithm == "ES256":
+        if len(signature) != 64:
+            raise InvalidSignature()
+        der = encode_dss_signature(int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big"))
+        public_key.verify(der, signing_input, ec.ECDSA(hashes.SHA256()))
+    else:
+        public_key.verify(signature, signing_input)
+
+
+def split(token: str) -> tuple[dict, dict, bytes, bytes]:
+    """
+    Header, claims, signing input and signature of a compact JWS; the
+    signature is not checked. Raises ValueError on malformed input.
+    """
+    header_b64, payload_b64, signature_b64 = token.split(".")
+    header = json.loads(b64url_decode(header_b64))
+    claims = json.loads(b64url_decode(payload_b64))
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise ValueError("Malformed token")
+    return header, claims, f"{header_b64}.{payload_b64}".encode("ascii"), b64url_decode(signature_b64)
@@ -1,20 +1,57 @@
+import time
 from datetime import datetime, timedelta, timezone
-from jose import jwt
-from jose.exceptions import JWTError
+
+import ulid
+from cryptography.exceptions import InvalidSignature
+
 from app.config import settings
+from app.services import jws
+from app.services.jwks_service import signing_key_entry, signing_private_key, verification_keys
+
+_SIGNING_KEY = jws.SigningKey(signing_private_key(), settings.ALGORITHM, signing_key_entry()["kid"])
+_VERIFY_KEYS = verification_keys()
+_CURRENT_KEY = _VERIFY_KEYS[signing_key_entry()["kid"]]
+
+
+def _decode(token: str, audience: str) -> dict:
+    try:
+        header, claims, signing_input, signature = jws.split(token)
+    except ValueError:
+        raise ValueError("Malformed token")
+    # Токены, выданные до появления kid, проверяем текущим ключом
+    kid = header.get("kid")
+    if kid is not None and kid not in _VERIFY_KEYS:
+        raise ValueError("Unknown signing key")
+    algorithm, public_key = _VERIFY_KEYS[kid] if kid is not None else _CURRENT_KEY
+    if header.get("alg") != algorithm:
+        raise ValueError("Algorithm does not match the signing key")
+    try:
+        jws.verify_signature(public_key, algorithm, signing_input, signature)
+    except (InvalidSignature, ValueError):
+        raise ValueError("Signature verification failed")
+
+    exp = claims.get("exp")
+    if not isinstance(exp, (int, float)) or exp <= time.time():
+        raise ValueError("Signature has expired")
+    if claims.get("iss") != settings.ISSUER:
+        raise ValueError("Invalid issuer")
+    if claims.get("aud") != audience:
+        raise ValueError("Invalid audience")
+    return claims
 
-_PRIVATE_KEY = settings.PRIVATE_KEY
-_PUBLIC_KEY = settings.PUBLIC_KEY
 
 def create_access_token(user_id: str) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {
         "iss": settings.ISSUER,
         "sub": user_id,
         "aud": "namity_api",
+        "jti": ulid.new().str,
+        "iat": int(now.timestamp()),
         "exp": int(expire.timestamp()),
     }
-    return jwt.encode(payload, _PRIVATE_KEY, algorithm=settings.ALGORITHM)
+    return _SIGNING_KEY.sign(payload)
 
 def create_refresh_token(user_id: str, jti: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
@@ -25,7 +62,7 @@ def create_refresh_token(user_id: str, jti: str) -> str:
         "jti": jti,
         "exp": int(expire.timestamp()),
     }
-    return jwt.encode(payload, _PRIVATE_KEY, algorithm=settings.ALGORITHM)
+    return _SIGNING_KEY.sign(payload)
 
 def create_id_token(user_id: str, extra_claims: dict | None = None) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -37,28 +74,16 @@ def create_id_token(user_id: str, extra_claims: dict | None = None) -> str:
     }
     if extra_claims:
         payload.update(extra_claims)
-    return jwt.encode(payload, _PRIVATE_KEY, algorithm=settings.ALGORITHM)
+    return _SIGNING_KEY.sign(payload)
 
 def verify_access_token(token: str) -> dict:
     try:
-        return jwt.decode(
-            token,
-            _PUBLIC_KEY,
-            algorithms=[settings.ALGORITHM],
-            audience="namity_api",
-            issuer=settings.ISSUER,
-        )
-    except JWTError as e:
+        return _decode(token, "namity_api")
+    except ValueError as e:
         raise ValueError(f"Invalid access token: {e}")
 
 def verify_refresh_token(token: str) -> dict:
     try:
-        return jwt.decode(
-            token,
-            _PUBLIC_KEY,
-            algorithms=[settings.ALGORITHM],
-            audience="namity_refresh",
-            issuer=settings.ISSUER,
-        )
-    except JWTError as e:
+        return _decode(token, "namity_refresh")
+    except ValueError as e:
         raise ValueError(f"Invalid refresh token: {e}")
\ No newline at end of file
@@ -0,0 +1,240 @@
+import asyncio
+import logging
+import math
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import bcrypt
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+try:
+    from argon2 import PasswordHasher as Argon2Hasher, extract_parameters
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # argon2-cffi нужен только для PASSWORD_HASH_SCHEME=argon2id
+    Argon2Hasher = None
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPool:
+    """
+    Bounded executor for password hashing.
+
+    bcrypt releases the GIL, so a small thread pool keeps the event loop
+    free while hashes are computed. Callers queue for one of `workers`
+    slots; when the queue is already `max_queue` long, or a slot does
+    not free up within `max_wait` seconds, the request is rejected with
+    503 instead of piling up behind the burst.
+    """
+
+    def __init__(self, workers: int, max_wait: float, max_queue: int) -> None:
+        self._workers = workers
+        self._max_wait = max_wait
+        self._max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(workers)
+        self._waiting = 0
+        self._busy = 0
+        self._completed = 0
+        self._rejected_queue_full = 0
+        self._rejected_wait_timeout = 0
+        self._wait_seconds = 0.0
+        self._hash_seconds = 0.0
+
+    def _overloaded(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication service is busy, try again later",
+            headers={"Retry-After": "1"},
+        )
+
+    async def run(self, fn, *args):
+        if self._waiting >= self._max_queue:
+            self._rejected_queue_full += 1
+            raise self._overloaded()
+
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self._max_wait)
+        except asyncio.TimeoutError:
+            self._rejected_wait_timeout += 1
+            raise self._overloaded()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.monotonic()
+        self._wait_seconds += started_at - queued_at
+        self._busy += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._busy -= 1
+            self._completed += 1
+            self._hash_seconds += time.monotonic() - started_at
+            self._slots.release()
+
+    def metrics(self) -> dict:
+        completed = self._completed or 1
+        return {
+            "workers": self._workers,
+            "busy": self._busy,
+            "waiting": self._waiting,
+            "utilisation": self._busy / self._workers,
+            "completed": self._completed,
+            "rejected_queue_full": self._rejected_queue_full,
+            "rejected_wait_timeout": self._rejected_wait_timeout,
+            "avg_wait_ms": round(self._wait_seconds / completed * 1000, 2),
+            "avg_hash_ms": round(self._hash_seconds / completed * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+hashing_pool = HashingPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_wait=settings.PASSWORD_HASH_MAX_WAIT_MS / 1000,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+@dataclass
+class HashPolicy:
+    """
+    Parameters new hashes are created with; set by `calibrate_password_hashing`.
+    """
+    scheme: str = "bcrypt"
+    bcrypt_rounds: int = 12
+    argon2: "Argon2Hasher | None" = None
+
+    def describe(self) -> dict:
+        if self.scheme == "argon2id":
+            return {
+                "scheme": self.scheme,
+                "time_cost": self.argon2.time_cost,
+                "memory_cost_kib": self.argon2.memory_cost,
+                "parallelism": self.argon2.parallelism,
+            }
+        return {"scheme": self.scheme, "bcrypt_rounds": self.bcrypt_rounds}
+
+
+_policy = HashPolicy()
+
+
+def _is_argon2(hashed: str) -> bool:
+    return hashed.startswith("$argon2")
+
+
+def _hash(password: str) -> str:
+    if _policy.scheme == "argon2id":
+        return _policy.argon2.hash(password)
+    return bcrypt.hashpw(
+        password.encode("utf-8"), bcrypt.gensalt(rounds=_policy.bcrypt_rounds)
+    ).decode("utf-8")
+
+
+def _verify(password: str, hashed: str) -> bool:
+    if _is_argon2(hashed):
+        if Argon2Hasher is None:
+            raise RuntimeError("argon2-cffi is required to verify argon2 hashes")
+        try:
+            return (_policy.argon2 or Argon2Hasher()).verify(hashed, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Whether a stored hash was made with a different scheme or a lower
+    cost than the current policy. A hash stronger than the policy is
+    kept: calibration on a slower or busier machine must not weaken it.
+    """
+    if _policy.scheme == "argon2id":
+        if not _is_argon2(hashed):
+            return True
+        try:
+            stored = extract_parameters(hashed)
+        except InvalidHashError:
+            return True
+        current = _policy.argon2
+        return (
+            stored.type != current.type
+            or stored.time_cost < current.time_cost
+            or stored.memory_cost < current.memory_cost
+        )
+    if _is_argon2(hashed):
+        return True
+    try:
+        return int(hashed.split("$")[2]) < _policy.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+def _time_hash(fn, samples: int = 5) -> float:
+    """
+    Median duration of `samples` runs, so one run slowed down by other
+    work at startup does not skew the chosen cost.
+    """
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _calibrate() -> HashPolicy:
+    target = settings.PASSWORD_HASH_TARGET_MS / 1000
+
+    if settings.PASSWORD_HASH_SCHEME == "argon2id":
+        if Argon2Hasher is None:
+            raise RuntimeError("PASSWORD_HASH_SCHEME=argon2id requires argon2-cffi")
+
+        def make(time_cost: int):
+            return Argon2Hasher(
+                time_cost=time_cost,
+                memory_cost=settings.ARGON2_MEMORY_COST_KIB,
+                parallelism=settings.ARGON2_PARALLELISM,
+            )
+
+        # Время argon2 растёт линейно по числу проходов
+        per_pass = _time_hash(lambda: make(1).hash("calibration"))
+        time_cost = max(settings.ARGON2_MIN_TIME_COST, int(target / per_pass))
+        return HashPolicy(scheme="argon2id", argon2=make(time_cost))
+
+    # Каждый следующий раунд bcrypt удваивает время
+    rounds = settings.BCRYPT_MIN_ROUNDS
+    elapsed = _time_hash(lambda: bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=rounds)))
+    if elapsed < target:
+        rounds += int(math.log2(target / elapsed))
+    rounds = max(settings.BCRYPT_MIN_ROUNDS, min(rounds, settings.BCRYPT_MAX_ROUNDS))
+    return HashPolicy(scheme="bcrypt", bcrypt_rounds=rounds)
+
+
+async def calibrate_password_hashing() -> None:
+    """
+    Benchmark this machine once at startup and pick the most expensive
+    parameters that still fit PASSWORD_HASH_TARGET_MS per hash.
+    """
+    global _policy
+    _policy = await asyncio.to_thread(_calibrate)
+    logger.info("Password hashing calibrated: %s", _policy.describe())
+
+
+def hashing_policy() -> dict:
+    return _policy.describe()
+
+
+async def hash_password(password: str) -> str:
+    return await hashing_pool.run(_hash, password)
+
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await hashing_pool.run(_verify, password, hashed)
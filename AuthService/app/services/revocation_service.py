@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+from app.services.user_cache import user_cache
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """
+    In-memory copy of `token_revocations`, checked on every request.
+
+    Same structure as the replica the other services build from the
+    feed: revoked jtis and per-user `revoked_before` moments, each kept
+    until its `expires_at`. Revocations made by this worker are applied
+    immediately; those of other workers arrive with the next sync.
+    """
+
+    def __init__(self) -> None:
+        self.cursor = 0
+        self._jtis: dict[str, float] = {}
+        self._users: dict[str, tuple[float, float]] = {}
+
+    def apply(self, entries: list[dict]) -> None:
+        for entry in entries:
+            if entry.get("jti"):
+                self._jtis[entry["jti"]] = entry["expires_at"]
+            elif entry.get("user_id"):
+                # Пароль или учётная запись изменились — снимок пользователя устарел
+                user_cache.invalidate(entry["user_id"])
+                current = self._users.get(entry["user_id"])
+                if current is None or current[0] < entry["revoked_before"]:
+                    self._users[entry["user_id"]] = (entry["revoked_before"], entry["expires_at"])
+        now = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._users = {user: entry for user, entry in self._users.items() if entry[1] > now}
+
+    def is_revoked(self, claims: dict) -> bool:
+        if self._jtis and claims.get("jti") in self._jtis:
+            return True
+        if self._users:
+            entry = self._users.get(claims.get("sub"))
+            # iat в целых секундах: токен, выданный в ту же секунду после отзыва, действителен
+            if entry is not None and claims.get("iat", 0) < int(entry[0]):
+                return True
+        return False
+
+
+revocations = RevocationList()
+
+
+def _feed_entry(row: models.TokenRevocation) -> dict:
+    return {
+        "id": row.id,
+        "jti": row.jti,
+        "user_id": row.user_id,
+        "revoked_before": row.revoked_before.timestamp() if row.revoked_before else None,
+        "expires_at": row.expires_at.timestamp(),
+    }
+
+
+async def revoke_token(jti: str, exp: int, db: AsyncSession) -> None:
+    """
+    Revoke one access token until its expiry; commits.
+    """
+    expires_at = datetime.fromtimestamp(exp, timezone.utc)
+    if expires_at <= datetime.now(timezone.utc):
+        return
+    row = (await db.execute(
+        insert(models.TokenRevocation)
+        .values(jti=jti, expires_at=expires_at)
+        .returning(models.TokenRevocation)
+    )).scalar_one()
+    await db.commit()
+    revocations.apply([_feed_entry(row)])
+
+
+async def revoke_user_tokens(user_id: str, db: AsyncSession) -> None:
+    """
+    Revoke every access token of the user issued until now; commits the
+    caller's transaction together with the entry. Tokens live at most
+    ACCESS_TOKEN_EXPIRE_MINUTES, so the entry is needed only that long.
+    """
+    # С точностью iat, иначе токен, выданный сразу после смены пароля, тоже отозван
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    row = (await db.execute(
+        insert(models.TokenRevocation)
+        .values(
+            user_id=user_id,
+            revoked_before=now,
+            expires_at=now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+        )
+        .returning(models.TokenRevocation)
+    )).scalar_one()
+    await db.commit()
+    revocations.apply([_feed_entry(row)])
+
+
+async def list_revocations(since: int, db: AsyncSession) -> dict:
+    """
+    Live revocations with id > since.
+
+    Ids come from a sequence, so a transaction that commits late can
+    make a smaller id visible after a larger one. The returned cursor
+    therefore stops before entries younger than REVOCATION_FEED_LAG_SECONDS;
+    those are sent again on the next poll.
+    """
+    rows = (await db.execute(
+        select(models.TokenRevocation)
+        .where(
+            models.TokenRevocation.id > since,
+            models.TokenRevocation.expires_at > func.now()
+        )
+        .order_by(models.TokenRevocation.id)
+    )).scalars().all()
+    settled_before = datetime.now(timezone.utc) - timedelta(seconds=settings.REVOCATION_FEED_LAG_SECONDS)
+    cursor = since
+    for row in rows:
+        if row.created_at >= settled_before:
+            break
+        cursor = row.id
+    return {"cursor": cursor, "revocations": [_feed_entry(row) for row in rows]}
+
+
+async def purge_expired_revocations(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(models.TokenRevocation)
+        .where(models.TokenRevocation.expires_at <= func.now())
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def run_revocation_sync_loop() -> None:
+    """
+    Pull revocations made by other workers into this worker's list.
+    """
+    from app.database import _async_session
+
+    while True:
+        try:
+            async with _async_session() as db:
+                feed = await list_revocations(revocations.cursor, db)
+            revocations.apply(feed["revocations"])
+            revocations.cursor = feed["cursor"]
+        except Exception:
+            logger.exception("Revocation sync failed")
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
@@ -0,0 +1,220 @@
+import asyncio
+import ipaddress
+import logging
+import math
+import time
+from datetime import timedelta
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucketLimiter:
+    """
+    In-process token buckets with time-wheel eviction.
+
+    A bucket that has refilled to capacity behaves exactly like a
+    missing one, so it can be dropped. Every touched key is put in the
+    wheel slot of the moment its bucket will be full again; advancing
+    the wheel deletes buckets whose slot has passed and that have not
+    been touched since. Memory is therefore bounded by the keys seen
+    within one full-refill period, and `max_keys` caps it outright.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float, max_keys: int, slot_seconds: float = 1.0) -> None:
+        self.capacity = capacity
+        self.rate = refill_per_second
+        self._max_keys = max_keys
+        self._slot_seconds = slot_seconds
+        horizon = capacity / refill_per_second
+        self._slots: list[set[str]] = [set() for _ in range(int(horizon / slot_seconds) + 2)]
+        # key -> [tokens, updated_at, full_at]
+        self._buckets: dict[str, list[float]] = {}
+        self._tick = int(time.monotonic() / slot_seconds)
+        self.rejected = 0
+
+    def _slot(self, tick: int) -> set[str]:
+        return self._slots[tick % len(self._slots)]
+
+    def _advance(self, now: float) -> None:
+        tick = int(now / self._slot_seconds)
+        # После долгого простоя хватает одного оборота колеса
+        for t in range(max(self._tick + 1, tick - len(self._slots) + 1), tick + 1):
+            slot = self._slot(t)
+            for key in slot:
+                bucket = self._buckets.get(key)
+                if bucket is not None and bucket[2] <= now:
+                    del self._buckets[key]
+            slot.clear()
+        self._tick = tick
+
+    def _evict_overflow(self) -> None:
+        # Выбрасываем ключи, которые заполнятся раньше всех
+        t = self._tick + 1
+        while len(self._buckets) > self._max_keys and t <= self._tick + len(self._slots):
+            slot = self._slot(t)
+            while slot and len(self._buckets) > self._max_keys:
+                self._buckets.pop(slot.pop(), None)
+            t += 1
+
+    def try_acquire(self, key: str) -> float:
+        """
+        Take one token; returns 0 on success or seconds until a token
+        becomes available.
+        """
+        now = time.monotonic()
+        self._advance(now)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.capacity
+        else:
+            tokens = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        full_at = now + (self.capacity - tokens) / self.rate
+        self._buckets[key] = [tokens, now, full_at]
+        self._slot(int(full_at / self._slot_seconds)).add(key)
+        if len(self._buckets) > self._max_keys:
+            self._evict_overflow()
+
+        if allowed:
+            return 0.0
+        self.rejected += 1
+        return (1 - tokens) / self.rate
+
+    def metrics(self) -> dict:
+        return {"buckets": len(self._buckets), "rejected": self.rejected}
+
+
+# Один запрос: долить токены за прошедшее время и, если хватает, взять один
+_PG_ACQUIRE = text("""
+    INSERT INTO login_throttle_buckets AS b (key, tokens, allowed, updated_at)
+    VALUES (:key, :capacity - 1, true, now())
+    ON CONFLICT (key) DO UPDATE SET
+        tokens = CASE
+            WHEN LEAST(:capacity, b.tokens + :rate * extract(epoch FROM now() - b.updated_at)) >= 1
+            THEN LEAST(:capacity, b.tokens + :rate * extract(epoch FROM now() - b.updated_at)) - 1
+            ELSE LEAST(:capacity, b.tokens + :rate * extract(epoch FROM now() - b.updated_at))
+        END,
+        allowed = LEAST(:capacity, b.tokens + :rate * extract(epoch FROM now() - b.updated_at)) >= 1,
+        updated_at = now()
+    RETURNING tokens, allowed
+""")
+
+
+class PostgresTokenBucketLimiter:
+    """
+    The same token bucket kept in `login_throttle_buckets`, shared by all
+    workers. Each check is one upsert on a tiny table.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        self.capacity = capacity
+        self.rate = refill_per_second
+        self.rejected = 0
+
+    async def try_acquire(self, key: str, db: AsyncSession) -> float:
+        result = await db.execute(
+            _PG_ACQUIRE, {"key": key, "capacity": self.capacity, "rate": self.rate}
+        )
+        tokens, allowed = result.one()
+        await db.commit()
+        if allowed:
+            return 0.0
+        self.rejected += 1
+        return (1 - tokens) / self.rate
+
+    async def purge(self, db: AsyncSession) -> None:
+        # Ведро, долившееся до полного, ничем не отличается от отсутствующего
+        horizon = timedelta(seconds=self.capacity / self.rate)
+        await db.execute(
+            delete(models.LoginThrottleBucket)
+            .where(models.LoginThrottleBucket.updated_at < func.now() - horizon)
+        )
+        await db.commit()
+
+    def metrics(self) -> dict:
+        return {"rejected": self.rejected}
+
+
+def _make_limiter(capacity: int, per_minute: float):
+    if settings.LOGIN_THROTTLE_BACKEND == "postgres":
+        return PostgresTokenBucketLimiter(capacity, per_minute / 60)
+    return TokenBucketLimiter(capacity, per_minute / 60, settings.LOGIN_THROTTLE_MAX_KEYS)
+
+
+ip_limiter = _make_limiter(settings.LOGIN_IP_BURST, settings.LOGIN_IP_PER_MINUTE)
+email_limiter = _make_limiter(settings.LOGIN_EMAIL_BURST, settings.LOGIN_EMAIL_PER_MINUTE)
+
+
+_trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_proxies)
+
+
+def client_ip(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    # Заголовок может прислать кто угодно, верим только своему прокси
+    if settings.TRUST_X_REAL_IP and request.headers.get("x-real-ip") and _is_trusted_proxy(peer):
+        return request.headers["x-real-ip"]
+    return peer
+
+
+async def _acquire(limiter, key: str, db: AsyncSession) -> float:
+    if isinstance(limiter, PostgresTokenBucketLimiter):
+        return await limiter.try_acquire(key, db)
+    return limiter.try_acquire(key)
+
+
+async def throttle_login(ip: str, email: str, db: AsyncSession) -> None:
+    """
+    Reject a login attempt before any user lookup or password check
+    when its IP or target email has run out of attempts.
+    """
+    retry_after = await _acquire(ip_limiter, f"ip:{ip}", db)
+    if not retry_after:
+        retry_after = await _acquire(email_limiter, f"email:{email.lower()}", db)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def throttle_metrics() -> dict:
+    return {
+        "backend": settings.LOGIN_THROTTLE_BACKEND,
+        "ip": ip_limiter.metrics(),
+        "email": email_limiter.metrics(),
+    }
+
+
+async def run_throttle_purge_loop() -> None:
+    """
+    Drop refilled buckets from the shared table (postgres backend only).
+    """
+    from app.database import _async_session
+
+    while True:
+        await asyncio.sleep(settings.LOGIN_THROTTLE_PURGE_INTERVAL_SECONDS)
+        try:
+            async with _async_session() as db:
+                for limiter in (ip_limiter, email_limiter):
+                    await limiter.purge(db)
+        except Exception:
+            logger.exception("Login throttle purge failed")
@@ -0,0 +1,111 @@
+"""
+Weekly range partitions of `refresh_tokens` on `expires_at`.
+
+Each partition holds the tokens expiring within one week and is named
+after its first day (`refresh_tokens_p20261019`). Once the week is over
+every row in it has expired, so the whole partition is dropped instead
+of deleting rows one by one.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.services.revocation_service import purge_expired_revocations
+
+logger = logging.getLogger(__name__)
+
+PARTITION_DAYS = 7
+_PREFIX = "refresh_tokens_p"
+
+
+def partition_start(moment: datetime) -> datetime:
+    """
+    Start (Monday 00:00 UTC) of the partition `moment` falls into.
+    """
+    day = moment.astimezone(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day - timedelta(days=day.weekday())
+
+
+def partition_name(start: datetime) -> str:
+    return f"{_PREFIX}{start:%Y%m%d}"
+
+
+def create_partition_sql(start: datetime) -> str:
+    end = start + timedelta(days=PARTITION_DAYS)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF refresh_tokens "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+async def _partitions(db: AsyncSession) -> dict[str, datetime]:
+    result = await db.execute(text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits "
+        "WHERE inhparent = 'refresh_tokens'::regclass"
+    ))
+    partitions = {}
+    for (name,) in result:
+        if name.startswith(_PREFIX):
+            start = datetime.strptime(name[len(_PREFIX):], "%Y%m%d").replace(tzinfo=timezone.utc)
+            partitions[name] = start
+    return partitions
+
+
+async def create_future_partitions(db: AsyncSession) -> list[str]:
+    """
+    Make sure every token issued from now on has a partition to land in:
+    up to REFRESH_TOKEN_EXPIRE_DAYS plus one spare week ahead.
+    """
+    now = datetime.now(timezone.utc)
+    existing = await _partitions(db)
+    horizon = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS + PARTITION_DAYS)
+    created = []
+    start = partition_start(now)
+    while start <= horizon:
+        if partition_name(start) not in existing:
+            await db.execute(text(create_partition_sql(start)))
+            created.append(partition_name(start))
+        start += timedelta(days=PARTITION_DAYS)
+    await db.commit()
+    return created
+
+
+async def drop_expired_partitions(db: AsyncSession) -> list[str]:
+    """
+    Drop partitions whose whole range lies in the past.
+    """
+    now = datetime.now(timezone.utc)
+    dropped = []
+    for name, start in sorted((await _partitions(db)).items(), key=lambda item: item[1]):
+        if start + timedelta(days=PARTITION_DAYS) > now:
+            break
+        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped.append(name)
+    await db.commit()
+    return dropped
+
+
+async def maintain_refresh_tokens() -> None:
+    from app.database import _async_session
+
+    async with _async_session() as db:
+        created = await create_future_partitions(db)
+        dropped = await drop_expired_partitions(db)
+        purged = await purge_expired_revocations(db)
+    if created or dropped:
+        logger.info("refresh_tokens partitions created: %s, dropped: %s", created, dropped)
+    if purged:
+        logger.info("Purged %d expired token revocations", purged)
+
+
+async def run_token_maintenance_loop() -> None:
+    while True:
+        try:
+            await maintain_refresh_tokens()
+        except Exception:
+            logger.exception("refresh_tokens maintenance failed")
+        await asyncio.sleep(settings.REFRESH_TOKEN_MAINTENANCE_INTERVAL_SECONDS)
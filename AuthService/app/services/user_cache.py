@@ -0,0 +1,102 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from app.config import settings
+
+_FAILED = object()
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """
+    The fields of a user that authenticated requests need; never holds
+    the password hash.
+    """
+    id: str
+    email: str
+    created_at: datetime
+
+
+class UserCache:
+    """
+    Per-worker TTL + LRU cache of user snapshots keyed by user ID.
+
+    Concurrent misses for the same user share one load (single flight).
+    Entries are dropped on password change and user-level revocation,
+    and otherwise live `ttl` seconds, which bounds how long another
+    worker's change can go unseen here.
+    """
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[UserSnapshot, float]] = OrderedDict()
+        self._loading: dict[str, asyncio.Future] = {}
+        self._stale: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    async def get(
+        self,
+        user_id: str,
+        load: Callable[[], Awaitable[UserSnapshot | None]]
+    ) -> UserSnapshot | None:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            snapshot, expires_at = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return snapshot
+            del self._entries[user_id]
+
+        pending = self._loading.get(user_id)
+        if pending is not None:
+            snapshot = await asyncio.shield(pending)
+            if snapshot is not _FAILED:
+                self.hits += 1
+                return snapshot
+            # Первая загрузка упала — пробуем сами, без кеширования
+            self.misses += 1
+            return await load()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[user_id] = future
+        self._stale.discard(user_id)
+        try:
+            snapshot = await load()
+        except BaseException:
+            future.set_result(_FAILED)
+            raise
+        finally:
+            self._loading.pop(user_id, None)
+        future.set_result(snapshot)
+        # Загрузка могла пересечься с инвалидацией — тогда не кешируем
+        if snapshot is not None and user_id not in self._stale:
+            self._entries[user_id] = (snapshot, time.monotonic() + self._ttl)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        self._stale.discard(user_id)
+        return snapshot
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+        if user_id in self._loading:
+            self._stale.add(user_id)
+
+    def metrics(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_SIZE)
@@ -0,0 +1,205 @@
+"""
+Bulk user import and export over COPY.
+
+Import streams rows from CSV or NDJSON, validates them in batches,
+COPYs each batch into a temporary staging table and merges it into
+`users` with one INSERT ... SELECT ... ON CONFLICT. Passwords are taken
+as existing bcrypt/argon2 hashes, so nothing is hashed during import;
+users whose hash parameters differ from the current policy are rehashed
+on their next login.
+"""
+import csv
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import IO, Iterator
+
+import asyncpg
+import ulid
+from email_validator import EmailNotValidError, validate_email
+
+from app.config import settings
+from app.services.password_service import Argon2Hasher
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("id", "email", "hashed_password", "created_at")
+_BCRYPT_RE = re.compile(r"^\$2[aby]\$\d{2}\$[./A-Za-z0-9]{53}$")
+_ARGON2_RE = re.compile(r"^\$argon2(id|i|d)\$.+$")
+_ULID_RE = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$")
+
+_STAGING = """
+    CREATE TEMPORARY TABLE users_import (
+        id VARCHAR(26) NOT NULL,
+        email VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL
+    )
+"""
+# DISTINCT ON: одна строка на email, иначе ON CONFLICT DO UPDATE
+# упадёт на дубликатах внутри пачки
+_MERGE_SKIP = """
+    WITH inserted AS (
+        INSERT INTO users (id, email, hashed_password, created_at)
+        SELECT DISTINCT ON (email) id, email, hashed_password, created_at
+        FROM users_import
+        ORDER BY email, created_at
+        ON CONFLICT DO NOTHING
+        RETURNING 1
+    )
+    SELECT count(*) FROM inserted
+"""
+_MERGE_UPDATE = """
+    WITH merged AS (
+        INSERT INTO users (id, email, hashed_password, created_at)
+        SELECT DISTINCT ON (email) id, email, hashed_password, created_at
+        FROM users_import
+        ORDER BY email, created_at
+        ON CONFLICT (email) DO UPDATE SET hashed_password = excluded.hashed_password
+        RETURNING 1
+    )
+    SELECT count(*) FROM merged
+"""
+
+
+@dataclass
+class ImportReport:
+    read: int = 0
+    rejected: int = 0
+    written: int = 0
+    rejects: list[dict] = field(default_factory=list)
+
+
+def _dsn() -> str:
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[dict | str]:
+    """
+    CSV rows as dicts; NDJSON lines unparsed, so that a broken line is
+    rejected on its own by `parse_row` instead of stopping the import.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def parse_row(raw: dict | str) -> dict:
+    if isinstance(raw, dict):
+        return raw
+    row = json.loads(raw)
+    if not isinstance(row, dict):
+        raise ValueError("line is not a JSON object")
+    return row
+
+
+def validate_row(row: dict) -> tuple:
+    """
+    Staging tuple for a row; raises ValueError with the reason otherwise.
+    """
+    email = (row.get("email") or "").strip()
+    try:
+        email = validate_email(email, check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(f"invalid email: {e}")
+
+    hashed_password = (row.get("hashed_password") or row.get("password_hash") or "").strip()
+    if _ARGON2_RE.match(hashed_password):
+        # Без argon2-cffi такой пользователь не сможет войти
+        if Argon2Hasher is None:
+            raise ValueError("argon2 hashes need argon2-cffi, which is not installed")
+    elif not _BCRYPT_RE.match(hashed_password):
+        raise ValueError("hashed_password is not a bcrypt or argon2 hash")
+
+    user_id = (row.get("id") or "").strip().upper() or ulid.new().str
+    if not _ULID_RE.match(user_id):
+        raise ValueError("id is not a ULID")
+
+    created_at = row.get("created_at")
+    if created_at:
+        created_at = datetime.fromisoformat(str(created_at).replace("Z", "+00:00"))
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+    else:
+        created_at = datetime.now(timezone.utc)
+    return user_id, email, hashed_password, created_at
+
+
+async def _load_batch(conn: asyncpg.Connection, batch: list[tuple], merge: str) -> int:
+    async with conn.transaction():
+        await conn.copy_records_to_table("users_import", records=batch, columns=FIELDS)
+        written = await conn.fetchval(merge)
+        await conn.execute("TRUNCATE users_import")
+    return written
+
+
+async def import_users(
+    stream: IO[str],
+    fmt: str,
+    batch_size: int,
+    update_existing: bool = False,
+    max_rejects_kept: int = 1000,
+) -> ImportReport:
+    """
+    Import users; existing emails are skipped, or get the imported hash
+    with `update_existing`. Each batch is committed separately.
+    """
+    report = ImportReport()
+    merge = _MERGE_UPDATE if update_existing else _MERGE_SKIP
+    conn = await asyncpg.connect(_dsn())
+    try:
+        await conn.execute(_STAGING)
+        batch: list[tuple] = []
+        for line_no, raw in enumerate(read_rows(stream, fmt), start=1):
+            report.read += 1
+            row = None
+            try:
+                row = parse_row(raw)
+                batch.append(validate_row(row))
+            except (ValueError, TypeError, AttributeError) as e:
+                report.rejected += 1
+                if len(report.rejects) < max_rejects_kept:
+                    email = row.get("email") if row is not None else None
+                    report.rejects.append({"line": line_no, "email": email, "reason": str(e)})
+                continue
+            if len(batch) >= batch_size:
+                report.written += await _load_batch(conn, batch, merge)
+                logger.info("Imported %d of %d rows read", report.written, report.read)
+                batch = []
+        if batch:
+            report.written += await _load_batch(conn, batch, merge)
+    finally:
+        await conn.close()
+    return report
+
+
+async def export_users(stream: IO[bytes], fmt: str) -> int:
+    """
+    Stream all users ordered by id into a binary stream; returns the
+    number of rows. The output contains password hashes.
+    """
+    query = "SELECT id, email, hashed_password, created_at FROM users ORDER BY id"
+    conn = await asyncpg.connect(_dsn())
+    try:
+        if fmt == "csv":
+            status = await conn.copy_from_query(query, output=stream, format="csv", header=True)
+            return int(status.split()[-1])
+        count = 0
+        async with conn.transaction():
+            async for record in conn.cursor(query, prefetch=10_000):
+                stream.write(json.dumps({
+                    "id": record["id"],
+                    "email": record["email"],
+                    "hashed_password": record["hashed_password"],
+                    "created_at": record["created_at"].isoformat(),
+                }).encode("utf-8") + b"\n")
+                count += 1
+        return count
+    finally:
+        await conn.close()
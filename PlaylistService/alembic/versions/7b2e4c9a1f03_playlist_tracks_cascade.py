@@ -0,0 +1,37 @@
+"""playlist_tracks cascade on playlist delete
+
+Revision ID: 7b2e4c9a1f03
+Revises: ce12c32cb500
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b2e4c9a1f03'
+down_revision: Union[str, None] = 'ce12c32cb500'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Удаление плейлиста удаляет его треки в базе, без загрузки коллекции в ORM
+    op.drop_constraint('playlist_tracks_playlist_id_fkey', 'playlist_tracks', type_='foreignkey')
+    op.create_foreign_key(
+        'playlist_tracks_playlist_id_fkey', 'playlist_tracks', 'playlists',
+        ['playlist_id'], ['id'], ondelete='CASCADE'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('playlist_tracks_playlist_id_fkey', 'playlist_tracks', type_='foreignkey')
+    op.create_foreign_key(
+        'playlist_tracks_playlist_id_fkey', 'playlist_tracks', 'playlists',
+        ['playlist_id'], ['id']
+    )
@@ -0,0 +1,28 @@
+"""playlist_tracks track_id index
+
+Revision ID: 8e3d6b1f4c97
+Revises: f4b91c7d2a65
+Create Date: 2026-10-19 18:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3d6b1f4c97'
+down_revision: Union[str, None] = 'f4b91c7d2a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_playlist_tracks_track_id', 'playlist_tracks', ['track_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_playlist_tracks_track_id', table_name='playlist_tracks')
@@ -0,0 +1,65 @@
+"""playlist_tracks fractional order_key
+
+Revision ID: 9c4d1e7a2b58
+Revises: 7b2e4c9a1f03
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.order_keys import keys_after
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4d1e7a2b58'
+down_revision: Union[str, None] = '7b2e4c9a1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('playlist_tracks', sa.Column('order_key', sa.String(length=255, collation='C'), nullable=True))
+
+    # Ключи в прежнем порядке: n-й трек каждого плейлиста получает n-й ключ
+    bind = op.get_bind()
+    longest = bind.execute(sa.text(
+        "SELECT coalesce(max(n), 0) FROM (SELECT count(*) AS n FROM playlist_tracks GROUP BY playlist_id) counts"
+    )).scalar_one()
+    if longest:
+        bind.execute(sa.text("""
+            UPDATE playlist_tracks pt SET order_key = k.key
+            FROM (
+                SELECT playlist_id, track_id,
+                       row_number() OVER (PARTITION BY playlist_id ORDER BY "order" NULLS LAST, added_at, track_id) AS position
+                FROM playlist_tracks
+            ) ranked
+            JOIN unnest(CAST(:keys AS varchar[])) WITH ORDINALITY AS k(key, position) ON k.position = ranked.position
+            WHERE pt.playlist_id = ranked.playlist_id AND pt.track_id = ranked.track_id
+        """), {"keys": keys_after(None, longest)})
+
+    op.alter_column('playlist_tracks', 'order_key', nullable=False)
+    op.create_index(
+        'ix_playlist_tracks_playlist_id_order_key', 'playlist_tracks',
+        ['playlist_id', 'order_key', 'track_id'], unique=False
+    )
+    op.drop_column('playlist_tracks', 'order')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('playlist_tracks', sa.Column('order', sa.Integer(), nullable=True))
+    op.execute("""
+        UPDATE playlist_tracks pt SET "order" = ranked.position
+        FROM (
+            SELECT playlist_id, track_id,
+                   row_number() OVER (PARTITION BY playlist_id ORDER BY order_key, track_id) - 1 AS position
+            FROM playlist_tracks
+        ) ranked
+        WHERE pt.playlist_id = ranked.playlist_id AND pt.track_id = ranked.track_id
+    """)
+    op.drop_index('ix_playlist_tracks_playlist_id_order_key', table_name='playlist_tracks')
+    op.drop_column('playlist_tracks', 'order_key')
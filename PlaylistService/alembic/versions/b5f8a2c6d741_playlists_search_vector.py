@@ -0,0 +1,42 @@
+"""playlists stored search_vector with GIN index
+
+Revision ID: b5f8a2c6d741
+Revises: 9c4d1e7a2b58
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f8a2c6d741'
+down_revision: Union[str, None] = '9c4d1e7a2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Конфигурация берётся из SEARCH_TEXT_CONFIG на момент миграции
+    op.add_column('playlists', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            f"to_tsvector('{settings.SEARCH_TEXT_CONFIG}'::regconfig, title || ' ' || coalesce(description, ''))",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    op.create_index('ix_playlists_search_vector', 'playlists', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_playlists_search_vector', table_name='playlists', postgresql_using='gin')
+    op.drop_column('playlists', 'search_vector')
@@ -0,0 +1,53 @@
+"""playlist aggregates and track durations
+
+Revision ID: d2a7c4e91f36
+Revises: b5f8a2c6d741
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c4e91f36'
+down_revision: Union[str, None] = 'b5f8a2c6d741'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('playlists', sa.Column('track_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('playlists', sa.Column('total_duration_seconds', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('playlists', sa.Column('cover_track_id', sa.String(length=26), nullable=True))
+    op.add_column('playlist_tracks', sa.Column('duration_seconds', sa.Integer(), nullable=True))
+
+    # Длительности заполнит python -m app.commands.reconcile_playlists
+    op.execute("""
+        UPDATE playlists p
+        SET track_count = s.track_count,
+            cover_track_id = (
+                SELECT pt.track_id FROM playlist_tracks pt
+                WHERE pt.playlist_id = p.id
+                ORDER BY pt.order_key, pt.track_id
+                LIMIT 1
+            )
+        FROM (SELECT playlist_id, count(*) AS track_count FROM playlist_tracks GROUP BY playlist_id) s
+        WHERE s.playlist_id = p.id
+    """)
+
+    op.create_index('ix_playlists_user_id_created_at', 'playlists', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_playlists_user_id', table_name='playlists')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_playlists_user_id', 'playlists', ['user_id'], unique=False)
+    op.drop_index('ix_playlists_user_id_created_at', table_name='playlists')
+    op.drop_column('playlist_tracks', 'duration_seconds')
+    op.drop_column('playlists', 'cover_track_id')
+    op.drop_column('playlists', 'total_duration_seconds')
+    op.drop_column('playlists', 'track_count')
@@ -0,0 +1,46 @@
+"""playlist change log
+
+Revision ID: f4b91c7d2a65
+Revises: d2a7c4e91f36
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b91c7d2a65'
+down_revision: Union[str, None] = 'd2a7c4e91f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('playlist_changes',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.String(length=26), nullable=False),
+    sa.Column('playlist_id', sa.String(length=26), nullable=False),
+    sa.Column('track_id', sa.String(length=26), nullable=True),
+    sa.Column('op', sa.String(length=6), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_playlist_changes_user_id_id', 'playlist_changes', ['user_id', 'id'], unique=False)
+    op.create_index('ix_playlist_changes_created_at', 'playlist_changes', ['created_at'], unique=False)
+    op.create_table('playlist_change_horizon',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('purged_through', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('playlist_change_horizon')
+    op.drop_index('ix_playlist_changes_created_at', table_name='playlist_changes')
+    op.drop_index('ix_playlist_changes_user_id_id', table_name='playlist_changes')
+    op.drop_table('playlist_changes')
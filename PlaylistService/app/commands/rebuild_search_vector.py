@@ -0,0 +1,44 @@
+"""
+Recreate playlists.search_vector and its GIN index with the current
+SEARCH_TEXT_CONFIG.
+
+    SEARCH_TEXT_CONFIG=english python -m app.commands.rebuild_search_vector
+
+The generated column fixes its text search configuration at creation
+time, so after changing SEARCH_TEXT_CONFIG run this once, then restart
+the service so that queries use the same configuration. The table is
+rewritten and locked while the column is recomputed.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.models import search_document
+
+logger = logging.getLogger(__name__)
+
+
+async def rebuild_search_vector() -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("ALTER TABLE playlists DROP COLUMN IF EXISTS search_vector"))
+        await conn.execute(text(
+            "ALTER TABLE playlists ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({search_document(settings.SEARCH_TEXT_CONFIG)}) STORED"
+        ))
+        await conn.execute(text(
+            "CREATE INDEX ix_playlists_search_vector ON playlists USING gin (search_vector)"
+        ))
+    await engine.dispose()
+    logger.info("search_vector rebuilt with config %s", settings.SEARCH_TEXT_CONFIG)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(rebuild_search_vector())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Remove tracks deleted in TrackService from playlists, fill in missing
+track durations and recompute drifted playlist aggregates (track count,
+total duration, cover).
+
+    python -m app.commands.reconcile_playlists
+
+The service runs the same job at startup and every
+PLAYLIST_RECONCILE_INTERVAL_SECONDS; run it by hand right after the
+migration to fetch durations for existing tracks.
+"""
+import asyncio
+import logging
+
+import httpx
+
+from app.config import settings
+from app.services.aggregate_service import reconcile_playlists
+from app.track_client import TrackClient
+from app.track_registry import TrackRegistry
+
+
+async def _run() -> None:
+    track_client = TrackClient(settings.TRACK_SERVICE_URL, timeout=settings.TRACK_SERVICE_TIMEOUT_SECONDS)
+    track_registry = TrackRegistry(
+        settings.TRACK_SERVICE_URL,
+        token=settings.INTERNAL_API_TOKEN.get_secret_value() if settings.INTERNAL_API_TOKEN else None,
+    )
+    async with httpx.AsyncClient(base_url=settings.TRACK_SERVICE_URL, timeout=30, headers=track_registry.headers) as client:
+        await track_registry.load_snapshot(client)
+    try:
+        await reconcile_playlists(track_client, track_registry)
+    finally:
+        await track_client.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -10,11 +10,34 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: SecretStr = Field(..., env="DATABASE_PASSWORD")
     DATABASE_NAME: str        = Field(..., env="DATABASE_NAME")
 
-    PUBLIC_KEY_PATH: str    = Field(..., env="PUBLIC_KEY_PATH")
+    PUBLIC_KEY_PATH: str | None = Field(None, env="PUBLIC_KEY_PATH")
+    JWKS_URL: str | None    = Field(None, env="JWKS_URL")
+    JWKS_REFRESH_SECONDS: int = Field(300, env="JWKS_REFRESH_SECONDS")
+    JWT_CACHE_SIZE: int     = Field(10_000, env="JWT_CACHE_SIZE")
+    REVOCATIONS_URL: str | None = Field(None, env="REVOCATIONS_URL")
+    REVOCATION_POLL_SECONDS: float = Field(2, env="REVOCATION_POLL_SECONDS")
+    INTERNAL_API_TOKEN: SecretStr | None = Field(None, env="INTERNAL_API_TOKEN")
     ALGORITHM: str          = Field(..., env="ALGORITHM")
+    ACCEPTED_ALGORITHMS: list[str] = Field([], env="ACCEPTED_ALGORITHMS")
     ISSUER: str             = Field(..., env="ISSUER")
     AUDIENCE: str           = Field(..., env="AUDIENCE")
 
+    PLAYLIST_PREVIEW_TRACKS: int = Field(5, env="PLAYLIST_PREVIEW_TRACKS")
+    ORDER_KEY_REBALANCE_LENGTH: int = Field(48, env="ORDER_KEY_REBALANCE_LENGTH")
+    TRACK_SERVICE_URL: str  = Field("http://track_service:8003", env="TRACK_SERVICE_URL")
+    TRACK_METADATA_TTL_SECONDS: float = Field(30, env="TRACK_METADATA_TTL_SECONDS")
+    TRACK_METADATA_CACHE_SIZE: int = Field(50_000, env="TRACK_METADATA_CACHE_SIZE")
+    TRACK_SERVICE_CONCURRENCY: int = Field(8, env="TRACK_SERVICE_CONCURRENCY")
+    TRACK_SERVICE_TIMEOUT_SECONDS: float = Field(3, env="TRACK_SERVICE_TIMEOUT_SECONDS")
+    TRACK_EVENTS_POLL_SECONDS: float = Field(2, env="TRACK_EVENTS_POLL_SECONDS")
+    PLAYLIST_RECONCILE_INTERVAL_SECONDS: int = Field(3600, env="PLAYLIST_RECONCILE_INTERVAL_SECONDS")
+    # Курсор /playlists/changes старше этого срока получает 410 и полную синхронизацию
+    PLAYLIST_CHANGES_RETENTION_DAYS: int = Field(30, env="PLAYLIST_CHANGES_RETENTION_DAYS")
+    PLAYLIST_CHANGES_PURGE_INTERVAL_SECONDS: int = Field(3600, env="PLAYLIST_CHANGES_PURGE_INTERVAL_SECONDS")
+    # Конфигурация полнотекстового поиска PostgreSQL; в russian латиница
+    # стеммится по-английски. После смены — python -m app.commands.rebuild_search_vector
+    SEARCH_TEXT_CONFIG: str = Field("russian", env="SEARCH_TEXT_CONFIG", pattern=r"^[a-z_]+$")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,9 +1,37 @@
 from fastapi import Depends, HTTPException, Cookie
-from jose import jwt, JWTError
 from pathlib import Path
 from app.config import settings
+from app.jwt_verifier import JWTVerifier, TokenError
+from app.revocation_list import RevocationList
+from app.track_client import TrackClient
+from app.track_registry import TrackRegistry
 
-_PUBLIC_KEY = Path(settings.PUBLIC_KEY_PATH).read_text()
+verifier = JWTVerifier(
+    algorithms=[settings.ALGORITHM, *settings.ACCEPTED_ALGORITHMS],
+    issuer=settings.ISSUER,
+    audience=settings.AUDIENCE,
+    jwks_url=settings.JWKS_URL,
+    fallback_pem=Path(settings.PUBLIC_KEY_PATH).read_text() if settings.PUBLIC_KEY_PATH else None,
+    refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+    cache_size=settings.JWT_CACHE_SIZE,
+)
+revocations = RevocationList(
+    settings.REVOCATIONS_URL,
+    settings.REVOCATION_POLL_SECONDS,
+    token=settings.INTERNAL_API_TOKEN.get_secret_value() if settings.INTERNAL_API_TOKEN else None,
+)
+track_client = TrackClient(
+    settings.TRACK_SERVICE_URL,
+    ttl=settings.TRACK_METADATA_TTL_SECONDS,
+    cache_size=settings.TRACK_METADATA_CACHE_SIZE,
+    concurrency=settings.TRACK_SERVICE_CONCURRENCY,
+    timeout=settings.TRACK_SERVICE_TIMEOUT_SECONDS,
+)
+track_registry = TrackRegistry(
+    settings.TRACK_SERVICE_URL,
+    poll_seconds=settings.TRACK_EVENTS_POLL_SECONDS,
+    token=settings.INTERNAL_API_TOKEN.get_secret_value() if settings.INTERNAL_API_TOKEN else None,
+)
 
 async def get_current_user_id(
     access_token: str = Cookie(None),
@@ -11,13 +39,9 @@ async def get_current_user_id(
     if not access_token:
         raise HTTPException(401, "Missing access token")
     try:
-        payload = jwt.decode(
-            access_token,
-            _PUBLIC_KEY,
-            algorithms=[settings.ALGORITHM],
-            issuer=settings.ISSUER,
-            audience=settings.AUDIENCE,
-        )
-    except JWTError as e:
+        payload = verifier.verify(access_token)
+    except TokenError as e:
         raise HTTPException(401, f"Invalid token: {e}")
+    if revocations.is_revoked(payload):
+        raise HTTPException(401, "Token has been revoked")
     return payload["sub"] 
\ No newline at end of file
@@ -1,6 +1,11 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.routers.playlists import router as playlists_router
+from app.dependencies import verifier, revocations, track_client, track_registry
+from app.services.aggregate_service import run_reconcile_loop, remove_deleted_tracks
+from app.services.change_service import run_change_purge_loop
 
 app = FastAPI(title="Namity-Playlist")
 
@@ -12,6 +17,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_background_tasks: list[asyncio.Task] = []
+
+@app.on_event("startup")
+async def startup():
+    _background_tasks.append(asyncio.create_task(verifier.run_refresh_loop()))
+    _background_tasks.append(asyncio.create_task(revocations.run_sync_loop()))
+    await track_client.start()
+    _background_tasks.append(asyncio.create_task(track_registry.run_sync_loop(remove_deleted_tracks)))
+    _background_tasks.append(asyncio.create_task(run_reconcile_loop(track_client, track_registry)))
+    _background_tasks.append(asyncio.create_task(run_change_purge_loop()))
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await track_client.close()
+
 app.include_router(playlists_router)
 
 if __name__ == "__main__":
@@ -1,21 +1,92 @@
 import ulid
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, ForeignKey, func
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, BigInteger, DateTime, ForeignKey, Index, Computed, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship, query_expression
+from app.config import settings
 from app.database import Base
 
+def search_document(config: str) -> str:
+    """
+    SQL of the generated `playlists.search_vector` column.
+    """
+    return f"to_tsvector('{config}'::regconfig, title || ' ' || coalesce(description, ''))"
+
 class Playlist(Base):
     __tablename__ = "playlists"
+    __table_args__ = (
+        Index("ix_playlists_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_playlists_user_id_created_at", "user_id", "created_at"),
+    )
     id: Mapped[str] = mapped_column(String(26), primary_key=True, default=lambda: ulid.new().str, unique=True, index=True)
-    user_id: Mapped[str] = mapped_column(String(26), index=True)
+    user_id: Mapped[str] = mapped_column(String(26))
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[str] = mapped_column(String(1000), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Агрегаты по playlist_tracks: меняются в той же транзакции, что и треки,
+    # и периодически сверяются (app/services/aggregate_service.py)
+    track_count: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    total_duration_seconds: Mapped[int] = mapped_column(Integer, server_default="0", nullable=False)
+    cover_track_id: Mapped[str | None] = mapped_column(String(26), nullable=True)
+    # Вычисляется базой; в выборки не попадает, нужен только для поиска по индексу
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        Computed(search_document(settings.SEARCH_TEXT_CONFIG), persisted=True),
+        deferred=True,
+        deferred_raiseload=True,
+    )
+    # ts_rank, заполняется только поиском
+    search_rank: Mapped[float | None] = query_expression()
+    # Треки загружаются только явно (selectinload или playlist_service),
+    # случайная ленивая загрузка на каждый плейлист падает с ошибкой
+    tracks: Mapped[list["PlaylistTrack"]] = relationship(
+        lazy="raise_on_sql",
+        order_by=lambda: [PlaylistTrack.order_key, PlaylistTrack.track_id],
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
 
 class PlaylistTrack(Base):
     __tablename__ = "playlist_tracks"
-    playlist_id: Mapped[str] = mapped_column(String(26), ForeignKey("playlists.id"), primary_key=True)
+    __table_args__ = (
+        # Упорядоченное чтение плейлиста идёт по индексу, без сортировки
+        Index("ix_playlist_tracks_playlist_id_order_key", "playlist_id", "order_key", "track_id"),
+        # Удаление трека из всех плейлистов, когда его удалили в TrackService
+        Index("ix_playlist_tracks_track_id", "track_id"),
+    )
+    playlist_id: Mapped[str] = mapped_column(String(26), ForeignKey("playlists.id", ondelete="CASCADE"), primary_key=True)
     track_id: Mapped[str] = mapped_column(String(26), primary_key=True)
-    order: Mapped[int] = mapped_column(Integer, nullable=True)
-    added_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False) 
\ No newline at end of file
+    # Дробный ключ порядка (app/services/order_keys.py), сравнивается побайтно
+    order_key: Mapped[str] = mapped_column(String(255, collation="C"), nullable=False)
+    added_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Копия длительности из TrackService; NULL — ещё неизвестна
+    duration_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+
+class PlaylistChange(Base):
+    """
+    One entry of a user's change log: a playlist (`track_id` is NULL) or
+    one of its tracks was written ("upsert") or removed ("delete").
+    Written in the transaction of the change; ids of one user grow in
+    commit order (app/services/change_service.py).
+    """
+    __tablename__ = "playlist_changes"
+    __table_args__ = (
+        Index("ix_playlist_changes_user_id_id", "user_id", "id"),
+        Index("ix_playlist_changes_created_at", "created_at"),
+    )
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(26), nullable=False)
+    playlist_id: Mapped[str] = mapped_column(String(26), nullable=False)
+    track_id: Mapped[str | None] = mapped_column(String(26), nullable=True)
+    op: Mapped[str] = mapped_column(String(6), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class PlaylistChangeHorizon(Base):
+    """
+    Single row: the largest change id removed by retention. Cursors
+    below it have lost changes and must start over with a full sync.
+    """
+    __tablename__ = "playlist_change_horizon"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    purged_through: Mapped[int] = mapped_column(BigInteger, server_default="0", nullable=False)
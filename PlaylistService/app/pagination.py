@@ -0,0 +1,26 @@
+"""
+Opaque keyset cursors: the sort key of the last returned row, as
+URL-safe base64 of a JSON array.
+"""
+import base64
+import json
+
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    Values of a cursor made by `encode_cursor`; ValueError if it is
+    malformed or does not hold exactly `size` values.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
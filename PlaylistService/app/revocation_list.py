@@ -0,0 +1,80 @@
+"""
+Local replica of the AuthService token revocation feed.
+"""
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class RevocationList:
+    """
+    Revoked access tokens, checked in memory on every request.
+
+    Two kinds of entries come from the feed: a single token (`jti`) and
+    a whole user (`user_id` with `revoked_before`), which revokes every
+    token of that user issued before the given moment. Each entry is
+    kept only until `expires_at`, after which the tokens it covers have
+    expired anyway, so the sets stay as small as the number of
+    revocations within one access-token lifetime. A check is one or two
+    dict lookups.
+
+    `run_sync_loop` polls the feed every `poll_seconds` with the last
+    cursor; the feed repeats its most recent entries, so applying them
+    is idempotent. If the feed is unreachable, tokens revoked since the
+    last successful poll stay accepted until it comes back.
+    """
+
+    def __init__(self, feed_url: str | None = None, poll_seconds: float = 2, token: str | None = None) -> None:
+        self._feed_url = feed_url
+        self._poll_seconds = poll_seconds
+        self._headers = {"X-Internal-Token": token} if token else {}
+        self._cursor = 0
+        self._jtis: dict[str, float] = {}
+        self._users: dict[str, tuple[float, float]] = {}
+
+    def apply(self, feed: dict) -> None:
+        for entry in feed.get("revocations", []):
+            if entry.get("jti"):
+                self._jtis[entry["jti"]] = entry["expires_at"]
+            elif entry.get("user_id"):
+                current = self._users.get(entry["user_id"])
+                if current is None or current[0] < entry["revoked_before"]:
+                    self._users[entry["user_id"]] = (entry["revoked_before"], entry["expires_at"])
+        self._cursor = max(self._cursor, feed.get("cursor", 0))
+        self._prune()
+
+    def _prune(self) -> None:
+        now = time.time()
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+        self._users = {user: entry for user, entry in self._users.items() if entry[1] > now}
+
+    def is_revoked(self, claims: dict) -> bool:
+        if self._jtis and claims.get("jti") in self._jtis:
+            return True
+        if self._users:
+            entry = self._users.get(claims.get("sub"))
+            # Токены без iat выданы до появления отзыва — считаем старыми.
+            # iat в целых секундах: токен, выданный в ту же секунду после отзыва, действителен
+            if entry is not None and claims.get("iat", 0) < int(entry[0]):
+                return True
+        return False
+
+    async def sync(self, client: httpx.AsyncClient) -> None:
+        response = await client.get(self._feed_url, params={"since": self._cursor})
+        response.raise_for_status()
+        self.apply(response.json())
+
+    async def run_sync_loop(self) -> None:
+        if not self._feed_url:
+            return
+        async with httpx.AsyncClient(timeout=5, headers=self._headers) as client:
+            while True:
+                try:
+                    await self.sync(client)
+                except Exception as e:
+                    logger.warning("Revocation feed sync failed: %s", e)
+                await asyncio.sleep(self._poll_seconds)
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import NoResultFound
-from app.schemas import PlaylistCreate, PlaylistRead, PlaylistUpdate, PlaylistTrackAdd, PlaylistTrackRead
+from app.config import settings
+from app.pagination import encode_cursor, decode_cursor
+from app.schemas import (
+    PlaylistCreate, PlaylistRead, PlaylistUpdate, PlaylistTrackAdd, PlaylistTrackRead, TracksMode,
+    PlaylistTracksPatch, PlaylistTracksPatchResult, PlaylistTrackMove, PlaylistFullRead, PlaylistChangesRead,
+)
 from app.models import Playlist, PlaylistTrack
 from app.database import session_dependency
-from app.dependencies import get_current_user_id
+from app.dependencies import get_current_user_id, track_client, track_registry
 from app.services.playlist_service import (
     create_playlist as svc_create_playlist,
     list_user_playlists,
@@ -13,9 +18,14 @@ from app.services.playlist_service import (
     delete_playlist as svc_delete_playlist,
     remove_track_from_playlist as svc_remove_track_from_playlist,
     list_playlist_tracks as svc_list_playlist_tracks,
+    export_playlist_tracks as svc_export_playlist_tracks,
+    apply_track_operations,
+    move_track as svc_move_track,
     search_playlists,
     get_playlist_by_id,
+    get_playlist_full,
 )
+from app.services.change_service import current_cursor, list_changes
 
 router = APIRouter(prefix="/playlists", tags=["playlists"])
 
@@ -32,10 +42,36 @@ async def create_playlist(
 async def list_playlists(
     db: session_dependency,
     user_id: str = Depends(get_current_user_id),
+    tracks: TracksMode = Query("full"),
+    preview_size: int = Query(settings.PLAYLIST_PREVIEW_TRACKS, ge=1, le=100),
 ):
-    playlists = await list_user_playlists(user_id, db)
+    playlists = await list_user_playlists(user_id, db, tracks, preview_size)
     return playlists
 
+@router.get("/changes", response_model=PlaylistChangesRead)
+async def list_playlist_changes(
+    db: session_dependency,
+    user_id: str = Depends(get_current_user_id),
+    since: str | None = Query(None),
+    limit: int = Query(1000, ge=1, le=5000),
+):
+    """
+    What changed in the user's playlists after the `since` cursor. Without
+    `since` only the current cursor is returned: take it before the full
+    download and sync from it afterwards. 410 means the cursor is older
+    than the change log keeps, and the client has to download everything.
+    """
+    if since is None:
+        return {"cursor": encode_cursor(await current_cursor(user_id, db))}
+    try:
+        (after,) = decode_cursor(since, 1)
+        after = int(after)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    changes = await list_changes(user_id, after, limit, db)
+    changes["cursor"] = encode_cursor(changes["cursor"])
+    return changes
+
 @router.put("/{playlist_id}", response_model=PlaylistRead)
 async def update_playlist(
     playlist_id: str,
@@ -68,11 +104,41 @@ async def add_track_to_playlist(
     user_id: str = Depends(get_current_user_id),
 ):
     try:
-        playlist_track = await svc_add_track_to_playlist(user_id, playlist_id, data, db)
+        playlist_track = await svc_add_track_to_playlist(user_id, playlist_id, data, track_client, track_registry, db)
         return playlist_track
     except NoResultFound:
         raise HTTPException(status_code=404, detail="Playlist not found or forbidden")
 
+@router.patch("/{playlist_id}/tracks", response_model=PlaylistTracksPatchResult)
+async def patch_playlist_tracks(
+    playlist_id: str,
+    data: PlaylistTracksPatch,
+    db: session_dependency,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Add, remove and move many tracks in one transaction; the result of
+    each operation is reported separately.
+    """
+    try:
+        results = await apply_track_operations(user_id, playlist_id, data.operations, track_client, track_registry, db)
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="Playlist not found or forbidden")
+    return {"results": results}
+
+@router.post("/{playlist_id}/tracks/{track_id}/move", response_model=PlaylistTrackRead)
+async def move_track(
+    playlist_id: str,
+    track_id: str,
+    data: PlaylistTrackMove,
+    db: session_dependency,
+    user_id: str = Depends(get_current_user_id),
+):
+    try:
+        return await svc_move_track(user_id, playlist_id, track_id, data, db)
+    except NoResultFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 @router.delete("/{playlist_id}/tracks/{track_id}", status_code=204)
 async def remove_track_from_playlist(
     playlist_id: str,
@@ -88,33 +154,114 @@ async def remove_track_from_playlist(
 @router.get("/{playlist_id}/tracks", response_model=list[PlaylistTrackRead])
 async def get_playlist_tracks(
     playlist_id: str,
+    response: Response,
     db: session_dependency,
     user_id: str = Depends(get_current_user_id),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None),
 ):
+    """
+    Tracks in playlist order, a page at a time. X-Total-Count and
+    X-Total-Duration (seconds) describe the whole playlist; X-Next-Cursor
+    comes with every page that may have a next one.
+    """
+    after = None
+    if cursor:
+        try:
+            order_key, track_id = decode_cursor(cursor, 2)
+            after = (str(order_key), str(track_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
     try:
-        tracks = await svc_list_playlist_tracks(user_id, playlist_id, db)
-        return tracks
+        tracks, playlist = await svc_list_playlist_tracks(user_id, playlist_id, db, limit, after)
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="Playlist not found or forbidden")
+    response.headers["X-Total-Count"] = str(playlist.track_count)
+    response.headers["X-Total-Duration"] = str(playlist.total_duration_seconds)
+    if len(tracks) == limit:
+        last = tracks[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.order_key, last.track_id)
+    return tracks
+
+@router.get("/{playlist_id}/tracks/export")
+async def export_playlist_tracks(
+    playlist_id: str,
+    db: session_dependency,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Every track of the playlist as NDJSON, streamed.
+    """
+    try:
+        return await svc_export_playlist_tracks(playlist_id, db)
     except NoResultFound:
         raise HTTPException(status_code=404, detail="Playlist not found or forbidden")
 
 @router.get("/search", response_model=list[PlaylistRead])
 async def search(
+    response: Response,
     db: session_dependency,
     query: str = Query(..., min_length=1, max_length=100),
     limit: int = Query(10, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None),
+    tracks: TracksMode = Query("preview"),
+    preview_size: int = Query(settings.PLAYLIST_PREVIEW_TRACKS, ge=1, le=100),
+):
+    """
+    Search playlists by title or description. The next page is requested
+    with the cursor from the X-Next-Cursor header.
+    """
+    after = None
+    if cursor:
+        try:
+            rank, playlist_id = decode_cursor(cursor, 2)
+            after = (float(rank), str(playlist_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    playlists = await search_playlists(query, limit, db, after, tracks, preview_size)
+    if len(playlists) == limit:
+        last = playlists[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.search_rank, last.id)
+    return playlists
+
+@router.get("/{playlist_id}/full", response_model=PlaylistFullRead)
+async def get_playlist_with_tracks(
+    playlist_id: str,
+    response: Response,
+    db: session_dependency,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = Query(None),
 ):
     """
-    Search playlists by title or description.
+    The playlist with a page of its tracks and their metadata from
+    TrackService, paged like /{playlist_id}/tracks.
     """
-    return await search_playlists(query, limit, offset, db)
+    after = None
+    if cursor:
+        try:
+            order_key, track_id = decode_cursor(cursor, 2)
+            after = (str(order_key), str(track_id))
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        playlist = await get_playlist_full(playlist_id, track_client, db, limit, after)
+    except NoResultFound:
+        raise HTTPException(status_code=404, detail="Playlist not found")
+    response.headers["X-Total-Count"] = str(playlist.track_count)
+    response.headers["X-Total-Duration"] = str(playlist.total_duration_seconds)
+    if len(playlist.tracks) == limit:
+        last = playlist.tracks[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.order_key, last.track_id)
+    return playlist
 
 @router.get("/{playlist_id}", response_model=PlaylistRead)
 async def get_playlist(
     playlist_id: str,
     db: session_dependency,
+    tracks: TracksMode = Query("full"),
+    preview_size: int = Query(settings.PLAYLIST_PREVIEW_TRACKS, ge=1, le=100),
 ):
-    playlist = await get_playlist_by_id(playlist_id, db)
+    playlist = await get_playlist_by_id(playlist_id, db, tracks, preview_size)
     if not playlist:
         raise HTTPException(status_code=404, detail="Playlist not found")
     return playlist
\ No newline at end of file
@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 from datetime import datetime
 from ulid import ULID
 
+# Что отдавать в поле tracks: все треки, первые N, только количество или ничего
+TracksMode = Literal["full", "preview", "count", "none"]
+
 class PlaylistBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
     description: Optional[str] = Field(None, max_length=500)
@@ -15,21 +18,92 @@ class PlaylistUpdate(PlaylistBase):
 
 class PlaylistTrackAdd(BaseModel):
     track_id: str = Field(..., min_length=1)
-    order: int = Field(0, ge=0)  # По умолчанию 0, не может быть отрицательным
+
+class PlaylistTrackMove(BaseModel):
+    # Ставим сразу после after_track_id или перед before_track_id; без обоих — в конец
+    after_track_id: Optional[str] = None
+    before_track_id: Optional[str] = None
+
+class PlaylistTrackOperation(BaseModel):
+    op: Literal["add", "remove", "move"]
+    track_id: str = Field(..., min_length=1, max_length=26)
+    # Позиция для add и move; add без позиции добавляет в конец
+    after_track_id: Optional[str] = None
+    before_track_id: Optional[str] = None
+
+class PlaylistTracksPatch(BaseModel):
+    operations: List[PlaylistTrackOperation] = Field(..., min_length=1, max_length=1000)
+
+class PlaylistTrackOperationResult(BaseModel):
+    index: int
+    op: str
+    track_id: str
+    # added | added_anchor_not_found | already_present | track_not_found | removed | moved | not_found | anchor_not_found
+    # | duplicate_operation
+    status: str
+
+class PlaylistTracksPatchResult(BaseModel):
+    results: List[PlaylistTrackOperationResult]
 
 class PlaylistTrackRead(BaseModel):
     track_id: str
+    order_key: str
     added_at: datetime
+    duration_seconds: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+class PlaylistTrackChangeRead(PlaylistTrackRead):
+    playlist_id: str
+
+class PlaylistTrackKey(BaseModel):
+    playlist_id: str
+    track_id: str
+
+class TrackMetadata(BaseModel):
+    # Поля TrackRead из TrackService; остальные передаются как есть
+    id: str
+    title: str
+    duration_seconds: int
+    user_id: str
+
+    model_config = {"extra": "allow"}
+
+class PlaylistFullTrackRead(PlaylistTrackRead):
+    # None, если трек удалён или TrackService не ответил
+    track: Optional[TrackMetadata] = None
+
 class PlaylistRead(PlaylistBase):
     id: str
     user_id: str
     created_at: datetime
     updated_at: datetime
     tracks: List[PlaylistTrackRead] = []
+    track_count: int = 0
+    total_duration_seconds: int = 0
+    cover_track_id: Optional[str] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class PlaylistFullRead(PlaylistBase):
+    id: str
+    user_id: str
+    created_at: datetime
+    updated_at: datetime
+    track_count: int = 0
+    total_duration_seconds: int = 0
+    cover_track_id: Optional[str] = None
+    tracks: List[PlaylistFullTrackRead] = []
+
+class PlaylistChangesRead(BaseModel):
+    # Передаётся в since следующего запроса; has_more — изменения ещё остались
+    cursor: str
+    has_more: bool = False
+    # Текущее состояние изменённых плейлистов, без треков
+    playlists: List[PlaylistRead] = []
+    # Треки удалённого плейлиста отдельно не перечисляются
+    deleted_playlist_ids: List[str] = []
+    tracks: List[PlaylistTrackChangeRead] = []
+    deleted_tracks: List[PlaylistTrackKey] = []
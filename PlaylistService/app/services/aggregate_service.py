@@ -0,0 +1,254 @@
+"""
+Reconciliation of the aggregates stored on `playlists`.
+
+Track count, total duration and cover are kept up to date by every
+track mutation in its own transaction; this job repairs whatever still
+drifts (manual SQL, a crash between deploys) and fills in durations
+that TrackService could not provide when the track was added.
+
+Tracks deleted in TrackService are removed from playlists here as
+well: promptly when the feed replicated by `TrackRegistry` reports the
+deletion, and by a sweep against the registry for deletions the feed
+did not deliver (while the service was down, or before the feed existed).
+"""
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import String, Integer, column, delete, select, text, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import _async_session
+from app.models import Playlist, PlaylistTrack
+from app.services.change_service import UPSERT, DELETE, record_changes
+from app.track_client import TrackClient
+from app.track_registry import TrackRegistry
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+# Трек, добавленный недавно, мог ещё не дойти до реестра этого воркера
+SWEEP_MIN_AGE = timedelta(minutes=10)
+# Реестр, отставший от ленты дольше этого, для чистки не годится
+SWEEP_MAX_REGISTRY_AGE_SECONDS = 60
+
+_AGGREGATES = """
+    SELECT p.id,
+           coalesce(s.track_count, 0) AS track_count,
+           coalesce(s.total_duration_seconds, 0) AS total_duration_seconds,
+           (
+               SELECT pt.track_id FROM playlist_tracks pt
+               WHERE pt.playlist_id = p.id
+               ORDER BY pt.order_key, pt.track_id
+               LIMIT 1
+           ) AS cover_track_id
+    FROM playlists p
+    LEFT JOIN (
+        SELECT playlist_id, count(*) AS track_count, sum(duration_seconds) AS total_duration_seconds
+        FROM playlist_tracks
+        GROUP BY playlist_id
+    ) s ON s.playlist_id = p.id
+"""
+
+_DRIFTED = f"""
+    SELECT a.id FROM ({_AGGREGATES}) a
+    JOIN playlists p ON p.id = a.id
+    WHERE (p.track_count, p.total_duration_seconds, p.cover_track_id)
+          IS DISTINCT FROM (a.track_count, a.total_duration_seconds, a.cover_track_id)
+      AND a.id > :after
+    ORDER BY a.id
+    LIMIT :limit
+"""
+
+# Пересчёт после блокировки строк: новый снимок видит все закоммиченные изменения треков
+_RECOMPUTE = f"""
+    UPDATE playlists p
+    SET track_count = a.track_count,
+        total_duration_seconds = a.total_duration_seconds,
+        cover_track_id = a.cover_track_id
+    FROM ({_AGGREGATES} WHERE p.id = ANY(:ids)) a
+    WHERE p.id = a.id
+    RETURNING p.user_id, p.id
+"""
+
+
+async def _record_upserts(rows, db: AsyncSession) -> None:
+    """
+    Log (user_id, playlist_id, track_id) rows written by a job as
+    upserts, one user at a time in id order.
+    """
+    changes = defaultdict(list)
+    for user_id, playlist_id, track_id in rows:
+        changes[user_id].append((playlist_id, track_id, UPSERT))
+    for user_id in sorted(changes):
+        await record_changes(user_id, changes[user_id], db)
+
+
+async def fill_missing_durations(track_client: TrackClient, db: AsyncSession) -> int:
+    """
+    Look up durations of tracks stored without one; returns how many
+    tracks got a duration.
+    """
+    filled = 0
+    after = ""
+    while True:
+        result = await db.execute(
+            select(PlaylistTrack.track_id)
+            .where(PlaylistTrack.duration_seconds.is_(None), PlaylistTrack.track_id > after)
+            .group_by(PlaylistTrack.track_id)
+            .order_by(PlaylistTrack.track_id)
+            .limit(BATCH_SIZE)
+        )
+        track_ids = result.scalars().all()
+        if not track_ids:
+            return filled
+        after = track_ids[-1]
+        metadata = await track_client.get_tracks(track_ids)
+        if not metadata:
+            continue
+        rows = values(
+            column("track_id", String), column("duration_seconds", Integer), name="durations"
+        ).data([(track_id, track["duration_seconds"]) for track_id, track in metadata.items()])
+        result = await db.execute(
+            update(PlaylistTrack)
+            .where(
+                PlaylistTrack.track_id == rows.c.track_id,
+                PlaylistTrack.duration_seconds.is_(None),
+                Playlist.id == PlaylistTrack.playlist_id,
+            )
+            .values(duration_seconds=rows.c.duration_seconds)
+            .returning(Playlist.user_id, PlaylistTrack.playlist_id, PlaylistTrack.track_id)
+            .execution_options(synchronize_session=False)
+        )
+        await _record_upserts(result.all(), db)
+        await db.commit()
+        filled += len(metadata)
+
+
+async def reconcile_aggregates(db: AsyncSession) -> int:
+    """
+    Recompute the aggregates of playlists whose stored values differ
+    from their tracks; returns the number of playlists fixed.
+    """
+    fixed = 0
+    after = ""
+    while True:
+        result = await db.execute(text(_DRIFTED), {"after": after, "limit": BATCH_SIZE})
+        ids = result.scalars().all()
+        if not ids:
+            return fixed
+        after = ids[-1]
+        # Мутации треков сначала блокируют плейлист — блокируем так же
+        await db.execute(text("SELECT id FROM playlists WHERE id = ANY(:ids) ORDER BY id FOR UPDATE"), {"ids": ids})
+        result = await db.execute(text(_RECOMPUTE), {"ids": ids})
+        await _record_upserts([(user_id, playlist_id, None) for user_id, playlist_id in result.all()], db)
+        await db.commit()
+        fixed += len(ids)
+
+
+async def remove_tracks(track_ids: list[str], db: AsyncSession, added_before: datetime | None = None) -> int:
+    """
+    Remove the tracks from every playlist in one transaction, with the
+    playlists' aggregates and their owners' change logs; returns the
+    number of playlist entries removed.
+    """
+    where = [PlaylistTrack.track_id.in_(track_ids)]
+    if added_before is not None:
+        where.append(PlaylistTrack.added_at < added_before)
+    result = await db.execute(select(PlaylistTrack.playlist_id).where(*where).distinct())
+    playlist_ids = sorted(result.scalars())
+    if not playlist_ids:
+        return 0
+    # Мутации треков сначала блокируют плейлист — блокируем так же
+    await db.execute(select(Playlist.id).where(Playlist.id.in_(playlist_ids)).order_by(Playlist.id).with_for_update())
+    result = await db.execute(
+        delete(PlaylistTrack)
+        .where(*where, PlaylistTrack.playlist_id.in_(playlist_ids))
+        .returning(PlaylistTrack.playlist_id, PlaylistTrack.track_id)
+    )
+    removed = result.all()
+    result = await db.execute(text(_RECOMPUTE), {"ids": playlist_ids})
+    owners = {playlist_id: user_id for user_id, playlist_id in result.all()}
+    changes = defaultdict(list)
+    for playlist_id, track_id in removed:
+        changes[owners[playlist_id]].append((playlist_id, track_id, DELETE))
+    for playlist_id, user_id in owners.items():
+        changes[user_id].append((playlist_id, None, UPSERT))
+    for user_id in sorted(changes):
+        await record_changes(user_id, changes[user_id], db)
+    await db.commit()
+    return len(removed)
+
+
+async def remove_deleted_tracks(track_ids: list[str]) -> None:
+    """
+    Callback of the track feed: drop tracks deleted in TrackService from playlists.
+    """
+    removed = 0
+    async with _async_session() as db:
+        for i in range(0, len(track_ids), BATCH_SIZE):
+            removed += await remove_tracks(track_ids[i:i + BATCH_SIZE], db)
+    if removed:
+        logger.info("Removed %d deleted tracks from playlists", removed)
+
+
+async def sweep_dangling_tracks(track_registry: TrackRegistry, track_client: TrackClient, db: AsyncSession) -> int:
+    """
+    Remove playlist entries of tracks the registry does not know and
+    TrackService confirms are gone; entries younger than SWEEP_MIN_AGE
+    are left for the next run. Stops if the registry falls behind.
+    """
+    removed = 0
+    after = ""
+    added_before = datetime.now(timezone.utc) - SWEEP_MIN_AGE
+    while True:
+        result = await db.execute(
+            select(PlaylistTrack.track_id)
+            .where(PlaylistTrack.track_id > after)
+            .group_by(PlaylistTrack.track_id)
+            .order_by(PlaylistTrack.track_id)
+            .limit(BATCH_SIZE)
+        )
+        track_ids = result.scalars().all()
+        if not track_ids:
+            return removed
+        after = track_ids[-1]
+        if not track_registry.fresh(SWEEP_MAX_REGISTRY_AGE_SECONDS):
+            logger.warning("Track registry is out of date, skipping the sweep")
+            return removed
+        known = track_registry.durations(track_ids)
+        unknown = [track_id for track_id in track_ids if track_id not in known]
+        if not unknown:
+            continue
+        # Реестр мог отстать или потерять событие — удаляем только подтверждённое TrackService
+        missing = await track_client.find_missing(unknown)
+        if missing:
+            removed += await remove_tracks(missing, db, added_before)
+
+
+async def reconcile_playlists(track_client: TrackClient, track_registry: TrackRegistry | None = None) -> None:
+    """
+    Run every reconciliation step; the sweep needs a registry in sync with the feed.
+    """
+    swept = 0
+    async with _async_session() as db:
+        if track_registry is not None and track_registry.fresh(SWEEP_MAX_REGISTRY_AGE_SECONDS):
+            swept = await sweep_dangling_tracks(track_registry, track_client, db)
+        filled = await fill_missing_durations(track_client, db)
+        fixed = await reconcile_aggregates(db)
+    if swept or filled or fixed:
+        logger.info(
+            "Removed %d entries of deleted tracks, filled %d track durations, reconciled %d playlists",
+            swept, filled, fixed,
+        )
+
+
+async def run_reconcile_loop(track_client: TrackClient, track_registry: TrackRegistry) -> None:
+    while True:
+        try:
+            await reconcile_playlists(track_client, track_registry)
+        except Exception:
+            logger.exception("Playlist aggregate reconciliation failed")
+        await asyncio.sleep(settings.PLAYLIST_RECONCILE_INTERVAL_SECONDS)
@@ -0,0 +1,183 @@
+"""
+Per-user change log of playlists and their tracks, for delta sync.
+
+Every mutation records the playlists and playlist tracks it wrote or
+removed with `record_changes`, in its own transaction. A client keeps
+the cursor of its last sync and asks only for what changed after it;
+the log is compacted by (playlist, track), so a track moved ten times
+is sent once, in its current state.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.config import settings
+from app.database import _async_session
+from app.models import Playlist, PlaylistChange, PlaylistChangeHorizon, PlaylistTrack
+
+logger = logging.getLogger(__name__)
+
+UPSERT = "upsert"
+DELETE = "delete"
+# Первый ключ pg_advisory_xact_lock, чтобы не пересекаться с другими блокировками
+_LOCK_NAMESPACE = 4901
+
+
+async def _lock_user_log(user_id: str, db: AsyncSession) -> None:
+    await db.execute(select(func.pg_advisory_xact_lock(_LOCK_NAMESPACE, func.hashtext(user_id))))
+
+
+async def _head(db: AsyncSession) -> int:
+    return (await db.execute(select(func.max(PlaylistChange.id)))).scalar_one() or 0
+
+
+async def record_changes(user_id: str, changes: list[tuple[str, str | None, str]], db: AsyncSession) -> None:
+    """
+    Append (playlist_id, track_id, op) entries to the user's log inside
+    the caller's transaction; call it last, right before the commit.
+
+    Ids come from a sequence, which orders them by insert rather than
+    by commit. A per-user lock held from here to the commit makes the
+    two orders agree for one user: once a client has seen id N, no
+    change of that user below N can commit later.
+    """
+    latest = {(playlist_id, track_id): op for playlist_id, track_id, op in changes}
+    if not latest:
+        return
+    await _lock_user_log(user_id, db)
+    await db.execute(insert(PlaylistChange), [
+        {"user_id": user_id, "playlist_id": playlist_id, "track_id": track_id, "op": op}
+        for (playlist_id, track_id), op in latest.items()
+    ])
+
+
+async def current_cursor(user_id: str, db: AsyncSession) -> int:
+    """
+    A cursor to start syncing from: take it before the full download,
+    and the first sync will return whatever changed during it.
+    """
+    # Дожидаемся незакоммиченных изменений пользователя, иначе их id окажутся ниже курсора
+    await _lock_user_log(user_id, db)
+    cursor = await _head(db)
+    await db.commit()
+    return cursor
+
+
+async def list_changes(user_id: str, since: int, limit: int, db: AsyncSession) -> dict:
+    """
+    The user's changes after `since`, at most `limit` log entries at a
+    time, compacted to the last entry per playlist and per track.
+    Upserts carry the current rows; an upsert whose row is already gone
+    is skipped, as its delete comes with the next page. Raises 410 if
+    entries after `since` may have been removed by retention.
+
+    On the last page the cursor moves up to the newest id of the whole
+    log, so clients of idle users do not fall behind the retention.
+    """
+    horizon = (await db.execute(
+        select(PlaylistChangeHorizon.purged_through).where(PlaylistChangeHorizon.id == 1)
+    )).scalar_one_or_none()
+    if horizon is not None and since < horizon:
+        raise HTTPException(status_code=410, detail="Cursor is too old, sync from scratch")
+
+    await _lock_user_log(user_id, db)
+    page = (
+        select(PlaylistChange)
+        .where(PlaylistChange.user_id == user_id, PlaylistChange.id > since)
+        .order_by(PlaylistChange.id)
+        .limit(limit)
+        .subquery()
+    )
+    # Оконные функции считаются до DISTINCT ON, то есть по всей странице журнала
+    result = await db.execute(
+        select(
+            page.c.playlist_id,
+            page.c.track_id,
+            page.c.op,
+            func.count().over().label("page_size"),
+            func.max(page.c.id).over().label("last_id"),
+        )
+        .distinct(page.c.playlist_id, page.c.track_id)
+        .order_by(page.c.playlist_id, page.c.track_id, page.c.id.desc())
+    )
+    entries = result.all()
+    has_more = bool(entries) and entries[0].page_size == limit
+    cursor = entries[0].last_id if has_more else max(since, await _head(db))
+
+    deleted_playlist_ids = [e.playlist_id for e in entries if e.track_id is None and e.op == DELETE]
+    gone = set(deleted_playlist_ids)
+    playlist_ids = [e.playlist_id for e in entries if e.track_id is None and e.op == UPSERT]
+    track_keys = [(e.playlist_id, e.track_id) for e in entries
+                  if e.track_id is not None and e.op == UPSERT and e.playlist_id not in gone]
+    deleted_tracks = [{"playlist_id": e.playlist_id, "track_id": e.track_id} for e in entries
+                      if e.track_id is not None and e.op == DELETE and e.playlist_id not in gone]
+
+    playlists = []
+    if playlist_ids:
+        result = await db.execute(
+            select(Playlist).where(Playlist.id.in_(playlist_ids), Playlist.user_id == user_id).order_by(Playlist.id)
+        )
+        playlists = result.scalars().all()
+        for playlist in playlists:
+            set_committed_value(playlist, "tracks", [])
+    tracks = []
+    if track_keys:
+        result = await db.execute(
+            select(PlaylistTrack)
+            .where(tuple_(PlaylistTrack.playlist_id, PlaylistTrack.track_id).in_(track_keys))
+            .order_by(PlaylistTrack.playlist_id, PlaylistTrack.order_key, PlaylistTrack.track_id)
+        )
+        tracks = result.scalars().all()
+    # Снимаем блокировку пользователя
+    await db.commit()
+
+    return {
+        "cursor": cursor,
+        "has_more": has_more,
+        "playlists": playlists,
+        "deleted_playlist_ids": deleted_playlist_ids,
+        "tracks": tracks,
+        "deleted_tracks": deleted_tracks,
+    }
+
+
+async def purge_changes(db: AsyncSession) -> int:
+    """
+    Drop log entries older than PLAYLIST_CHANGES_RETENTION_DAYS and move
+    the horizon past them; returns the number of entries removed.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.PLAYLIST_CHANGES_RETENTION_DAYS)
+    through = (await db.execute(
+        select(func.max(PlaylistChange.id)).where(PlaylistChange.created_at < cutoff)
+    )).scalar_one()
+    if through is None:
+        return 0
+    await db.execute(
+        pg_insert(PlaylistChangeHorizon)
+        .values(id=1, purged_through=through)
+        .on_conflict_do_update(
+            index_elements=[PlaylistChangeHorizon.id],
+            set_={"purged_through": func.greatest(PlaylistChangeHorizon.purged_through, through)},
+        )
+    )
+    result = await db.execute(delete(PlaylistChange).where(PlaylistChange.id <= through))
+    await db.commit()
+    return result.rowcount
+
+
+async def run_change_purge_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.PLAYLIST_CHANGES_PURGE_INTERVAL_SECONDS)
+        try:
+            async with _async_session() as db:
+                purged = await purge_changes(db)
+            if purged:
+                logger.info("Purged %d playlist change log entries", purged)
+        except Exception:
+            logger.exception("Playlist change log purge failed")
@@ -0,0 +1,164 @@
+"""
+Fractional ordering keys for playlist tracks.
+
+A key is a string over the base-62 alphabet 0-9A-Za-z, compared
+bytewise (the column uses COLLATE "C"). A key can always be generated
+between any two others, so moving a track rewrites only that track's
+row. Each key has two parts:
+
+* an integer part: a head letter encoding the length, then digits.
+  "a0".."az" come first, then "b00".."bzz" and so on; "A..Z" heads
+  are used below "a0". Appending to the end advances this part, so the
+  keys of a playlist built by appends stay 2-4 characters long.
+* an optional fractional part, used when inserting between two adjacent
+  integers. It never ends in "0", so there is always room between keys.
+
+Repeated inserts at the same spot make keys longer by about one
+character per six inserts; `needs_rebalance` tells when to renumber.
+"""
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_BASE = len(DIGITS)
+_INDEX = {digit: i for i, digit in enumerate(DIGITS)}
+INTEGER_ZERO = "a0"
+_SMALLEST_INTEGER = "A" + "0" * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"invalid order key head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"invalid order key: {key!r}")
+    return key[:length]
+
+
+def validate_key(key: str) -> None:
+    if key == _SMALLEST_INTEGER:
+        raise ValueError("order key is the smallest possible one")
+    integer = _integer_part(key)
+    if any(char not in _INDEX for char in key[1:]):
+        raise ValueError(f"invalid order key: {key!r}")
+    if key[len(integer):].endswith("0"):
+        raise ValueError(f"invalid order key: {key!r}")
+
+
+def _midpoint(a: str, b: str | None) -> str:
+    """
+    Fractional part strictly between `a` and `b` (None is +infinity).
+    """
+    if b is not None:
+        # Общий префикс переносим как есть
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else _BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b) // 2]
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = _INDEX[digits[i]] + 1
+        if digit < _BASE:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = "0"
+    if head == "Z":
+        return "a0"
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(integer: str) -> str | None:
+    head, digits = integer[0], list(integer[1:])
+    for i in reversed(range(len(digits))):
+        digit = _INDEX[digits[i]] - 1
+        if digit >= 0:
+            digits[i] = DIGITS[digit]
+            return head + "".join(digits)
+        digits[i] = "z"
+    if head == "a":
+        return "Zz"
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append("z")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def key_between(a: str | None, b: str | None) -> str:
+    """
+    A key strictly between `a` and `b`; None means the start or the end.
+    """
+    if a is not None:
+        validate_key(a)
+    if b is not None:
+        validate_key(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"order keys out of order: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return INTEGER_ZERO
+        integer_b = _integer_part(b)
+        if integer_b == _SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        result = _decrement_integer(integer_b)
+        if result is None:
+            raise ValueError("cannot decrement any more")
+        return result
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        result = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if result is None else result
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    result = _increment_integer(integer_a)
+    if result is None:
+        raise ValueError("cannot increment any more")
+    if result < b:
+        return result
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_after(a: str | None, count: int) -> list[str]:
+    """
+    `count` ascending keys after `a`, as consecutive appends would get.
+    """
+    keys = []
+    for _ in range(count):
+        a = key_between(a, None)
+        keys.append(a)
+    return keys
+
+
+def needs_rebalance(key: str, max_length: int) -> bool:
+    return len(key) > max_length
@@ -1,26 +1,138 @@
+import json
+from collections import defaultdict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+from sqlalchemy.orm import aliased, selectinload, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
+from app.config import settings
+from app.database import _async_session
 from app.models import Playlist, PlaylistTrack
-from app.schemas import PlaylistCreate, PlaylistUpdate, PlaylistTrackAdd, PlaylistRead
+from app.schemas import (
+    PlaylistCreate, PlaylistUpdate, PlaylistTrackAdd, TracksMode, PlaylistTrackOperation, PlaylistTrackMove,
+    PlaylistFullRead, PlaylistFullTrackRead,
+)
 from sqlalchemy.exc import NoResultFound
-from sqlalchemy import select, asc, update, delete
-from sqlalchemy.sql import text
+from sqlalchemy import Select, String, select, update, delete, func, values, column, cast, tuple_
+from sqlalchemy.dialects.postgresql import insert, REGCONFIG, REAL
 from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from app.services.change_service import UPSERT, DELETE, record_changes
+from app.services.order_keys import key_between, keys_after, needs_rebalance
+from app.track_client import TrackClient
+from app.track_registry import TrackRegistry
+
+async def load_playlists(stmt: Select, tracks: TracksMode, preview_size: int, db: AsyncSession) -> list[Playlist]:
+    """
+    Run a `select(Playlist)` statement and fill `tracks` according to the
+    mode. Counts and durations are stored on the playlist itself, so
+    "count" and "none" are one query; "full" and "preview" add one query
+    for the tracks of all the playlists together.
+    """
+    if tracks == "full":
+        result = await db.execute(stmt.options(selectinload(Playlist.tracks)))
+        return result.scalars().all()
+
+    result = await db.execute(stmt)
+    playlists = result.scalars().all()
+    ids = [playlist.id for playlist in playlists]
+    loaded: dict[str, list[PlaylistTrack]] = defaultdict(list)
+    if ids and tracks == "preview":
+        ranked = select(
+            PlaylistTrack,
+            func.row_number().over(
+                partition_by=PlaylistTrack.playlist_id,
+                order_by=(PlaylistTrack.order_key, PlaylistTrack.track_id),
+            ).label("position"),
+        ).where(PlaylistTrack.playlist_id.in_(ids)).subquery()
+        track = aliased(PlaylistTrack, ranked)
+        result = await db.execute(
+            select(track)
+            .where(ranked.c.position <= preview_size)
+            .order_by(ranked.c.playlist_id, ranked.c.position)
+        )
+        for playlist_track in result.scalars():
+            loaded[playlist_track.playlist_id].append(playlist_track)
+
+    for playlist in playlists:
+        # Коллекция помечается загруженной, чтобы сериализация не ходила в базу
+        set_committed_value(playlist, "tracks", loaded.get(playlist.id, []))
+    return playlists
+
+async def _update_aggregates(playlist_id: str, count_delta: int, duration_delta: int, db: AsyncSession) -> None:
+    """
+    Apply track count / duration deltas and re-point the cover to the
+    first track, inside the caller's transaction.
+    """
+    first_track = (
+        select(PlaylistTrack.track_id)
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .order_by(PlaylistTrack.order_key, PlaylistTrack.track_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(Playlist)
+        .where(Playlist.id == playlist_id)
+        .values(
+            track_count=Playlist.track_count + count_delta,
+            total_duration_seconds=Playlist.total_duration_seconds + duration_delta,
+            cover_track_id=first_track,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+async def _track_durations(
+    track_ids: list[str],
+    track_client: TrackClient,
+    track_registry: TrackRegistry,
+) -> tuple[dict[str, int], bool]:
+    """
+    Durations of the tracks that exist, and whether existence was checked.
+
+    Tracks are looked up in the local registry; only ids it does not
+    have (uploaded a few seconds ago, or bogus) are asked of TrackService.
+    Until the registry has loaded, nothing is checked and tracks
+    TrackService does not describe are stored with an unknown duration,
+    to be filled in or swept by the reconciliation job.
+    """
+    if not track_registry.ready:
+        metadata = await track_client.get_tracks(track_ids)
+        return {track_id: track["duration_seconds"] for track_id, track in metadata.items()}, False
+    durations = track_registry.durations(track_ids)
+    missing = [track_id for track_id in track_ids if track_id not in durations]
+    if missing:
+        metadata = await track_client.get_tracks(missing)
+        durations.update((track_id, track["duration_seconds"]) for track_id, track in metadata.items())
+    return durations, True
 
 async def create_playlist(user_id: str, data: PlaylistCreate, db: AsyncSession) -> Playlist:
     playlist = Playlist(user_id=user_id, title=data.title, description=data.description)
     db.add(playlist)
+    await db.flush()
+    await record_changes(user_id, [(playlist.id, None, UPSERT)], db)
     await db.commit()
     await db.refresh(playlist)
+    set_committed_value(playlist, "tracks", [])
     return playlist
 
-async def list_user_playlists(user_id: str, db: AsyncSession) -> list[Playlist]:
-    result = await db.execute(select(Playlist).where(Playlist.user_id == user_id))
-    return result.scalars().all()
+async def list_user_playlists(user_id: str, db: AsyncSession, tracks: TracksMode = "full", preview_size: int = 5) -> list[Playlist]:
+    stmt = select(Playlist).where(Playlist.user_id == user_id).order_by(Playlist.created_at)
+    return await load_playlists(stmt, tracks, preview_size, db)
 
-async def add_track_to_playlist(user_id: str, playlist_id: str, data: PlaylistTrackAdd, db: AsyncSession) -> PlaylistTrack:
+async def add_track_to_playlist(
+    user_id: str,
+    playlist_id: str,
+    data: PlaylistTrackAdd,
+    track_client: TrackClient,
+    track_registry: TrackRegistry,
+    db: AsyncSession,
+) -> PlaylistTrack:
+    durations, checked = await _track_durations([data.track_id], track_client, track_registry)
+    if checked and data.track_id not in durations:
+        raise HTTPException(status_code=404, detail="Track not found")
     # Проверяем, что плейлист принадлежит пользователю
-    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id, Playlist.user_id == user_id))
+    result = await db.execute(
+        select(Playlist).where(Playlist.id == playlist_id, Playlist.user_id == user_id).with_for_update()
+    )
     playlist = result.scalar_one_or_none()
     if not playlist:
         raise NoResultFound("Playlist not found or forbidden")
@@ -39,8 +151,15 @@ async def add_track_to_playlist(user_id: str, playlist_id: str, data: PlaylistTr
             detail="Track is already in the playlist"
         )
 
-    playlist_track = PlaylistTrack(playlist_id=playlist_id, track_id=data.track_id, order=data.order)
+    # Новый трек встаёт в конец плейлиста
+    order_key = key_between(await _last_order_key(playlist_id, db), None)
+    duration = durations.get(data.track_id)
+    playlist_track = PlaylistTrack(
+        playlist_id=playlist_id, track_id=data.track_id, order_key=order_key, duration_seconds=duration
+    )
     db.add(playlist_track)
+    await _update_aggregates(playlist_id, 1, duration or 0, db)
+    await record_changes(user_id, [(playlist_id, data.track_id, UPSERT), (playlist_id, None, UPSERT)], db)
     await db.commit()
     await db.refresh(playlist_track)
     return playlist_track
@@ -54,8 +173,11 @@ async def update_playlist(user_id: str, playlist_id: str, data: PlaylistUpdate,
         playlist.title = data.title
     if data.description is not None:
         playlist.description = data.description
+    await db.flush()
+    await record_changes(user_id, [(playlist_id, None, UPSERT)], db)
     await db.commit()
     await db.refresh(playlist)
+    set_committed_value(playlist, "tracks", [])
     return playlist
 
 async def delete_playlist(user_id: str, playlist_id: str, db: AsyncSession) -> None:
@@ -64,11 +186,15 @@ async def delete_playlist(user_id: str, playlist_id: str, db: AsyncSession) -> N
     if not playlist:
         raise NoResultFound("Playlist not found or forbidden")
     await db.delete(playlist)
+    await db.flush()
+    await record_changes(user_id, [(playlist_id, None, DELETE)], db)
     await db.commit()
 
 async def remove_track_from_playlist(user_id: str, playlist_id: str, track_id: str, db: AsyncSession) -> None:
     # Проверяем, что плейлист принадлежит пользователю
-    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id, Playlist.user_id == user_id))
+    result = await db.execute(
+        select(Playlist).where(Playlist.id == playlist_id, Playlist.user_id == user_id).with_for_update()
+    )
     playlist = result.scalar_one_or_none()
     if not playlist:
         raise NoResultFound("Playlist not found or forbidden")
@@ -77,47 +203,411 @@ async def remove_track_from_playlist(user_id: str, playlist_id: str, track_id: s
     if not playlist_track:
         raise NoResultFound("Track not found in playlist")
     await db.delete(playlist_track)
+    await db.flush()
+    await _update_aggregates(playlist_id, -1, -(playlist_track.duration_seconds or 0), db)
+    await record_changes(user_id, [(playlist_id, track_id, DELETE), (playlist_id, None, UPSERT)], db)
     await db.commit()
 
-async def list_playlist_tracks(user_id: str, playlist_id: str, db: AsyncSession) -> list[PlaylistTrack]:
-    # Проверяем, что плейлист принадлежит пользователю
-    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
-    playlist = result.scalar_one_or_none()
-    if not playlist:
+async def _last_order_key(playlist_id: str, db: AsyncSession) -> str | None:
+    result = await db.execute(
+        select(func.max(PlaylistTrack.order_key)).where(PlaylistTrack.playlist_id == playlist_id)
+    )
+    return result.scalar_one()
+
+async def _write_order_keys(playlist_id: str, keys: dict[str, str], db: AsyncSession) -> set[str]:
+    """
+    Set order keys of many tracks with one UPDATE ... FROM (VALUES ...).
+    """
+    if not keys:
+        return set()
+    rows = values(
+        column("track_id", String), column("order_key", String), name="new_keys"
+    ).data(list(keys.items()))
+    result = await db.execute(
+        update(PlaylistTrack)
+        .where(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == rows.c.track_id)
+        .values(order_key=rows.c.order_key)
+        .returning(PlaylistTrack.track_id)
+        .execution_options(synchronize_session=False)
+    )
+    return set(result.scalars())
+
+async def _reorder(
+    playlist_id: str,
+    moves: list[tuple[str, str | None, str | None]],
+    db: AsyncSession,
+) -> tuple[dict[str, str], set[str]]:
+    """
+    Apply (track_id, after_track_id, before_track_id) moves in sequence
+    against the playlist's current order and write the new keys.
+
+    Only the moved tracks get new keys, unless keys collide or grow past
+    ORDER_KEY_REBALANCE_LENGTH; then the whole playlist is renumbered
+    with short keys in the same UPDATE. Returns a status per track and
+    the ids of the tracks whose keys were rewritten.
+    """
+    result = await db.execute(
+        select(PlaylistTrack.track_id, PlaylistTrack.order_key)
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .order_by(PlaylistTrack.order_key, PlaylistTrack.track_id)
+    )
+    keys = dict(result.all())
+    positions = list(keys)
+    statuses: dict[str, str] = {}
+    changed: set[str] = set()
+    rebalance = False
+    for track_id, after, before in moves:
+        anchor = after or before
+        if track_id not in keys:
+            statuses[track_id] = "not_found"
+            continue
+        if anchor is not None and (anchor == track_id or anchor not in keys):
+            statuses[track_id] = "anchor_not_found"
+            continue
+        positions.remove(track_id)
+        if after is not None:
+            index = positions.index(after) + 1
+        elif before is not None:
+            index = positions.index(before)
+        else:
+            index = len(positions)
+        positions.insert(index, track_id)
+        low = keys[positions[index - 1]] if index > 0 else None
+        high = keys[positions[index + 1]] if index + 1 < len(positions) else None
+        if low is not None and high is not None and low >= high:
+            # Одинаковые ключи соседей (гонка старых вставок) — места между ними нет
+            rebalance = True
+        else:
+            keys[track_id] = key_between(low, high)
+            rebalance = rebalance or needs_rebalance(keys[track_id], settings.ORDER_KEY_REBALANCE_LENGTH)
+        changed.add(track_id)
+        statuses[track_id] = "moved"
+
+    if rebalance:
+        written = await _write_order_keys(playlist_id, dict(zip(positions, keys_after(None, len(positions)))), db)
+    else:
+        written = await _write_order_keys(playlist_id, {track_id: keys[track_id] for track_id in changed}, db)
+    return statuses, written
+
+async def move_track(
+    user_id: str,
+    playlist_id: str,
+    track_id: str,
+    data: PlaylistTrackMove,
+    db: AsyncSession,
+) -> PlaylistTrack:
+    """
+    Move one track next to another (or to the end). Reads the two
+    neighbouring keys through the (playlist_id, order_key) index and
+    updates only the moved row; the playlist is renumbered only when
+    keys collide or grow too long.
+    """
+    result = await db.execute(
+        select(Playlist.id)
+        .where(Playlist.id == playlist_id, Playlist.user_id == user_id)
+        .with_for_update()
+    )
+    if result.scalar_one_or_none() is None:
         raise NoResultFound("Playlist not found or forbidden")
+
+    anchor_id = data.after_track_id or data.before_track_id
+    if anchor_id == track_id:
+        raise HTTPException(status_code=400, detail="Track cannot be moved relative to itself")
+    others = (PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id != track_id)
+    low = high = None
+    if anchor_id is not None:
+        anchor_key = (await db.execute(
+            select(PlaylistTrack.order_key)
+            .where(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == anchor_id)
+        )).scalar_one_or_none()
+        if anchor_key is None:
+            raise NoResultFound("Anchor track not found in playlist")
+        if data.after_track_id is not None:
+            low = anchor_key
+            high = (await db.execute(
+                select(func.min(PlaylistTrack.order_key)).where(*others, PlaylistTrack.order_key > low)
+            )).scalar_one()
+        else:
+            high = anchor_key
+            low = (await db.execute(
+                select(func.max(PlaylistTrack.order_key)).where(*others, PlaylistTrack.order_key < high)
+            )).scalar_one()
+    else:
+        low = (await db.execute(select(func.max(PlaylistTrack.order_key)).where(*others))).scalar_one()
+
+    new_key = key_between(low, high) if low is None or high is None or low < high else None
+    if new_key is None or needs_rebalance(new_key, settings.ORDER_KEY_REBALANCE_LENGTH):
+        statuses, written = await _reorder(playlist_id, [(track_id, data.after_track_id, data.before_track_id)], db)
+        if statuses[track_id] == "not_found":
+            raise NoResultFound("Track not found in playlist")
+    else:
+        written = await _write_order_keys(playlist_id, {track_id: new_key}, db)
+        if not written:
+            raise NoResultFound("Track not found in playlist")
+    await _update_aggregates(playlist_id, 0, 0, db)
+    await record_changes(
+        user_id, [(playlist_id, written_id, UPSERT) for written_id in written] + [(playlist_id, None, UPSERT)], db
+    )
+    await db.commit()
+
     result = await db.execute(
-        select(PlaylistTrack).where(PlaylistTrack.playlist_id == playlist_id).order_by(asc(PlaylistTrack.order))
+        select(PlaylistTrack)
+        .where(PlaylistTrack.playlist_id == playlist_id, PlaylistTrack.track_id == track_id)
+        .execution_options(populate_existing=True)
     )
+    return result.scalar_one()
+
+async def apply_track_operations(
+    user_id: str,
+    playlist_id: str,
+    operations: list[PlaylistTrackOperation],
+    track_client: TrackClient,
+    track_registry: TrackRegistry,
+    db: AsyncSession,
+) -> list[dict]:
+    """
+    Apply a batch of add/remove/move operations in one transaction.
+
+    Operations are grouped by kind and each group is one statement
+    (DELETE ... RETURNING, INSERT ... ON CONFLICT DO NOTHING RETURNING,
+    UPDATE ... FROM VALUES RETURNING), so the cost does not grow with
+    the number of round-trips. Added tracks are appended; an add with a
+    position is then moved there with the other moves; if its anchor is
+    not in the playlist it stays at the end and is reported as
+    `added_anchor_not_found`. Because of the
+    grouping, only the first operation on a given track is applied;
+    repeats are reported as `duplicate_operation`, and adds of tracks
+    that do not exist as `track_not_found`. Returns one result
+    per operation, in order. The playlist's count, duration and cover,
+    and the user's change log, are updated in the same transaction.
+    """
+    durations, checked = await _track_durations(
+        [operation.track_id for operation in operations if operation.op == "add"], track_client, track_registry
+    )
+    # Блокируем плейлист: параллельные пачки не получат одинаковые ключи
+    result = await db.execute(
+        select(Playlist.id)
+        .where(Playlist.id == playlist_id, Playlist.user_id == user_id)
+        .with_for_update()
+    )
+    if result.scalar_one_or_none() is None:
+        raise NoResultFound("Playlist not found or forbidden")
+
+    results = [
+        {"index": index, "op": operation.op, "track_id": operation.track_id, "status": None}
+        for index, operation in enumerate(operations)
+    ]
+    batches: dict[str, list[int]] = {"add": [], "remove": [], "move": []}
+    seen: set[str] = set()
+    for index, operation in enumerate(operations):
+        if operation.track_id in seen:
+            results[index]["status"] = "duplicate_operation"
+        elif operation.op == "add" and checked and operation.track_id not in durations:
+            results[index]["status"] = "track_not_found"
+        else:
+            seen.add(operation.track_id)
+            batches[operation.op].append(index)
+
+    count_delta = duration_delta = 0
+    changes: list[tuple[str, str | None, str]] = []
+    if batches["remove"]:
+        removed = dict((await db.execute(
+            delete(PlaylistTrack)
+            .where(
+                PlaylistTrack.playlist_id == playlist_id,
+                PlaylistTrack.track_id.in_([operations[i].track_id for i in batches["remove"]])
+            )
+            .returning(PlaylistTrack.track_id, PlaylistTrack.duration_seconds)
+        )).all())
+        count_delta -= len(removed)
+        duration_delta -= sum(duration or 0 for duration in removed.values())
+        changes.extend((playlist_id, track_id, DELETE) for track_id in removed)
+        for i in batches["remove"]:
+            results[i]["status"] = "removed" if operations[i].track_id in removed else "not_found"
+
+    moves = []
+    if batches["add"]:
+        new_keys = keys_after(await _last_order_key(playlist_id, db), len(batches["add"]))
+        added = dict((await db.execute(
+            insert(PlaylistTrack)
+            .values([
+                {
+                    "playlist_id": playlist_id,
+                    "track_id": operations[i].track_id,
+                    "order_key": key,
+                    "duration_seconds": durations.get(operations[i].track_id),
+                }
+                for i, key in zip(batches["add"], new_keys)
+            ])
+            .on_conflict_do_nothing(index_elements=[PlaylistTrack.playlist_id, PlaylistTrack.track_id])
+            .returning(PlaylistTrack.track_id, PlaylistTrack.duration_seconds)
+        )).all())
+        count_delta += len(added)
+        duration_delta += sum(duration or 0 for duration in added.values())
+        changes.extend((playlist_id, track_id, UPSERT) for track_id in added)
+        for i in batches["add"]:
+            operation = operations[i]
+            results[i]["status"] = "added" if operation.track_id in added else "already_present"
+            if operation.track_id in added and (operation.after_track_id or operation.before_track_id):
+                moves.append(i)
+
+    # Перемещения применяются по порядку в запросе, поэтому слияние с add сохраняет его
+    moves = sorted(moves + batches["move"])
+    if moves:
+        statuses, written = await _reorder(
+            playlist_id,
+            [(operations[i].track_id, operations[i].after_track_id, operations[i].before_track_id) for i in moves],
+            db,
+        )
+        for i in batches["move"]:
+            results[i]["status"] = statuses[operations[i].track_id]
+        # Трек уже добавлен в конец, но на место не встал — клиент должен это видеть
+        for i in moves:
+            if operations[i].op == "add" and statuses[operations[i].track_id] == "anchor_not_found":
+                results[i]["status"] = "added_anchor_not_found"
+        changes.extend((playlist_id, track_id, UPSERT) for track_id in written)
+
+    await _update_aggregates(playlist_id, count_delta, duration_delta, db)
+    changes.append((playlist_id, None, UPSERT))
+    await record_changes(user_id, changes, db)
+    await db.commit()
+    return results
+
+async def _track_page(
+    playlist_id: str,
+    limit: int,
+    cursor: tuple[str, str] | None,
+    db: AsyncSession,
+) -> list[PlaylistTrack]:
+    stmt = (
+        select(PlaylistTrack)
+        .where(PlaylistTrack.playlist_id == playlist_id)
+        .order_by(PlaylistTrack.order_key, PlaylistTrack.track_id)
+        .limit(limit)
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(PlaylistTrack.order_key, PlaylistTrack.track_id) > tuple_(*cursor))
+    result = await db.execute(stmt)
     return result.scalars().all()
 
+async def list_playlist_tracks(
+    user_id: str,
+    playlist_id: str,
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: tuple[str, str] | None = None,
+) -> tuple[list[PlaylistTrack], Playlist]:
+    """
+    One page of the playlist's tracks in (order_key, track_id) order,
+    read from the (playlist_id, order_key, track_id) index; `cursor` is
+    that pair of the last track of the previous page, so a page costs
+    the same wherever it is. The playlist is returned as well for its
+    stored track count and duration.
+    """
+    # Проверяем, что плейлист существует
+    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
+    playlist = result.scalar_one_or_none()
+    if playlist is None:
+        raise NoResultFound("Playlist not found or forbidden")
+    return await _track_page(playlist_id, limit, cursor, db), playlist
+
+async def get_playlist_full(
+    playlist_id: str,
+    track_client: TrackClient,
+    db: AsyncSession,
+    limit: int = 100,
+    cursor: tuple[str, str] | None = None,
+) -> PlaylistFullRead:
+    """
+    The playlist with a page of its tracks, each joined with its
+    metadata from TrackService (batched and cached by `track_client`).
+    """
+    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
+    playlist = result.scalar_one_or_none()
+    if playlist is None:
+        raise NoResultFound("Playlist not found")
+    tracks = await _track_page(playlist_id, limit, cursor, db)
+    metadata = await track_client.get_tracks([track.track_id for track in tracks])
+    return PlaylistFullRead(
+        id=playlist.id,
+        user_id=playlist.user_id,
+        title=playlist.title,
+        description=playlist.description,
+        created_at=playlist.created_at,
+        updated_at=playlist.updated_at,
+        track_count=playlist.track_count,
+        total_duration_seconds=playlist.total_duration_seconds,
+        cover_track_id=playlist.cover_track_id,
+        tracks=[
+            PlaylistFullTrackRead(
+                track_id=track.track_id,
+                order_key=track.order_key,
+                added_at=track.added_at,
+                duration_seconds=track.duration_seconds,
+                track=metadata.get(track.track_id),
+            )
+            for track in tracks
+        ],
+    )
+
+async def export_playlist_tracks(playlist_id: str, db: AsyncSession) -> StreamingResponse:
+    """
+    All tracks of the playlist as NDJSON, streamed from a server-side
+    cursor. The stream runs in its own session: the request's session
+    is closed before the body is sent.
+    """
+    result = await db.execute(select(Playlist.id).where(Playlist.id == playlist_id))
+    if result.scalar_one_or_none() is None:
+        raise NoResultFound("Playlist not found or forbidden")
+
+    async def rows_iterator():
+        async with _async_session() as session:
+            result = await session.stream(
+                select(PlaylistTrack.track_id, PlaylistTrack.order_key, PlaylistTrack.added_at)
+                .where(PlaylistTrack.playlist_id == playlist_id)
+                .order_by(PlaylistTrack.order_key, PlaylistTrack.track_id)
+                .execution_options(yield_per=1000)
+            )
+            async for rows in result.partitions():
+                yield "".join(
+                    json.dumps({"track_id": track_id, "order_key": order_key, "added_at": added_at.isoformat()}) + "\n"
+                    for track_id, order_key, added_at in rows
+                ).encode("utf-8")
+
+    return StreamingResponse(
+        rows_iterator(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{playlist_id}.ndjson"'},
+    )
+
 async def search_playlists(
     query: str,
     limit: int,
-    offset: int,
     db: AsyncSession,
-) -> list[PlaylistRead]:
+    cursor: tuple[float, str] | None = None,
+    tracks: TracksMode = "preview",
+    preview_size: int = 5,
+) -> list[Playlist]:
     """
     Search playlists by title or description using PostgreSQL full-text search.
+
+    Matches through the GIN index on the stored `search_vector` and ranks
+    only the matching rows. Results go by (rank, id) descending; `cursor`
+    is that pair of the last row of the previous page.
     """
-    search_query = text("""
-        SELECT p.* FROM playlists p
-        WHERE to_tsvector('english', p.title || ' ' || COALESCE(p.description, '')) @@ plainto_tsquery('english', :query)
-        ORDER BY ts_rank(to_tsvector('english', p.title || ' ' || COALESCE(p.description, '')), plainto_tsquery('english', :query)) DESC
-        LIMIT :limit OFFSET :offset
-    """)
-    
-    result = await db.execute(
-        search_query,
-        {"query": query, "limit": limit, "offset": offset}
-    )
-    playlists = result.mappings().all()
-    
-    # Convert dictionary results to Playlist models
-    playlist_models = [Playlist(**playlist) for playlist in playlists]
-    
-    # Convert Playlist models to PlaylistRead schemas
-    return [PlaylistRead.model_validate(playlist) for playlist in playlist_models]
-
-async def get_playlist_by_id(playlist_id: str, db: AsyncSession) -> Playlist | None:
-    result = await db.execute(select(Playlist).where(Playlist.id == playlist_id))
-    return result.scalar_one_or_none()
\ No newline at end of file
+    ts_query = func.plainto_tsquery(cast(settings.SEARCH_TEXT_CONFIG, REGCONFIG), query)
+    rank = func.ts_rank(Playlist.search_vector, ts_query)
+    stmt = (
+        select(Playlist)
+        .options(with_expression(Playlist.search_rank, rank))
+        .where(Playlist.search_vector.op('@@')(ts_query))
+        .order_by(rank.desc(), Playlist.id.desc())
+        .limit(limit)
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(rank, Playlist.id) < tuple_(cast(cursor[0], REAL), cursor[1]))
+    return await load_playlists(stmt, tracks, preview_size, db)
+
+async def get_playlist_by_id(playlist_id: str, db: AsyncSession, tracks: TracksMode = "full", preview_size: int = 5) -> Playlist | None:
+    playlists = await load_playlists(select(Playlist).where(Playlist.id == playlist_id), tracks, preview_size, db)
+    return playlists[0] if playlists else None
\ No newline at end of file
@@ -0,0 +1,132 @@
+"""
+Client for track metadata from TrackService.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class TrackClient:
+    """
+    Batched, cached lookups of track metadata.
+
+    One pooled `httpx.AsyncClient` is shared by all requests of the
+    worker (opened in `start`, closed in `close`). Missing tracks are
+    fetched from `/tracks/batch` in chunks of `batch_size`, at most
+    `concurrency` requests in flight across the worker. Results,
+    including "no such track", are cached per track for `ttl` seconds,
+    so a popular playlist costs TrackService one request per TTL.
+
+    If TrackService fails, the affected tracks come back without
+    metadata instead of failing the whole response. `transport` replaces
+    the network, e.g. with an in-process TrackService in tests.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        ttl: float = 30,
+        cache_size: int = 50_000,
+        batch_size: int = 100,
+        concurrency: int = 8,
+        timeout: float = 3,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._ttl = ttl
+        self._cache_size = cache_size
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._concurrency = concurrency
+        self._transport = transport
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._cache: OrderedDict[str, tuple[dict | None, float]] = OrderedDict()
+        self._client: httpx.AsyncClient | None = None
+
+    async def start(self) -> None:
+        self._client = httpx.AsyncClient(
+            base_url=self._base_url,
+            timeout=self._timeout,
+            limits=httpx.Limits(max_connections=self._concurrency, max_keepalive_connections=self._concurrency),
+            transport=self._transport,
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _cached(self, track_id: str) -> tuple[bool, dict | None]:
+        entry = self._cache.get(track_id)
+        if entry is None:
+            return False, None
+        metadata, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._cache[track_id]
+            return False, None
+        self._cache.move_to_end(track_id)
+        return True, metadata
+
+    def _store(self, track_id: str, metadata: dict | None) -> None:
+        self._cache[track_id] = (metadata, time.monotonic() + self._ttl)
+        self._cache.move_to_end(track_id)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    async def _fetch(self, track_ids: list[str]) -> None:
+        async with self._semaphore:
+            response = await self._client.get("/tracks/batch", params={"ids": track_ids})
+            response.raise_for_status()
+            found = {track["id"]: track for track in response.json()}
+        for track_id in track_ids:
+            # Несуществующий трек тоже кешируем, чтобы не спрашивать о нём снова
+            self._store(track_id, found.get(track_id))
+
+    async def find_missing(self, track_ids: list[str]) -> list[str]:
+        """
+        The ids TrackService has no track for, asked past the cache.
+        Raises if any chunk could not be checked.
+        """
+        if self._client is None:
+            await self.start()
+        missing = []
+        for i in range(0, len(track_ids), self._batch_size):
+            chunk = track_ids[i:i + self._batch_size]
+            async with self._semaphore:
+                response = await self._client.get("/tracks/batch", params={"ids": chunk})
+                response.raise_for_status()
+                found = {track["id"] for track in response.json()}
+            missing.extend(track_id for track_id in chunk if track_id not in found)
+        return missing
+
+    async def get_tracks(self, track_ids: list[str]) -> dict[str, dict]:
+        """
+        Metadata by track id for the tracks that exist and could be fetched.
+        """
+        result: dict[str, dict] = {}
+        missing = []
+        for track_id in dict.fromkeys(track_ids):
+            hit, metadata = self._cached(track_id)
+            if not hit:
+                missing.append(track_id)
+            elif metadata is not None:
+                result[track_id] = metadata
+
+        if missing:
+            if self._client is None:
+                await self.start()
+            chunks = [missing[i:i + self._batch_size] for i in range(0, len(missing), self._batch_size)]
+            outcomes = await asyncio.gather(*(self._fetch(chunk) for chunk in chunks), return_exceptions=True)
+            for outcome in outcomes:
+                if isinstance(outcome, Exception):
+                    logger.warning("TrackService batch lookup failed: %s", outcome)
+            for track_id in missing:
+                hit, metadata = self._cached(track_id)
+                if hit and metadata is not None:
+                    result[track_id] = metadata
+        return result
@@ -0,0 +1,204 @@
+"""
+Local replica of the set of live tracks in TrackService.
+"""
+import asyncio
+import bisect
+import heapq
+import logging
+import time
+from array import array
+from typing import Awaitable, Callable, Iterable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+ID_LENGTH = 26
+
+
+class _SortedIds:
+    """
+    The fixed-width records of a sorted id blob as a sequence, for bisect.
+    """
+
+    def __init__(self, blob: bytes) -> None:
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._blob) // ID_LENGTH
+
+    def __getitem__(self, index: int) -> bytes:
+        return self._blob[index * ID_LENGTH:(index + 1) * ID_LENGTH]
+
+
+class TrackRegistry:
+    """
+    Ids and durations of live tracks, replicated from TrackService.
+
+    Most of the set is a sorted array: the ids packed into one bytes
+    object, 26 bytes each, and their durations in an `array("i")` at the
+    same positions, about 30 bytes per track in all. Changes since the
+    last merge sit in a small dict and set that are checked first; once
+    there are `merge_threshold` of them they are merged into the array.
+    A lookup is two hash lookups and a binary search, without I/O.
+
+    `run_sync_loop` loads a snapshot from `/internal/track-ids`, then
+    polls `/internal/track-events` every `poll_seconds` and hands the
+    ids of deleted tracks to its callback until it succeeds. The feed
+    repeats its most recent events, so applying them is idempotent.
+    Until the first snapshot is loaded `ready` is False, and an unknown
+    id does not mean the track is missing; neither does it once the feed
+    has not been read for a while (see `fresh`).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        poll_seconds: float = 2,
+        page_size: int = 10_000,
+        merge_threshold: int = 4096,
+        timeout: float = 10,
+        token: str | None = None,
+    ) -> None:
+        self._base_url = base_url.rstrip("/")
+        self.headers = {"X-Internal-Token": token} if token else {}
+        self._poll_seconds = poll_seconds
+        self._page_size = page_size
+        self._merge_threshold = merge_threshold
+        self._timeout = timeout
+        self.ready = False
+        self._synced_at: float | None = None
+        self._cursor = 0
+        self._ids = _SortedIds(b"")
+        self._durations = array("i")
+        self._added: dict[str, int] = {}
+        self._removed: set[str] = set()
+        self._deleted: set[str] = set()
+
+    def fresh(self, max_age: float) -> bool:
+        """
+        Whether the replica was loaded and caught up with the feed within the last `max_age` seconds.
+        """
+        return self.ready and self._synced_at is not None and time.monotonic() - self._synced_at <= max_age
+
+    def duration(self, track_id: str) -> int | None:
+        """
+        Duration of a live track; None if the track is not known.
+        """
+        if track_id in self._added:
+            return self._added[track_id]
+        if track_id in self._removed or len(track_id) != ID_LENGTH or not track_id.isascii():
+            return None
+        key = track_id.encode("ascii")
+        index = bisect.bisect_left(self._ids, key)
+        if index < len(self._ids) and self._ids[index] == key:
+            return self._durations[index]
+        return None
+
+    def durations(self, track_ids: Iterable[str]) -> dict[str, int]:
+        result = {}
+        for track_id in track_ids:
+            duration = self.duration(track_id)
+            if duration is not None:
+                result[track_id] = duration
+        return result
+
+    def _load(self, tracks: Iterable[tuple[bytes, int]]) -> None:
+        """
+        Replace the array with (id, duration) pairs sorted by id.
+        """
+        ids = bytearray()
+        durations = array("i")
+        for key, duration in tracks:
+            if len(key) == ID_LENGTH:
+                ids += key
+                durations.append(duration)
+        self._ids = _SortedIds(bytes(ids))
+        self._durations = durations
+        self._added = {}
+        self._removed = set()
+
+    def _merge(self) -> None:
+        added = sorted(
+            (track_id.encode("ascii"), duration)
+            for track_id, duration in self._added.items()
+            if len(track_id) == ID_LENGTH and track_id.isascii()
+        )
+        # Добавленные заново тоже выкидываем из массива, чтобы не было дублей
+        dropped = {track_id.encode("ascii") for track_id in self._removed if track_id.isascii()}
+        dropped.update(key for key, _ in added)
+        ids, durations = self._ids, self._durations
+        kept = ((ids[i], durations[i]) for i in range(len(ids)) if ids[i] not in dropped)
+        self._load(heapq.merge(kept, added))
+
+    def apply(self, events: list[dict]) -> list[str]:
+        """
+        Apply feed events in order; returns the ids of deleted tracks.
+        """
+        deleted = []
+        for event in events:
+            track_id = event["track_id"]
+            if event["op"] == "create":
+                self._removed.discard(track_id)
+                self._added[track_id] = event["duration_seconds"] or 0
+            elif event["op"] == "delete":
+                self._added.pop(track_id, None)
+                self._removed.add(track_id)
+                deleted.append(track_id)
+        if len(self._added) + len(self._removed) >= self._merge_threshold:
+            self._merge()
+        return deleted
+
+    async def load_snapshot(self, client: httpx.AsyncClient) -> None:
+        tracks: list[tuple[bytes, int]] = []
+        cursor = None
+        after = ""
+        while True:
+            response = await client.get("/internal/track-ids", params={"after": after, "limit": self._page_size})
+            response.raise_for_status()
+            page = response.json()
+            # События после курсора первой страницы накладываются поверх всего снимка
+            if cursor is None:
+                cursor = page["cursor"]
+            tracks.extend((track_id.encode("ascii"), duration) for track_id, duration in page["tracks"])
+            if len(page["tracks"]) < self._page_size:
+                break
+            after = page["tracks"][-1][0]
+        # Порядок строк в базе зависит от её collation, здесь нужен побайтный
+        tracks.sort()
+        self._load(tracks)
+        self._cursor = cursor
+        self.ready = True
+        self._synced_at = time.monotonic()
+        logger.info("Loaded %d live tracks from TrackService", len(tracks))
+
+    async def sync(self, client: httpx.AsyncClient) -> list[str]:
+        response = await client.get("/internal/track-events", params={"since": self._cursor, "limit": self._page_size})
+        if response.status_code == 410:
+            logger.warning("Track event cursor expired, reloading the snapshot")
+            await self.load_snapshot(client)
+            return []
+        response.raise_for_status()
+        feed = response.json()
+        deleted = self.apply(feed["events"])
+        self._cursor = max(self._cursor, feed["cursor"])
+        self._synced_at = time.monotonic()
+        return deleted
+
+    async def run_sync_loop(self, on_deleted: Callable[[list[str]], Awaitable[None]]) -> None:
+        async with httpx.AsyncClient(base_url=self._base_url, timeout=self._timeout, headers=self.headers) as client:
+            while True:
+                try:
+                    if not self.ready:
+                        await self.load_snapshot(client)
+                    self._deleted.update(await self.sync(client))
+                except Exception as e:
+                    logger.warning("Track feed sync failed: %s", e)
+                if self._deleted:
+                    batch = sorted(self._deleted)
+                    try:
+                        await on_deleted(batch)
+                        self._deleted.difference_update(batch)
+                    except Exception:
+                        logger.exception("Removing deleted tracks from playlists failed")
+                await asyncio.sleep(self._poll_seconds)
@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+# Настройки читаются при импорте app.*, поэтому задаём их до него
+os.environ.setdefault("DATABASE_HOST", "localhost")
+os.environ.setdefault("DATABASE_PORT", "5432")
+os.environ.setdefault("DATABASE_USER", "test")
+os.environ.setdefault("DATABASE_PASSWORD", "test")
+os.environ.setdefault("DATABASE_NAME", "test")
+os.environ.setdefault("ALGORITHM", "RS256")
+os.environ.setdefault("ISSUER", "test")
+os.environ.setdefault("AUDIENCE", "test")
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException, Query
+
+from app.track_client import TrackClient
+
+
+def track_id(n: int) -> str:
+    return f"T{n:025d}"
+
+
+def make_track(n: int, duration: int = 180) -> dict:
+    return {"id": track_id(n), "title": f"Track {n}", "duration_seconds": duration, "user_id": "U" * 26}
+
+
+class TrackServiceStandIn:
+    """
+    The part of TrackService that PlaylistService calls, in process:
+    GET /tracks/batch over a dict of tracks. Records every request and
+    fails the ones that ask for an id in `failing`.
+    """
+
+    def __init__(self, tracks: list[dict]) -> None:
+        self.tracks = {track["id"]: track for track in tracks}
+        self.failing: set[str] = set()
+        self.requests: list[list[str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = FastAPI()
+
+        @self.app.get("/tracks/batch")
+        async def read_batch(ids: list[str] = Query(..., max_length=100)):
+            self.requests.append(ids)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            try:
+                # Даём параллельным запросам пересечься
+                await asyncio.sleep(0.01)
+                if self.failing & set(ids):
+                    raise HTTPException(503, "TrackService is unavailable")
+                return [self.tracks[i] for i in ids if i in self.tracks]
+            finally:
+                self.in_flight -= 1
+
+    @property
+    def requested_ids(self) -> list[str]:
+        return [i for ids in self.requests for i in ids]
+
+    def client(self, **kwargs) -> TrackClient:
+        return TrackClient("http://track_service", transport=httpx.ASGITransport(app=self.app), **kwargs)
+
+
+@pytest.fixture
+def track_service() -> TrackServiceStandIn:
+    return TrackServiceStandIn([make_track(n, duration=100 + n) for n in range(10)])
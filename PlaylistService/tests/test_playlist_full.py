@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import _get_db
+from app.models import Playlist, PlaylistTrack
+from app.routers import playlists as playlists_router
+from tests.conftest import track_id
+
+PLAYLIST_ID = "P" * 26
+
+# Схема без того, что есть только в Postgres: tsvector и collation "C"
+_SCHEMA = [
+    """
+    CREATE TABLE playlists (
+        id VARCHAR(26) PRIMARY KEY,
+        user_id VARCHAR(26),
+        title VARCHAR(200) NOT NULL,
+        description VARCHAR(1000),
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL,
+        track_count INTEGER NOT NULL DEFAULT 0,
+        total_duration_seconds INTEGER NOT NULL DEFAULT 0,
+        cover_track_id VARCHAR(26),
+        search_vector TEXT
+    )
+    """,
+    """
+    CREATE TABLE playlist_tracks (
+        playlist_id VARCHAR(26) NOT NULL REFERENCES playlists (id) ON DELETE CASCADE,
+        track_id VARCHAR(26) NOT NULL,
+        order_key VARCHAR(255) NOT NULL,
+        added_at DATETIME NOT NULL,
+        duration_seconds INTEGER,
+        PRIMARY KEY (playlist_id, track_id)
+    )
+    """,
+]
+
+
+@pytest.fixture
+def api(tmp_path, track_service, monkeypatch):
+    """
+    Runs `scenario(client)` against the playlists router with a SQLite
+    database holding one playlist of tracks 0..4, of which 3 and 4 are
+    not in TrackService.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'playlists.db'}")
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    track_client = track_service.client(batch_size=2)
+    monkeypatch.setattr(playlists_router, "track_client", track_client)
+
+    app = FastAPI()
+    app.include_router(playlists_router.router)
+
+    async def get_db():
+        async with sessions() as session:
+            yield session
+
+    app.dependency_overrides[_get_db] = get_db
+    del track_service.tracks[track_id(3)], track_service.tracks[track_id(4)]
+
+    async def seed():
+        async with engine.begin() as conn:
+            for statement in _SCHEMA:
+                await conn.execute(text(statement))
+        now = datetime.now(timezone.utc)
+        async with sessions() as db:
+            db.add(Playlist(
+                id=PLAYLIST_ID, user_id="U" * 26, title="Road trip", created_at=now, updated_at=now,
+                track_count=5, total_duration_seconds=530, cover_track_id=track_id(0),
+            ))
+            db.add_all(
+                PlaylistTrack(
+                    playlist_id=PLAYLIST_ID, track_id=track_id(n), order_key=f"a{n}",
+                    added_at=now, duration_seconds=100 + n,
+                )
+                for n in range(5)
+            )
+            await db.commit()
+
+    def run(scenario):
+        async def main():
+            await seed()
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://playlists") as client:
+                    return await scenario(client)
+            finally:
+                await track_client.close()
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+def test_full_playlist_joins_track_metadata(api, track_service):
+    async def scenario(client):
+        return await client.get(f"/playlists/{PLAYLIST_ID}/full")
+
+    response = api(scenario)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["title"] == "Road trip"
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.headers["X-Total-Duration"] == "530"
+    assert "X-Next-Cursor" not in response.headers
+    assert [track["track_id"] for track in body["tracks"]] == [track_id(n) for n in range(5)]
+    assert body["tracks"][1]["track"]["title"] == "Track 1"
+    # Удалённые в TrackService треки остаются в плейлисте, но без метаданных
+    assert body["tracks"][3]["track"] is None
+    assert body["tracks"][4]["track"] is None
+    assert sorted(len(ids) for ids in track_service.requests) == [1, 2, 2]
+
+
+def test_full_playlist_pages_and_reuses_cached_metadata(api, track_service):
+    async def scenario(client):
+        first = await client.get(f"/playlists/{PLAYLIST_ID}/full", params={"limit": 3})
+        second = await client.get(
+            f"/playlists/{PLAYLIST_ID}/full", params={"limit": 3, "cursor": first.headers["X-Next-Cursor"]}
+        )
+        again = await client.get(f"/playlists/{PLAYLIST_ID}/full", params={"limit": 3})
+        return first, second, again
+
+    first, second, again = api(scenario)
+
+    assert [track["track_id"] for track in first.json()["tracks"]] == [track_id(n) for n in range(3)]
+    assert [track["track_id"] for track in second.json()["tracks"]] == [track_id(3), track_id(4)]
+    assert "X-Next-Cursor" not in second.headers
+    assert again.json() == first.json()
+    # Каждый трек запрошен у TrackService один раз, включая отсутствующие
+    assert sorted(track_service.requested_ids) == [track_id(n) for n in range(5)]
+
+
+def test_full_playlist_survives_track_service_failure(api, track_service):
+    track_service.failing = set(track_service.tracks)
+
+    async def scenario(client):
+        return await client.get(f"/playlists/{PLAYLIST_ID}/full")
+
+    response = api(scenario)
+
+    assert response.status_code == 200
+    assert [track["track"] for track in response.json()["tracks"]] == [None] * 5
+    assert [track["duration_seconds"] for track in response.json()["tracks"]] == [100, 101, 102, 103, 104]
+
+
+def test_unknown_playlist_is_404(api):
+    async def scenario(client):
+        return await client.get(f"/playlists/{'X' * 26}/full")
+
+    assert api(scenario).status_code == 404
+
+
+def test_invalid_cursor_is_400(api):
+    async def scenario(client):
+        return await client.get(f"/playlists/{PLAYLIST_ID}/full", params={"cursor": "not-a-cursor"})
+
+    assert api(scenario).status_code == 400
@@ -0,0 +1,134 @@
+import asyncio
+from types import SimpleNamespace
+
+from app import track_client as track_client_module
+from tests.conftest import track_id
+
+
+def test_fetches_missing_tracks_in_chunks(track_service):
+    client = track_service.client(batch_size=3, concurrency=2)
+    ids = [track_id(n) for n in range(8)]
+
+    async def scenario():
+        try:
+            return await client.get_tracks(ids)
+        finally:
+            await client.close()
+
+    result = asyncio.run(scenario())
+
+    assert list(result) == ids
+    assert result[track_id(5)]["duration_seconds"] == 105
+    assert [len(ids) for ids in track_service.requests] == [3, 3, 2]
+    assert sorted(track_service.requested_ids) == ids
+    assert track_service.max_in_flight <= 2
+
+
+def test_duplicate_ids_are_requested_once(track_service):
+    client = track_service.client()
+
+    async def scenario():
+        try:
+            return await client.get_tracks([track_id(1), track_id(1), track_id(2)])
+        finally:
+            await client.close()
+
+    assert list(asyncio.run(scenario())) == [track_id(1), track_id(2)]
+    assert track_service.requests == [[track_id(1), track_id(2)]]
+
+
+def test_caches_found_and_missing_tracks(track_service):
+    client = track_service.client()
+    unknown = track_id(99)
+
+    async def scenario():
+        try:
+            first = await client.get_tracks([track_id(1), unknown])
+            second = await client.get_tracks([track_id(1), unknown])
+            return first, second
+        finally:
+            await client.close()
+
+    first, second = asyncio.run(scenario())
+
+    assert list(first) == [track_id(1)]
+    assert second == first
+    # Несуществующий трек тоже закеширован: второй вызов обходится без запроса
+    assert track_service.requests == [[track_id(1), unknown]]
+
+
+def test_cache_entries_expire_after_ttl(track_service, monkeypatch):
+    now = [1000.0]
+    # Подменяем часы только клиенту: asyncio тоже живёт на time.monotonic
+    monkeypatch.setattr(track_client_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    client = track_service.client(ttl=30)
+
+    async def scenario():
+        try:
+            await client.get_tracks([track_id(1)])
+            now[0] += 29
+            await client.get_tracks([track_id(1)])
+            now[0] += 2
+            track_service.tracks[track_id(1)] = {**track_service.tracks[track_id(1)], "title": "Renamed"}
+            return await client.get_tracks([track_id(1)])
+        finally:
+            await client.close()
+
+    result = asyncio.run(scenario())
+
+    assert len(track_service.requests) == 2
+    assert result[track_id(1)]["title"] == "Renamed"
+
+
+def test_failed_chunk_leaves_only_its_tracks_without_metadata(track_service):
+    client = track_service.client(batch_size=2)
+    track_service.failing = {track_id(2)}
+    ids = [track_id(n) for n in range(6)]
+
+    async def scenario():
+        try:
+            partial = await client.get_tracks(ids)
+            track_service.failing = set()
+            retried = await client.get_tracks(ids)
+            return partial, retried
+        finally:
+            await client.close()
+
+    partial, retried = asyncio.run(scenario())
+
+    assert sorted(partial) == [track_id(0), track_id(1), track_id(4), track_id(5)]
+    # Неудавшийся кусок не кешируется и запрашивается снова
+    assert sorted(retried) == ids
+    assert track_service.requests[-1] == [track_id(2), track_id(3)]
+
+
+def test_cache_is_bounded(track_service):
+    client = track_service.client(cache_size=2)
+
+    async def scenario():
+        try:
+            await client.get_tracks([track_id(1), track_id(2), track_id(3)])
+            await client.get_tracks([track_id(3)])
+            await client.get_tracks([track_id(1)])
+        finally:
+            await client.close()
+
+    asyncio.run(scenario())
+
+    assert track_service.requests[1:] == [[track_id(1)]]
+
+
+def test_find_missing_bypasses_the_cache(track_service):
+    client = track_service.client(batch_size=2)
+    ids = [track_id(1), track_id(98), track_id(2), track_id(99)]
+
+    async def scenario():
+        try:
+            await client.get_tracks(ids)
+            del track_service.tracks[track_id(2)]
+            return await client.find_missing(ids)
+        finally:
+            await client.close()
+
+    assert asyncio.run(scenario()) == [track_id(98), track_id(2), track_id(99)]
+    assert len(track_service.requests) == 4
@@ -11,8 +11,15 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: SecretStr = Field(..., env="DATABASE_PASSWORD")
     DATABASE_NAME: str        = Field(..., env="DATABASE_NAME")
     
-    PUBLIC_KEY_PATH: str    = Field(..., env="PUBLIC_KEY_PATH")
+    PUBLIC_KEY_PATH: str | None = Field(None, env="PUBLIC_KEY_PATH")
+    JWKS_URL: str | None    = Field(None, env="JWKS_URL")
+    JWKS_REFRESH_SECONDS: int = Field(300, env="JWKS_REFRESH_SECONDS")
+    JWT_CACHE_SIZE: int     = Field(10_000, env="JWT_CACHE_SIZE")
+    REVOCATIONS_URL: str | None = Field(None, env="REVOCATIONS_URL")
+    REVOCATION_POLL_SECONDS: float = Field(2, env="REVOCATION_POLL_SECONDS")
+    INTERNAL_API_TOKEN: SecretStr | None = Field(None, env="INTERNAL_API_TOKEN")
     ALGORITHM: str          = Field(..., env="ALGORITHM")
+    ACCEPTED_ALGORITHMS: list[str] = Field([], env="ACCEPTED_ALGORITHMS")
     ISSUER: str             = Field(..., env="ISSUER")
     AUDIENCE: str           = Field(..., env="AUDIENCE")
 
@@ -1,15 +1,29 @@
 from fastapi import Depends, HTTPException, status, Cookie
-from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 
 from app.config import settings
+from app.jwt_verifier import JWTVerifier, TokenError
+from app.revocation_list import RevocationList
 from app.database import session_dependency
 from app.models import Profile
 from app.services.profile_service import create_or_update_profile
 from app.schemas import ProfileCreate
 
-public_key = Path(settings.PUBLIC_KEY_PATH).read_text()
+verifier = JWTVerifier(
+    algorithms=[settings.ALGORITHM, *settings.ACCEPTED_ALGORITHMS],
+    issuer=settings.ISSUER,
+    audience=settings.AUDIENCE,
+    jwks_url=settings.JWKS_URL,
+    fallback_pem=Path(settings.PUBLIC_KEY_PATH).read_text() if settings.PUBLIC_KEY_PATH else None,
+    refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+    cache_size=settings.JWT_CACHE_SIZE,
+)
+revocations = RevocationList(
+    settings.REVOCATIONS_URL,
+    settings.REVOCATION_POLL_SECONDS,
+    token=settings.INTERNAL_API_TOKEN.get_secret_value() if settings.INTERNAL_API_TOKEN else None,
+)
 
 async def get_current_profile(
     db: session_dependency,
@@ -18,18 +32,14 @@ async def get_current_profile(
     if not access_token:
         raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Missing access token")
     try:
-        payload = jwt.decode(
-            access_token,
-            public_key,
-            algorithms=[settings.ALGORITHM],
-            issuer=settings.ISSUER,
-            audience=settings.AUDIENCE,
-        )
-    except JWTError as e:
+        payload = verifier.verify(access_token)
+    except TokenError as e:
         raise HTTPException(
             status.HTTP_401_UNAUTHORIZED,
             f"Invalid token: {e}"
         )
+    if revocations.is_revoked(payload):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Token has been revoked")
     user_id = payload.get("sub")
     profile = await db.get(Profile, user_id)
     if not profile:
@@ -1,3 +1,5 @@
+import asyncio
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -5,6 +7,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.routers.profile import router as profile_router
 from app.minio_async import ensure_bucket_exists
+from app.dependencies import verifier, revocations
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
@@ -18,9 +21,19 @@ app.add_middleware(
 
 app.include_router(profile_router)
 
+_background_tasks: list[asyncio.Task] = []
+
 @app.on_event("startup")
 async def startup_event():
     await ensure_bucket_exists()
+    _background_tasks.append(asyncio.create_task(verifier.run_refresh_loop()))
+    _background_tasks.append(asyncio.create_task(revocations.run_sync_loop()))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
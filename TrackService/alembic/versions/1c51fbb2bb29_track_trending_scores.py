@@ -0,0 +1,33 @@
+"""track trending scores
+
+Revision ID: 1c51fbb2bb29
+Revises: 41441c5a1871
+Create Date: 2026-10-19 10:12:41.208153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c51fbb2bb29'
+down_revision: Union[str, None] = '41441c5a1871'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('track_trending_scores',
+    sa.Column('track_id', sa.String(length=26), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('track_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('track_trending_scores')
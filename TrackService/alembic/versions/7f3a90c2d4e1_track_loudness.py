@@ -0,0 +1,30 @@
+"""track loudness
+
+Revision ID: 7f3a90c2d4e1
+Revises: 1c51fbb2bb29
+Create Date: 2026-10-19 11:02:17.448120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a90c2d4e1'
+down_revision: Union[str, None] = '1c51fbb2bb29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tracks', sa.Column('loudness_lufs', sa.Float(), nullable=True))
+    op.add_column('tracks', sa.Column('true_peak_dbtp', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tracks', 'true_peak_dbtp')
+    op.drop_column('tracks', 'loudness_lufs')
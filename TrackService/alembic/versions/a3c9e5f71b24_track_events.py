@@ -0,0 +1,37 @@
+"""track events
+
+Revision ID: a3c9e5f71b24
+Revises: e9a1f4c3b572
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5f71b24'
+down_revision: Union[str, None] = 'e9a1f4c3b572'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('track_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('track_id', sa.String(length=26), nullable=False),
+    sa.Column('op', sa.String(length=6), nullable=False),
+    sa.Column('duration_seconds', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('clock_timestamp()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_track_events_created_at'), 'track_events', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_track_events_created_at'), table_name='track_events')
+    op.drop_table('track_events')
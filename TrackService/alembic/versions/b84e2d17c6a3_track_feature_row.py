@@ -0,0 +1,28 @@
+"""track feature row
+
+Revision ID: b84e2d17c6a3
+Revises: 7f3a90c2d4e1
+Create Date: 2026-10-19 12:31:05.117392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e2d17c6a3'
+down_revision: Union[str, None] = '7f3a90c2d4e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tracks', sa.Column('feature_row', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tracks', 'feature_row')
@@ -0,0 +1,28 @@
+"""track cover key
+
+Revision ID: d25c7e8f0b16
+Revises: b84e2d17c6a3
+Create Date: 2026-10-19 13:48:52.603914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd25c7e8f0b16'
+down_revision: Union[str, None] = 'b84e2d17c6a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tracks', sa.Column('cover_key', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('tracks', 'cover_key')
@@ -0,0 +1,36 @@
+"""user storage usage
+
+Revision ID: e9a1f4c3b572
+Revises: d25c7e8f0b16
+Create Date: 2026-10-19 15:06:33.871420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9a1f4c3b572'
+down_revision: Union[str, None] = 'd25c7e8f0b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tracks', sa.Column('storage_bytes', sa.BigInteger(), nullable=True))
+    op.create_table('user_storage_usage',
+    sa.Column('user_id', sa.String(length=26), nullable=False),
+    sa.Column('bytes_used', sa.BigInteger(), nullable=False),
+    sa.Column('object_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_storage_usage')
+    op.drop_column('tracks', 'storage_bytes')
@@ -0,0 +1,93 @@
+"""
+Measure loudness for tracks uploaded before it was computed at ingest.
+
+    python -m app.commands.backfill_loudness --workers 4
+
+Tracks are read from MinIO concurrently and decoded/analysed in a
+process pool; results are written back one batch per UPDATE.
+"""
+import argparse
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+from pydub import AudioSegment
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.database import _async_session
+from app.minio_async import get_minio_client
+from app.models import Track
+from app.services.audio_analysis import Loudness, analyze_loudness
+
+logger = logging.getLogger("backfill_loudness")
+
+
+def _analyze_bytes(data: bytes) -> Loudness:
+    audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    return analyze_loudness(audio)
+
+
+async def _measure(client, pool, semaphore: asyncio.Semaphore, key: str) -> Loudness:
+    async with semaphore:
+        s3_obj = await client.get_object(Bucket=settings.MINIO_BUCKET, Key=key)
+        data = await s3_obj["Body"].read()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, _analyze_bytes, data)
+
+
+async def backfill(workers: int, batch_size: int) -> None:
+    semaphore = asyncio.Semaphore(workers * 2)
+    last_id = ""
+    done = failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with get_minio_client() as client:
+            while True:
+                # Курсор по id: треки, для которых громкость не определилась
+                # (тишина, битый файл), повторно не обрабатываются
+                async with _async_session() as db:
+                    rows = (await db.execute(
+                        select(Track.id, Track.file_key)
+                        .where(Track.loudness_lufs.is_(None), Track.id > last_id)
+                        .order_by(Track.id)
+                        .limit(batch_size)
+                    )).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                results = await asyncio.gather(
+                    *(_measure(client, pool, semaphore, row.file_key) for row in rows),
+                    return_exceptions=True,
+                )
+                values = []
+                for row, result in zip(rows, results):
+                    if isinstance(result, BaseException):
+                        failed += 1
+                        logger.warning("Track %s: %s", row.id, result)
+                        continue
+                    values.append({
+                        "id": row.id,
+                        "loudness_lufs": result.integrated_lufs,
+                        "true_peak_dbtp": result.true_peak_dbtp,
+                    })
+                if values:
+                    async with _async_session() as db:
+                        await db.execute(update(Track), values)
+                        await db.commit()
+                done += len(values)
+                logger.info("Processed %d tracks, %d failed", done, failed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(backfill(args.workers, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
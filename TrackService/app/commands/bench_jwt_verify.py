@@ -0,0 +1,104 @@
+"""
+Per-request cost of access-token verification.
+
+    python -m app.commands.bench_jwt_verify [--iterations 2000] [--algorithm RS256]
+
+Signs a token with a throwaway key and times three ways of checking it:
+parsing the PEM and verifying on every request (what the dependencies
+used to do), verifying with a pre-parsed key, and the verifier's cache
+of already-verified tokens. Needs no settings or running services.
+"""
+import argparse
+import base64
+import json
+import time
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
+from app.jwt_verifier import JWTVerifier, verify_signature
+
+_ISSUER = "bench-issuer"
+_AUDIENCE = "bench-api"
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _generate(algorithm: str):
+    if algorithm == "RS256":
+        return rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    if algorithm == "ES256":
+        return ec.generate_private_key(ec.SECP256R1())
+    if algorithm == "EdDSA":
+        return ed25519.Ed25519PrivateKey.generate()
+    raise SystemExit(f"Unsupported algorithm: {algorithm}")
+
+
+def _sign(private_key, algorithm: str, claims: dict) -> str:
+    header = _b64(json.dumps({"alg": algorithm, "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signing_input = f"{header}.{payload}".encode("ascii")
+    if algorithm == "RS256":
+        signature = private_key.sign(signing_input, padding.PKCS1v15(), hashes.SHA256())
+    elif algorithm == "ES256":
+        r, s = decode_dss_signature(private_key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+        signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+    else:
+        signature = private_key.sign(signing_input)
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def _time(label: str, fn, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.perf_counter() - started) / iterations * 1e6
+    print(f"{label:<28} {per_call:10.1f} µs/request")
+    return per_call
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--algorithm", default="RS256", choices=["RS256", "ES256", "EdDSA"])
+    args = parser.parse_args()
+
+    private_key = _generate(args.algorithm)
+    pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode("ascii")
+    claims = {"iss": _ISSUER, "aud": _AUDIENCE, "sub": "bench-user", "exp": int(time.time()) + 3600}
+    token = _sign(private_key, args.algorithm, claims)
+    header_b64, payload_b64, signature_b64 = token.split(".")
+    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    signature = base64.urlsafe_b64decode(signature_b64 + "=" * (-len(signature_b64) % 4))
+
+    def parse_and_verify():
+        key = serialization.load_pem_public_key(pem.encode("ascii"))
+        verify_signature(key, args.algorithm, signing_input, signature)
+
+    def make_verifier(cache_size: int) -> JWTVerifier:
+        return JWTVerifier(
+            algorithms=[args.algorithm],
+            issuer=_ISSUER,
+            audience=_AUDIENCE,
+            fallback_pem=pem,
+            cache_size=cache_size,
+        )
+
+    uncached = make_verifier(0)
+    cached = make_verifier(1)
+
+    print(f"{args.algorithm}, {args.iterations} iterations")
+    baseline = _time("PEM parse + verify", parse_and_verify, args.iterations)
+    _time("pre-parsed key", lambda: uncached.verify(token), args.iterations)
+    fast = _time("verified-token cache hit", lambda: cached.verify(token), args.iterations)
+    print(f"cache hit is {baseline / fast:.0f}x cheaper than the old path")
+
+
+if __name__ == "__main__":
+    main()
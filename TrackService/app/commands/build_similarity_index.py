@@ -0,0 +1,98 @@
+"""
+Add existing tracks to the similarity index and rebuild it.
+
+    python -m app.commands.build_similarity_index --workers 4
+
+Tracks without a `feature_row` are read from MinIO concurrently and
+analysed in a process pool. Afterwards the search vectors are rebuilt
+from the raw features with fresh mean/std and reclustered. Run it
+periodically (`--rebuild-only` skips the MinIO pass) so that uploads
+made since the last run move from the exactly-scanned tail into the
+clusters.
+"""
+import argparse
+import asyncio
+import io
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from pydub import AudioSegment
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.database import _async_session
+from app.minio_async import get_minio_client
+from app.models import Track
+from app.services.audio_features import extract_features
+from app.services.similarity_service import similarity_index
+
+logger = logging.getLogger("build_similarity_index")
+
+
+def _features_from_bytes(data: bytes) -> np.ndarray | None:
+    audio = AudioSegment.from_file(io.BytesIO(data), format="mp3")
+    return extract_features(audio)
+
+
+async def _extract(client, pool, semaphore: asyncio.Semaphore, key: str) -> np.ndarray | None:
+    async with semaphore:
+        s3_obj = await client.get_object(Bucket=settings.MINIO_BUCKET, Key=key)
+        data = await s3_obj["Body"].read()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(pool, _features_from_bytes, data)
+
+
+async def index_missing(workers: int, batch_size: int) -> None:
+    semaphore = asyncio.Semaphore(workers * 2)
+    last_id = ""
+    done = failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        async with get_minio_client() as client:
+            while True:
+                async with _async_session() as db:
+                    rows = (await db.execute(
+                        select(Track.id, Track.file_key)
+                        .where(Track.feature_row.is_(None), Track.id > last_id)
+                        .order_by(Track.id)
+                        .limit(batch_size)
+                    )).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                results = await asyncio.gather(
+                    *(_extract(client, pool, semaphore, row.file_key) for row in rows),
+                    return_exceptions=True,
+                )
+                values = []
+                for row, result in zip(rows, results):
+                    if isinstance(result, BaseException) or result is None:
+                        failed += 1
+                        logger.warning("Track %s: %s", row.id, result)
+                        continue
+                    feature_row = similarity_index.append(row.id, result)
+                    values.append({"id": row.id, "feature_row": feature_row})
+                if values:
+                    async with _async_session() as db:
+                        await db.execute(update(Track), values)
+                        await db.commit()
+                done += len(values)
+                logger.info("Indexed %d tracks, %d failed", done, failed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--rebuild-only", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if not args.rebuild_only:
+        asyncio.run(index_missing(args.workers, args.batch_size))
+    similarity_index.rebuild()
+    logger.info("Similarity index rebuilt")
+
+
+if __name__ == "__main__":
+    main()
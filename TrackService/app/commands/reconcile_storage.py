@@ -0,0 +1,21 @@
+"""
+Recount per-user storage usage from the objects actually in MinIO.
+
+    python -m app.commands.reconcile_storage
+
+The service runs the same job every STORAGE_RECONCILE_INTERVAL_SECONDS;
+run it by hand right after the migration to seed the counters.
+"""
+import asyncio
+import logging
+
+from app.services.storage_service import reconcile_storage_usage
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(reconcile_storage_usage())
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,15 @@ class Settings(BaseSettings):
     DATABASE_PASSWORD: SecretStr = Field(..., env="DATABASE_PASSWORD")
     DATABASE_NAME: str        = Field(..., env="DATABASE_NAME")
     
-    PUBLIC_KEY_PATH: str    = Field(..., env="PUBLIC_KEY_PATH")
+    PUBLIC_KEY_PATH: str | None = Field(None, env="PUBLIC_KEY_PATH")
+    JWKS_URL: str | None    = Field(None, env="JWKS_URL")
+    JWKS_REFRESH_SECONDS: int = Field(300, env="JWKS_REFRESH_SECONDS")
+    JWT_CACHE_SIZE: int     = Field(10_000, env="JWT_CACHE_SIZE")
+    REVOCATIONS_URL: str | None = Field(None, env="REVOCATIONS_URL")
+    REVOCATION_POLL_SECONDS: float = Field(2, env="REVOCATION_POLL_SECONDS")
+    INTERNAL_API_TOKEN: SecretStr | None = Field(None, env="INTERNAL_API_TOKEN")
     ALGORITHM: str          = Field(..., env="ALGORITHM")
+    ACCEPTED_ALGORITHMS: list[str] = Field([], env="ACCEPTED_ALGORITHMS")
     ISSUER: str             = Field(..., env="ISSUER")
     AUDIENCE: str           = Field(..., env="AUDIENCE")
 
@@ -22,6 +29,27 @@ class Settings(BaseSettings):
     MINIO_SECURE: bool      = Field(False, env="MINIO_SECURE")
     MINIO_PUBLIC_ENDPOINT: str = Field(..., env="MINIO_PUBLIC_ENDPOINT")
 
+    STORAGE_QUOTA_BYTES: int              = Field(2 * 1024 ** 3, env="STORAGE_QUOTA_BYTES")
+    STORAGE_RECONCILE_INTERVAL_SECONDS: int = Field(6 * 3600, env="STORAGE_RECONCILE_INTERVAL_SECONDS")
+
+    COVER_SIZES: list[int]                = Field([64, 160, 320], env="COVER_SIZES")
+    COVER_WEBP_QUALITY: int               = Field(80, env="COVER_WEBP_QUALITY")
+
+    LOUDNESS_REFERENCE_LUFS: float        = Field(-18.0, env="LOUDNESS_REFERENCE_LUFS")
+
+    SIMILARITY_INDEX_DIR: str             = Field("./data/similarity", env="SIMILARITY_INDEX_DIR")
+    SIMILARITY_NPROBE: int                = Field(16, env="SIMILARITY_NPROBE")
+
+    TRENDING_HALF_LIFE_HOURS: float       = Field(24.0, env="TRENDING_HALF_LIFE_HOURS")
+    TRENDING_REFRESH_INTERVAL_SECONDS: int = Field(30, env="TRENDING_REFRESH_INTERVAL_SECONDS")
+    TRENDING_POOL_SIZE: int               = Field(200, env="TRENDING_POOL_SIZE")
+    TRENDING_MIN_SCORE: float             = Field(0.01, env="TRENDING_MIN_SCORE")
+
+    # События моложе этого срока могут быть ещё не закоммичены — курсор ленты их не проходит
+    TRACK_EVENT_FEED_LAG_SECONDS: int     = Field(5, env="TRACK_EVENT_FEED_LAG_SECONDS")
+    TRACK_EVENT_RETENTION_DAYS: int       = Field(7, env="TRACK_EVENT_RETENTION_DAYS")
+    TRACK_EVENT_PURGE_INTERVAL_SECONDS: int = Field(3600, env="TRACK_EVENT_PURGE_INTERVAL_SECONDS")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -1,10 +1,25 @@
-from fastapi import Depends, HTTPException, Cookie
-from jose import jwt, JWTError
+import hmac
+from fastapi import Depends, HTTPException, Cookie, Header
 from pathlib import Path
 
 from app.config import settings
+from app.jwt_verifier import JWTVerifier, TokenError
+from app.revocation_list import RevocationList
 
-_PUBLIC_KEY = Path(settings.PUBLIC_KEY_PATH).read_text()
+verifier = JWTVerifier(
+    algorithms=[settings.ALGORITHM, *settings.ACCEPTED_ALGORITHMS],
+    issuer=settings.ISSUER,
+    audience=settings.AUDIENCE,
+    jwks_url=settings.JWKS_URL,
+    fallback_pem=Path(settings.PUBLIC_KEY_PATH).read_text() if settings.PUBLIC_KEY_PATH else None,
+    refresh_seconds=settings.JWKS_REFRESH_SECONDS,
+    cache_size=settings.JWT_CACHE_SIZE,
+)
+revocations = RevocationList(
+    settings.REVOCATIONS_URL,
+    settings.REVOCATION_POLL_SECONDS,
+    token=settings.INTERNAL_API_TOKEN.get_secret_value() if settings.INTERNAL_API_TOKEN else None,
+)
 
 async def get_current_user_id(
     access_token: str = Cookie(None),
@@ -12,13 +27,20 @@ async def get_current_user_id(
     if not access_token:
         raise HTTPException(401, "Missing access token")
     try:
-        payload = jwt.decode(
-            access_token,
-            _PUBLIC_KEY,
-            algorithms=[settings.ALGORITHM],
-            issuer=settings.ISSUER,
-            audience=settings.AUDIENCE,
-        )
-    except JWTError as e:
+        payload = verifier.verify(access_token)
+    except TokenError as e:
         raise HTTPException(401, f"Invalid token: {e}")
-    return payload["sub"]
\ No newline at end of file
+    if revocations.is_revoked(payload):
+        raise HTTPException(401, "Token has been revoked")
+    return payload["sub"]
+
+
+async def require_internal_token(x_internal_token: str = Header(None)) -> None:
+    """
+    Lets through only other services that present INTERNAL_API_TOKEN.
+    """
+    expected = settings.INTERNAL_API_TOKEN
+    if expected is None or not x_internal_token or not hmac.compare_digest(
+        x_internal_token.encode("utf-8"), expected.get_secret_value().encode("utf-8")
+    ):
+        raise HTTPException(403, "Invalid internal token")
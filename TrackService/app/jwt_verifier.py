@@ -0,0 +1,245 @@
+"""
+Access-token verification against the AuthService key set.
+"""
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+logger = logging.getLogger(__name__)
+
+_HASHES = {"256": hashes.SHA256, "384": hashes.SHA384, "512": hashes.SHA512}
+_CURVES = {"P-256": ec.SECP256R1, "P-384": ec.SECP384R1, "P-521": ec.SECP521R1}
+
+
+class TokenError(Exception):
+    pass
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _b64int(data: str) -> int:
+    return int.from_bytes(_b64decode(data), "big")
+
+
+def key_from_jwk(entry: dict):
+    """
+    `cryptography` public key for a JWK.
+    """
+    if entry["kty"] == "RSA":
+        return rsa.RSAPublicNumbers(_b64int(entry["e"]), _b64int(entry["n"])).public_key()
+    if entry["kty"] == "EC":
+        curve = _CURVES[entry["crv"]]()
+        return ec.EllipticCurvePublicNumbers(_b64int(entry["x"]), _b64int(entry["y"]), curve).public_key()
+    if entry["kty"] == "OKP" and entry["crv"] == "Ed25519":
+        return ed25519.Ed25519PublicKey.from_public_bytes(_b64decode(entry["x"]))
+    raise ValueError(f"Unsupported JWK type: {entry['kty']}")
+
+
+def verify_signature(key, algorithm: str, signing_input: bytes, signature: bytes) -> None:
+    """
+    Raises InvalidSignature unless `signature` is valid for `algorithm`.
+    """
+    family, bits = algorithm[:2], algorithm[2:]
+    if family == "RS" and isinstance(key, rsa.RSAPublicKey):
+        key.verify(signature, signing_input, padding.PKCS1v15(), _HASHES[bits]())
+    elif family == "PS" and isinstance(key, rsa.RSAPublicKey):
+        key.verify(
+            signature, signing_input,
+            padding.PSS(mgf=padding.MGF1(_HASHES[bits]()), salt_length=padding.PSS.DIGEST_LENGTH),
+            _HASHES[bits](),
+        )
+    elif family == "ES" and isinstance(key, ec.EllipticCurvePublicKey):
+        # JWS хранит подпись ECDSA как r||s, cryptography ждёт DER
+        half = len(signature) // 2
+        der = encode_dss_signature(
+            int.from_bytes(signature[:half], "big"), int.from_bytes(signature[half:], "big")
+        )
+        key.verify(der, signing_input, ec.ECDSA(_HASHES[bits]()))
+    elif algorithm == "EdDSA" and isinstance(key, ed25519.Ed25519PublicKey):
+        key.verify(signature, signing_input)
+    else:
+        raise InvalidSignature()
+
+
+class JWTVerifier:
+    """
+    Verifies tokens with the key named by their `kid` header.
+
+    Keys are fetched from the AuthService JWKS and parsed once into
+    `cryptography` key objects; `run_refresh_loop` keeps them current in
+    the background, so `verify` never waits on the network. A token with
+    an unknown kid wakes the refresher early, which picks up a freshly
+    rotated key within `min_refresh_seconds`.
+
+    `fallback_pem` (the key from PUBLIC_KEY_PATH) verifies tokens issued
+    without a kid and covers the time before the first successful fetch;
+    once the key set is loaded, a kid outside it is rejected.
+
+    Clients send the same access token with every request, so the claims
+    of verified tokens are kept in an LRU of up to `cache_size` entries
+    keyed by the token's SHA-256; an entry is only served until the
+    token's `exp`. The cache is dropped when a key leaves the key set.
+    """
+
+    def __init__(
+        self,
+        *,
+        algorithms: list[str],
+        issuer: str,
+        audience: str,
+        jwks_url: str | None = None,
+        fallback_pem: str | None = None,
+        refresh_seconds: float = 300,
+        min_refresh_seconds: float = 10,
+        cache_size: int = 10_000,
+    ) -> None:
+        self._algorithms = algorithms
+        self._issuer = issuer
+        self._audience = audience
+        self._jwks_url = jwks_url
+        self._refresh_seconds = refresh_seconds
+        self._min_refresh_seconds = min_refresh_seconds
+        self._fallback = load_pem_public_key(fallback_pem.encode("utf-8")) if fallback_pem else None
+        self._keys: dict[str, tuple[str, object]] = {}
+        self._wakeup = asyncio.Event()
+        self._cache_size = cache_size
+        self._cache: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+
+    def _parse(self, jwks: dict) -> dict:
+        keys = {}
+        for entry in jwks.get("keys", []):
+            if entry.get("use", "sig") != "sig" or entry.get("alg") not in self._algorithms:
+                continue
+            try:
+                keys[entry["kid"]] = (entry["alg"], key_from_jwk(entry))
+            except Exception as e:
+                logger.warning("Skipping JWK %s: %s", entry.get("kid"), e)
+        return keys
+
+    def set_keys(self, keys: dict) -> None:
+        if self._keys.keys() - keys.keys():
+            # Отозванный ключ: уже проверенные им токены больше не доверенные
+            self._cache.clear()
+        self._keys = keys
+
+    async def refresh(self, client: httpx.AsyncClient) -> None:
+        response = await client.get(self._jwks_url)
+        response.raise_for_status()
+        keys = self._parse(response.json())
+        if keys:
+            self.set_keys(keys)
+
+    async def run_refresh_loop(self) -> None:
+        if not self._jwks_url:
+            return
+        async with httpx.AsyncClient(timeout=5) as client:
+            while True:
+                try:
+                    await self.refresh(client)
+                except Exception as e:
+                    logger.warning("JWKS refresh failed: %s", e)
+                # Не чаще раза в min_refresh_seconds, даже если нас будят
+                await asyncio.sleep(self._min_refresh_seconds)
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        max(self._refresh_seconds - self._min_refresh_seconds, 0),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+    def _key_for(self, header: dict):
+        algorithm = header.get("alg")
+        if algorithm not in self._algorithms:
+            raise TokenError("Signature algorithm not allowed")
+        kid = header.get("kid")
+        # Заголовок ещё не проверен: kid-список упал бы в поиске по словарю
+        if kid is not None and not isinstance(kid, str):
+            raise TokenError("Malformed token")
+        if kid is not None and kid in self._keys:
+            key_algorithm, key = self._keys[kid]
+            if key_algorithm != algorithm:
+                raise TokenError("Algorithm does not match the signing key")
+            return key
+        if kid is not None:
+            self._wakeup.set()
+            # После загрузки набора ключей неизвестный kid — это отозванный или чужой ключ
+            if self._keys:
+                raise TokenError("Unknown signing key")
+        if self._fallback is None:
+            raise TokenError("Unknown signing key")
+        return self._fallback
+
+    def _check_claims(self, claims: dict, now: float) -> None:
+        exp = claims.get("exp")
+        if not isinstance(exp, (int, float)):
+            raise TokenError("Missing expiration")
+        if exp <= now:
+            raise TokenError("Signature has expired")
+        nbf = claims.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf > now:
+            raise TokenError("The token is not yet valid")
+        if claims.get("iss") != self._issuer:
+            raise TokenError("Invalid issuer")
+        aud = claims.get("aud")
+        if aud != self._audience and not (isinstance(aud, list) and self._audience in aud):
+            raise TokenError("Invalid audience")
+
+    def _decode(self, token: str, now: float) -> dict:
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+            header = json.loads(_b64decode(header_b64))
+            signature = _b64decode(signature_b64)
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not isinstance(header, dict):
+            raise TokenError("Malformed token")
+        key = self._key_for(header)
+        try:
+            verify_signature(key, header["alg"], f"{header_b64}.{payload_b64}".encode("ascii"), signature)
+        except (InvalidSignature, ValueError):
+            raise TokenError("Signature verification failed")
+        try:
+            claims = json.loads(_b64decode(payload_b64))
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not isinstance(claims, dict):
+            raise TokenError("Malformed token")
+        self._check_claims(claims, now)
+        return claims
+
+    def verify(self, token: str) -> dict:
+        """
+        Claims of a valid token; raises TokenError otherwise.
+        """
+        now = time.time()
+        digest = hashlib.sha256(token.encode("utf-8")).digest()
+        cached = self._cache.get(digest)
+        if cached is not None:
+            claims, exp = cached
+            if exp > now:
+                self._cache.move_to_end(digest)
+                return claims
+            del self._cache[digest]
+            raise TokenError("Signature has expired")
+
+        claims = self._decode(token, now)
+        if self._cache_size and "nbf" not in claims:
+            self._cache[digest] = (claims, claims["exp"])
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return claims
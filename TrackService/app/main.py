@@ -1,9 +1,15 @@
+import asyncio
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.routers.tracks import router as tracks_router
+from app.routers.internal import router as internal_router
 from app.services.track_service import ensure_bucket_exists
+from app.services.trending_service import run_trending_loop, flush_trending
+from app.services.storage_service import run_storage_reconcile_loop
+from app.services.track_event_service import run_track_event_purge_loop
+from app.dependencies import verifier, revocations
 
 
 app = FastAPI(title="Namity-Track")
@@ -16,11 +22,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_background_tasks: list[asyncio.Task] = []
+
 @app.on_event("startup")
 async def startup():
     await ensure_bucket_exists()
+    _background_tasks.append(asyncio.create_task(run_trending_loop()))
+    _background_tasks.append(asyncio.create_task(run_storage_reconcile_loop()))
+    _background_tasks.append(asyncio.create_task(run_track_event_purge_loop()))
+    _background_tasks.append(asyncio.create_task(verifier.run_refresh_loop()))
+    _background_tasks.append(asyncio.create_task(revocations.run_sync_loop()))
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    await flush_trending()
 
 app.include_router(tracks_router)
+app.include_router(internal_router)
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8002, reload=True)
\ No newline at end of file
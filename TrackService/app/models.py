@@ -1,6 +1,6 @@
 import ulid
 from datetime import datetime
-from sqlalchemy import String, Integer, DateTime, func
+from sqlalchemy import String, Integer, BigInteger, Float, DateTime, func
 from sqlalchemy.orm import Mapped, mapped_column
 from app.database import Base
 
@@ -32,6 +32,29 @@ class Track(Base):
     duration_seconds: Mapped[int] = mapped_column(
         Integer,nullable=False
     )
+
+    loudness_lufs: Mapped[float] = mapped_column(
+        Float, nullable=True
+    )
+
+    true_peak_dbtp: Mapped[float] = mapped_column(
+        Float, nullable=True
+    )
+
+    # Общий префикс миниатюр обложки: {cover_key}/{size}.webp
+    cover_key: Mapped[str] = mapped_column(
+        String, nullable=True
+    )
+
+    # Сколько байт в MinIO занимают аудио и миниатюры трека
+    storage_bytes: Mapped[int] = mapped_column(
+        BigInteger, nullable=True
+    )
+
+    # Строка трека в индексе похожести (app/services/similarity_service.py)
+    feature_row: Mapped[int] = mapped_column(
+        Integer, nullable=True
+    )
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -39,4 +62,83 @@ class Track(Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(),
         onupdate=func.now(), nullable=False
-    )
\ No newline at end of file
+    )
+
+
+class TrackTrendingScore(Base):
+    """
+    Exponentially decayed play score of a track.
+
+    `score` is the decayed value as of `updated_at`; readers decay it
+    further to "now" using the configured half-life.
+    """
+    __tablename__ = "track_trending_scores"
+
+    track_id: Mapped[str] = mapped_column(
+        String(26), primary_key=True
+    )
+
+    score: Mapped[float] = mapped_column(
+        Float, nullable=False, default=0.0
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class UserStorageUsage(Base):
+    """
+    Running total of a user's bytes in MinIO, maintained on every write
+    and periodically reset from the real object sizes.
+    """
+    __tablename__ = "user_storage_usage"
+
+    user_id: Mapped[str] = mapped_column(
+        String(26), primary_key=True
+    )
+
+    bytes_used: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+
+    object_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(),
+        onupdate=func.now(), nullable=False
+    )
+
+
+class TrackEvent(Base):
+    """
+    A track was created or deleted; the feed other services replicate
+    the set of live tracks from (app/services/track_event_service.py).
+    """
+    __tablename__ = "track_events"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger, primary_key=True
+    )
+
+    track_id: Mapped[str] = mapped_column(
+        String(26), nullable=False
+    )
+
+    # create | delete
+    op: Mapped[str] = mapped_column(
+        String(6), nullable=False
+    )
+
+    # Только для create: длительность не меняется после загрузки
+    duration_seconds: Mapped[int] = mapped_column(
+        Integer, nullable=True
+    )
+
+    # Момент вставки, а не начала транзакции (now()): по нему лента
+    # решает, что событие уже закоммичено
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.clock_timestamp(), nullable=False, index=True
+    )
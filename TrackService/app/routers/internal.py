@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.database import session_dependency
+from app.dependencies import require_internal_token
+from app.services.track_event_service import list_track_events, list_track_ids
+
+
+# Не проксируется nginx, но порт сервиса открыт — пускаем только по токену сервисов
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/track-ids")
+async def read_track_ids(
+    db: session_dependency,
+    after: str = Query("", max_length=26, description="Last id of the previous page"),
+    limit: int = Query(10_000, ge=1, le=50_000),
+):
+    """
+    Snapshot of live tracks, a page at a time, with the event cursor to follow afterwards.
+    """
+    return await list_track_ids(after, limit, db)
+
+
+@router.get("/track-events")
+async def read_track_events(
+    db: session_dependency,
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call"),
+    limit: int = Query(10_000, ge=1, le=50_000),
+):
+    """
+    Track creations and deletions after the cursor, for replication.
+    """
+    return await list_track_events(since, limit, db)
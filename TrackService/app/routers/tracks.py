@@ -9,17 +9,22 @@ from app.config import settings
 from app.minio_async import get_minio_client
 
 from app.database import session_dependency
-from app.schemas import TrackCreate, TrackRead, TrackUpdate
+from app.schemas import TrackCreate, TrackRead, TrackUpdate, StorageUsageRead
 from app.services.track_service import (
     create_track,
     list_user_tracks,
     get_track,
+    get_tracks_by_ids,
     update_track,
     delete_track,
     stream_track_service,
     search_tracks,
     get_random_tracks,
+    get_cover_thumbnail,
 )
+from app.services.trending_service import get_trending_tracks
+from app.services.similarity_service import get_similar_tracks
+from app.services.storage_service import get_storage_usage
 
 router = APIRouter(prefix="/tracks", tags=["tracks"])
 
@@ -30,7 +35,7 @@ router = APIRouter(prefix="/tracks", tags=["tracks"])
 )
 async def upload(
     db: session_dependency,
-    title: str = Form(...),
+    title: str = Form(""),
     description: str = Form(""),
     file: UploadFile = File(...),
     user_id: str = Depends(get_current_user_id),
@@ -44,6 +49,16 @@ async def list_my(
 ):
     return await list_user_tracks(user_id, db)
 
+@router.get("/storage", response_model=StorageUsageRead)
+async def my_storage_usage(
+    db: session_dependency,
+    user_id: str = Depends(get_current_user_id),
+):
+    """
+    Get storage used by the current user's uploads.
+    """
+    return await get_storage_usage(user_id, db)
+
 @router.get("/search", response_model=list[TrackRead])
 async def search(
     db: session_dependency,
@@ -67,6 +82,26 @@ async def get_random_tracks_endpoint(
     """
     return await get_random_tracks(limit, offset, db)
 
+@router.get("/trending", response_model=List[TrackRead])
+async def get_trending_tracks_endpoint(
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Get trending tracks ranked by time-decayed play count.
+    """
+    return await get_trending_tracks(limit, offset)
+
+@router.get("/batch", response_model=List[TrackRead])
+async def read_batch(
+    db: session_dependency,
+    ids: List[str] = Query(..., max_length=100),
+):
+    """
+    Metadata of up to 100 tracks by id (`?ids=a&ids=b`); unknown ids are skipped.
+    """
+    return await get_tracks_by_ids(ids, db)
+
 @router.get("/{track_id}/stream")
 async def stream_track(
     request: Request,
@@ -75,6 +110,25 @@ async def stream_track(
 ):
     return await stream_track_service(request, db, track_id)
 
+@router.get("/{track_id}/cover/{size}")
+async def get_cover(
+    db: session_dependency,
+    track_id: str,
+    size: int,
+):
+    return await get_cover_thumbnail(track_id, size, db)
+
+@router.get("/{track_id}/similar", response_model=List[TrackRead])
+async def get_similar_tracks_endpoint(
+    db: session_dependency,
+    track_id: str,
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Get tracks that sound similar to the given one.
+    """
+    return await get_similar_tracks(track_id, limit, db)
+
 @router.get("/{track_id}", response_model=TrackRead)
 async def read(
     db: session_dependency,
@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
 
+from app.config import settings
+
 class TrackCreate(BaseModel):
-    title: str = Field(..., max_length=200)
+    # Пустые поля заполняются из тегов загруженного файла
+    title: str | None = Field(None, max_length=200)
     description: str | None = None
 
 class TrackRead(BaseModel):
@@ -10,9 +13,12 @@ class TrackRead(BaseModel):
     title: str
     description: str | None
     duration_seconds: int
+    loudness_lufs: float | None = None
+    true_peak_dbtp: float | None = None
     created_at: datetime
     updated_at: datetime
     user_id: str
+    cover_key: str | None = Field(None, exclude=True)
 
     model_config = {"from_attributes": True}
 
@@ -22,6 +28,32 @@ class TrackRead(BaseModel):
         # этот метод будет вызван Pydantic автоматически
         return f"/tracks/{self.id}/stream"
 
+    @computed_field
+    @property
+    def cover_urls(self) -> dict[str, str] | None:
+        if not self.cover_key:
+            return None
+        return {str(size): f"/tracks/{self.id}/cover/{size}" for size in settings.COVER_SIZES}
+
+    @computed_field
+    @property
+    def replay_gain_db(self) -> float | None:
+        # Усиление до опорного уровня, которое плеер применяет как есть
+        if self.loudness_lufs is None:
+            return None
+        return round(settings.LOUDNESS_REFERENCE_LUFS - self.loudness_lufs, 2)
+
 class TrackUpdate(BaseModel):
     title: str | None = None
-    description: str | None = None
\ No newline at end of file
+    description: str | None = None
+
+class StorageUsageRead(BaseModel):
+    bytes_used: int
+    object_count: int
+
+    model_config = {"from_attributes": True}
+
+    @computed_field
+    @property
+    def quota_bytes(self) -> int:
+        return settings.STORAGE_QUOTA_BYTES
@@ -0,0 +1,162 @@
+"""
+Loudness analysis of decoded audio (ITU-R BS.1770 / EBU R128).
+
+Everything works on whole NumPy arrays: K-weighting and true-peak
+oversampling are done in the frequency domain over fixed-size,
+overlapping frames, so the cost is a handful of FFTs per track.
+"""
+import numpy as np
+from dataclasses import dataclass
+from numpy.lib.stride_tricks import sliding_window_view
+from pydub import AudioSegment
+
+_BLOCK_HOPS = 4             # 400 ms блок = 4 шага по 100 ms (перекрытие 75%)
+_HOP_SECONDS = 0.1
+_ABSOLUTE_GATE_LUFS = -70.0
+_RELATIVE_GATE_LU = -10.0
+_OVERSAMPLING = 4
+
+_FRAME = 1 << 16            # полезная часть кадра FFT
+_PAD = 1 << 11              # запас с обеих сторон против круговой свёртки
+_FRAMES_PER_GROUP = 8       # сколько кадров обрабатываем за одно FFT
+
+
+@dataclass
+class Loudness:
+    integrated_lufs: float | None
+    true_peak_dbtp: float | None
+
+
+def segment_to_pcm(audio: AudioSegment) -> np.ndarray:
+    """
+    Decoded samples as a (channels, samples) float32 array in [-1, 1].
+    Compute it once per track and pass it to every analysis.
+    """
+    # frombuffer — вид на массив pydub без копии, единственная копия — float32
+    raw = audio.get_array_of_samples()
+    samples = np.frombuffer(raw, dtype=raw.typecode).astype(np.float32)
+    samples *= 1 / float(1 << (8 * audio.sample_width - 1))
+    return samples.reshape(-1, audio.channels).T
+
+
+def _biquad_response(b: tuple, a: tuple, n_fft: int) -> np.ndarray:
+    z = np.exp(-1j * 2 * np.pi * np.fft.rfftfreq(n_fft))
+    return (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+
+
+def _k_weighting_response(n_fft: int, sample_rate: int) -> np.ndarray:
+    """
+    Frequency response of the BS.1770 K-weighting pre-filter
+    (high shelf followed by high pass) at the rfft bins of `n_fft`.
+    """
+    # High shelf: +4 dB above ~1.5 kHz
+    gain, q, fc = 4.0, 1 / np.sqrt(2), 1500.0
+    big_a = 10 ** (gain / 40)
+    w0 = 2 * np.pi * fc / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    shelf = _biquad_response(
+        (
+            big_a * ((big_a + 1) + (big_a - 1) * cos_w0 + 2 * np.sqrt(big_a) * alpha),
+            -2 * big_a * ((big_a - 1) + (big_a + 1) * cos_w0),
+            big_a * ((big_a + 1) + (big_a - 1) * cos_w0 - 2 * np.sqrt(big_a) * alpha),
+        ),
+        (
+            (big_a + 1) - (big_a - 1) * cos_w0 + 2 * np.sqrt(big_a) * alpha,
+            2 * ((big_a - 1) - (big_a + 1) * cos_w0),
+            (big_a + 1) - (big_a - 1) * cos_w0 - 2 * np.sqrt(big_a) * alpha,
+        ),
+        n_fft,
+    )
+
+    # High pass: RLB weighting below ~38 Hz
+    q, fc = 0.5, 38.0
+    w0 = 2 * np.pi * fc / sample_rate
+    alpha = np.sin(w0) / (2 * q)
+    cos_w0 = np.cos(w0)
+    high_pass = _biquad_response(
+        ((1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2),
+        (1 + alpha, -2 * cos_w0, 1 - alpha),
+        n_fft,
+    )
+    return shelf * high_pass
+
+
+def _frame_groups(pcm: np.ndarray):
+    """
+    Yield (first_frame, frames) where frames has shape
+    (channels, n, _FRAME + 2 * _PAD) and frame i covers samples
+    [i * _FRAME - _PAD, (i + 1) * _FRAME + _PAD).
+    """
+    n = pcm.shape[-1]
+    n_frames = -(-n // _FRAME)
+    padded = np.pad(pcm, [(0, 0), (_PAD, n_frames * _FRAME - n + _PAD)])
+    frames = sliding_window_view(padded, _FRAME + 2 * _PAD, axis=-1)[:, ::_FRAME, :]
+    for start in range(0, n_frames, _FRAMES_PER_GROUP):
+        yield start, frames[:, start:start + _FRAMES_PER_GROUP, :]
+
+
+def _k_weighted(pcm: np.ndarray, sample_rate: int) -> np.ndarray:
+    n_fft = _FRAME + 2 * _PAD
+    response = _k_weighting_response(n_fft, sample_rate)
+    channels, n = pcm.shape
+    out = np.empty((channels, -(-n // _FRAME) * _FRAME), dtype=np.float32)
+    for start, group in _frame_groups(pcm):
+        filtered = np.fft.irfft(np.fft.rfft(group, axis=-1) * response, n=n_fft, axis=-1)
+        filtered = filtered[..., _PAD:_PAD + _FRAME]
+        out[:, start * _FRAME:(start + group.shape[1]) * _FRAME] = filtered.reshape(channels, -1)
+    return out[:, :n]
+
+
+def integrated_loudness(pcm: np.ndarray, sample_rate: int) -> float | None:
+    """
+    Gated integrated loudness in LUFS, or None for silence and clips
+    shorter than one 400 ms block.
+    """
+    weighted = _k_weighted(pcm, sample_rate)
+    hop = int(round(sample_rate * _HOP_SECONDS))
+    n_hops = weighted.shape[1] // hop
+    if n_hops < _BLOCK_HOPS:
+        return None
+
+    hops = weighted[:, :n_hops * hop].reshape(weighted.shape[0], n_hops, hop)
+    hop_power = np.square(hops, dtype=np.float64).mean(axis=-1)
+    block_power = sliding_window_view(hop_power, _BLOCK_HOPS, axis=1).mean(axis=-1).sum(axis=0)
+
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(block_power)
+    above_absolute = block_lufs > _ABSOLUTE_GATE_LUFS
+    if not above_absolute.any():
+        return None
+    relative_gate = -0.691 + 10 * np.log10(block_power[above_absolute].mean()) + _RELATIVE_GATE_LU
+    gated = block_power[above_absolute & (block_lufs > relative_gate)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def true_peak(pcm: np.ndarray) -> float | None:
+    """
+    True peak in dBTP estimated by 4x band-limited oversampling,
+    or None for digital silence.
+    """
+    if not pcm.size:
+        return None
+    n_fft = _FRAME + 2 * _PAD
+    peak = float(np.abs(pcm).max())
+    for _, group in _frame_groups(pcm):
+        upsampled = np.fft.irfft(
+            np.fft.rfft(group, axis=-1), n=n_fft * _OVERSAMPLING, axis=-1
+        ) * _OVERSAMPLING
+        inner = upsampled[..., _PAD * _OVERSAMPLING:(_PAD + _FRAME) * _OVERSAMPLING]
+        peak = max(peak, float(np.abs(inner).max()))
+    if peak <= 0:
+        return None
+    return float(20 * np.log10(peak))
+
+
+def analyze_loudness(audio: AudioSegment, pcm: np.ndarray | None = None) -> Loudness:
+    if pcm is None:
+        pcm = segment_to_pcm(audio)
+    return Loudness(
+        integrated_lufs=integrated_loudness(pcm, audio.frame_rate),
+        true_peak_dbtp=true_peak(pcm),
+    )
@@ -0,0 +1,87 @@
+"""
+Compact timbre descriptor of a track for similarity search.
+
+The vector is built from framewise spectra: MFCC mean/std plus a few
+summary spectral statistics. All frames are processed as one batch.
+"""
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pydub import AudioSegment
+
+from app.services.audio_analysis import segment_to_pcm
+
+FEATURE_DIM = 32
+
+_N_FFT = 2048
+_HOP = 1024
+_N_MELS = 40
+_N_MFCC = 13
+_MAX_FRAMES = 4096          # длинные треки прореживаем равномерно
+_EPS = 1e-10
+
+
+@lru_cache(maxsize=8)
+def _mel_filterbank(sample_rate: int) -> np.ndarray:
+    def to_mel(f):
+        return 2595 * np.log10(1 + f / 700)
+
+    def from_mel(m):
+        return 700 * (10 ** (m / 2595) - 1)
+
+    points = from_mel(np.linspace(to_mel(20.0), to_mel(sample_rate / 2), _N_MELS + 2))
+    freqs = np.fft.rfftfreq(_N_FFT, 1 / sample_rate)
+    lower, center, upper = points[:-2, None], points[1:-1, None], points[2:, None]
+    rising = (freqs - lower) / (center - lower)
+    falling = (upper - freqs) / (upper - center)
+    return np.maximum(0, np.minimum(rising, falling))
+
+
+@lru_cache(maxsize=1)
+def _dct_matrix() -> np.ndarray:
+    n = np.arange(_N_MELS)
+    k = np.arange(_N_MFCC)[:, None]
+    dct = np.cos(np.pi / _N_MELS * (n + 0.5) * k) * np.sqrt(2 / _N_MELS)
+    dct[0] /= np.sqrt(2)
+    return dct
+
+
+def extract_features(audio: AudioSegment, pcm: np.ndarray | None = None) -> np.ndarray | None:
+    """
+    Raw (unnormalised) float32 feature vector of length FEATURE_DIM,
+    or None if the clip is shorter than one analysis frame.
+    """
+    rate = audio.frame_rate
+    if pcm is None:
+        pcm = segment_to_pcm(audio)
+    mono = pcm.mean(axis=0)
+    if mono.size < _N_FFT:
+        return None
+
+    frames = sliding_window_view(mono, _N_FFT)[::_HOP]
+    if len(frames) > _MAX_FRAMES:
+        frames = frames[np.linspace(0, len(frames) - 1, _MAX_FRAMES).astype(int)]
+    power = np.abs(np.fft.rfft(frames * np.hanning(_N_FFT), axis=-1)) ** 2
+    total = power.sum(axis=-1) + _EPS
+
+    log_mel = np.log(power @ _mel_filterbank(rate).T + _EPS)
+    mfcc = log_mel @ _dct_matrix().T
+
+    freqs = np.fft.rfftfreq(_N_FFT, 1 / rate)
+    centroid = (power @ freqs) / total / (rate / 2)
+    rolloff = (np.cumsum(power, axis=-1) < 0.85 * total[:, None]).sum(axis=-1) / power.shape[1]
+    flatness = np.exp(np.log(power + _EPS).mean(axis=-1)) / (power.mean(axis=-1) + _EPS)
+    zero_crossings = np.diff(np.signbit(frames), axis=-1).mean(axis=-1)
+    log_rms = np.log(np.sqrt(np.square(frames).mean(axis=-1)) + _EPS)
+
+    vector = np.concatenate([
+        mfcc.mean(axis=0),
+        mfcc.std(axis=0),
+        [
+            centroid.mean(), centroid.std(),
+            rolloff.mean(), flatness.mean(),
+            zero_crossings.mean(), log_rms.std(),
+        ],
+    ])
+    return vector.astype(np.float32)
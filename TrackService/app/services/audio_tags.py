@@ -0,0 +1,104 @@
+"""
+Embedded metadata of uploaded files: text tags and cover art.
+"""
+import io
+import logging
+from dataclasses import dataclass
+
+import mutagen
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Ключи одних и тех же полей в ID3, Vorbis/FLAC и MP4
+_TITLE_KEYS = ("TIT2", "title", "\xa9nam")
+_ARTIST_KEYS = ("TPE1", "artist", "\xa9ART")
+_ALBUM_KEYS = ("TALB", "album", "\xa9alb")
+
+
+@dataclass
+class AudioTags:
+    title: str | None = None
+    artist: str | None = None
+    album: str | None = None
+    cover: bytes | None = None
+
+
+def _first_text(tags, keys: tuple[str, ...]) -> str | None:
+    for key in keys:
+        try:
+            value = tags.get(key)
+        except (KeyError, ValueError):
+            continue
+        if value is None:
+            continue
+        # ID3-фреймы хранят список строк в .text, Vorbis/MP4 — просто список
+        values = getattr(value, "text", value)
+        if isinstance(values, str):
+            values = [values]
+        for item in values:
+            text = str(item).strip()
+            if text:
+                return text
+    return None
+
+
+def _cover_bytes(audio) -> bytes | None:
+    pictures = getattr(audio, "pictures", None)  # FLAC
+    if pictures:
+        return pictures[0].data
+    tags = audio.tags
+    if hasattr(tags, "getall"):  # ID3
+        frames = tags.getall("APIC")
+        if frames:
+            # 3 — front cover; иначе берём первую попавшуюся картинку
+            front = [f for f in frames if f.type == 3]
+            return (front or frames)[0].data
+    covers = tags.get("covr") if hasattr(tags, "get") else None  # MP4
+    if covers:
+        return bytes(covers[0])
+    return None
+
+
+def read_tags(data: bytes) -> AudioTags:
+    """
+    Title/artist/album and the embedded cover of an audio file; fields
+    that are missing or unreadable are left as None.
+    """
+    try:
+        audio = mutagen.File(io.BytesIO(data))
+    except Exception as e:
+        logger.info("Cannot read tags: %s", e)
+        return AudioTags()
+    if audio is None or audio.tags is None:
+        return AudioTags()
+    return AudioTags(
+        title=_first_text(audio.tags, _TITLE_KEYS),
+        artist=_first_text(audio.tags, _ARTIST_KEYS),
+        album=_first_text(audio.tags, _ALBUM_KEYS),
+        cover=_cover_bytes(audio),
+    )
+
+
+def make_thumbnails(cover: bytes, sizes: list[int], quality: int) -> dict[int, bytes]:
+    """
+    Square WebP thumbnails of the cover for each size. The image is
+    decoded once (JPEG at a reduced scale when possible) and every
+    size is derived from that decode.
+    """
+    try:
+        image = Image.open(io.BytesIO(cover))
+        largest = max(sizes)
+        image.draft("RGB", (largest, largest))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+    except Exception as e:
+        logger.info("Cannot decode cover art: %s", e)
+        return {}
+
+    thumbnails = {}
+    for size in sorted(sizes, reverse=True):
+        image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        buf = io.BytesIO()
+        image.save(buf, format="WEBP", quality=quality)
+        thumbnails[size] = buf.getvalue()
+    return thumbnails
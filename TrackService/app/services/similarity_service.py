@@ -0,0 +1,273 @@
+import asyncio
+import fcntl
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Track
+from app.services.audio_features import FEATURE_DIM
+
+_ID_BYTES = 26
+_IVF_MIN_ROWS = 50_000      # меньше — быстрее просто просканировать всё
+_KMEANS_ITERATIONS = 10
+_KMEANS_SAMPLE_PER_LIST = 64
+
+
+class FeatureIndex:
+    """
+    Append-only on-disk index of track feature vectors.
+
+    Layout of the index directory (row i is the same track everywhere):
+
+    - `ids.bin`      — ULIDs, 26 ASCII bytes per row
+    - `raw.f32`      — raw feature vectors, float32[FEATURE_DIM] per row
+    - `vectors.f32`  — standardised, L2-normalised copies used for search
+    - `stats.npy`    — mean/std applied to produce `vectors.f32`
+    - `ivf.npz`      — optional coarse clustering of the first rows
+
+    Readers memory-map `vectors.f32` and `ids.bin` and remap when the
+    files grow or get replaced, so appends from any worker become
+    visible without a restart. Writers serialise on a `flock`.
+
+    Once `rebuild()` has clustered the vectors, a query only scans the
+    `nprobe` closest clusters plus the rows appended since the rebuild;
+    until then (and for small catalogues) it is an exact scan.
+    """
+
+    def __init__(self, directory: str, nprobe: int, dim: int = FEATURE_DIM) -> None:
+        self._dir = Path(directory)
+        self._dim = dim
+        self._nprobe = nprobe
+        self._row_bytes = dim * 4
+        self._stamp: tuple | None = None
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._ids = np.empty(0, dtype=f"S{_ID_BYTES}")
+        self._ivf: dict[str, np.ndarray] | None = None
+
+    @property
+    def _ids_path(self) -> Path:
+        return self._dir / "ids.bin"
+
+    @property
+    def _raw_path(self) -> Path:
+        return self._dir / "raw.f32"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._dir / "vectors.f32"
+
+    @property
+    def _stats_path(self) -> Path:
+        return self._dir / "stats.npy"
+
+    @property
+    def _ivf_path(self) -> Path:
+        return self._dir / "ivf.npz"
+
+    @contextmanager
+    def _locked(self):
+        self._dir.mkdir(parents=True, exist_ok=True)
+        with open(self._dir / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_stats(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._stats_path.exists():
+            mean, std = np.load(self._stats_path)
+            return mean, std
+        return np.zeros(self._dim, dtype=np.float32), np.ones(self._dim, dtype=np.float32)
+
+    def _normalize(self, raw: np.ndarray, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+        vectors = (raw - mean) / std
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return (vectors / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def _refresh(self) -> None:
+        """
+        Remap the files if another writer changed them since last time.
+        """
+        try:
+            vectors_stat = os.stat(self._vectors_path)
+            ids_stat = os.stat(self._ids_path)
+        except FileNotFoundError:
+            return
+        ivf_stat = self._ivf_path.stat() if self._ivf_path.exists() else None
+        stamp = (
+            vectors_stat.st_ino, vectors_stat.st_size, ids_stat.st_size,
+            ivf_stat.st_ino if ivf_stat else None,
+        )
+        if stamp == self._stamp:
+            return
+        rows = min(vectors_stat.st_size // self._row_bytes, ids_stat.st_size // _ID_BYTES)
+        if rows:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+            self._ids = np.memmap(self._ids_path, dtype=f"S{_ID_BYTES}", mode="r", shape=(rows,))
+        if ivf_stat and (self._stamp is None or self._stamp[3] != ivf_stat.st_ino):
+            with np.load(self._ivf_path) as ivf:
+                self._ivf = {name: ivf[name] for name in ivf.files}
+        elif not ivf_stat:
+            self._ivf = None
+        self._stamp = stamp
+
+    @staticmethod
+    def _write_row(path: Path, row: int, row_bytes: int, data: bytes) -> None:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Обрезаем хвост, оставшийся от прерванной записи
+            os.ftruncate(fd, row * row_bytes)
+            os.pwrite(fd, data, row * row_bytes)
+        finally:
+            os.close(fd)
+
+    def append(self, track_id: str, raw: np.ndarray) -> int:
+        """
+        Add a track's raw feature vector; returns its row number.
+        """
+        with self._locked():
+            row = self._ids_path.stat().st_size // _ID_BYTES if self._ids_path.exists() else 0
+            mean, std = self._load_stats()
+            raw = raw.astype(np.float32).reshape(self._dim)
+            self._write_row(self._raw_path, row, self._row_bytes, raw.tobytes())
+            self._write_row(self._vectors_path, row, self._row_bytes, self._normalize(raw, mean, std).tobytes())
+            # ids.bin пишется последним: строка видна читателям только целиком
+            self._write_row(self._ids_path, row, _ID_BYTES, track_id.encode("ascii"))
+        return row
+
+    def rebuild(self) -> None:
+        """
+        Recompute mean/std over all raw vectors, rewrite the search
+        vectors and recluster them. Readers pick up the new files on
+        their next query.
+        """
+        with self._locked():
+            if not self._ids_path.exists():
+                return
+            rows = self._ids_path.stat().st_size // _ID_BYTES
+            if not rows:
+                return
+            raw = np.memmap(self._raw_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+            mean = raw.mean(axis=0)
+            std = raw.std(axis=0)
+            std[std == 0] = 1.0
+
+            tmp_vectors = self._vectors_path.with_suffix(".tmp")
+            out = np.memmap(tmp_vectors, dtype=np.float32, mode="w+", shape=(rows, self._dim))
+            for start in range(0, rows, 65536):
+                out[start:start + 65536] = self._normalize(raw[start:start + 65536], mean, std)
+            out.flush()
+            del out
+
+            tmp_stats = self._dir / "stats.tmp.npy"
+            np.save(tmp_stats, np.stack([mean, std]).astype(np.float32))
+            os.replace(tmp_stats, self._stats_path)
+            os.replace(tmp_vectors, self._vectors_path)
+
+            if rows < _IVF_MIN_ROWS:
+                self._ivf_path.unlink(missing_ok=True)
+                return
+            vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self._dim))
+            tmp_ivf = self._dir / "ivf.tmp.npz"
+            np.savez(tmp_ivf, **self._cluster(vectors))
+            os.replace(tmp_ivf, self._ivf_path)
+
+    @staticmethod
+    def _cluster(vectors: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Spherical k-means over a sample, then assign every row to its
+        closest centroid and store rows grouped by cluster.
+        """
+        rows = len(vectors)
+        n_lists = int(np.sqrt(rows))
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(rng.choice(rows, min(rows, n_lists * _KMEANS_SAMPLE_PER_LIST), replace=False))
+        sample = np.asarray(vectors[sample_rows])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+        for _ in range(_KMEANS_ITERATIONS):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Пустые кластеры оставляем на старом месте
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        assign = np.empty(rows, dtype=np.int32)
+        for start in range(0, rows, 65536):
+            assign[start:start + 65536] = np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+        order = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1))
+        return {
+            "centroids": centroids.astype(np.float32),
+            "order": order,
+            "offsets": offsets,
+            "rows": np.array(rows),
+        }
+
+    def _candidates(self, query: np.ndarray, rows: int) -> np.ndarray | None:
+        """
+        Rows worth scoring for `query`, or None for an exact scan.
+        """
+        if self._ivf is None:
+            return None
+        centroids, order, offsets = self._ivf["centroids"], self._ivf["order"], self._ivf["offsets"]
+        nprobe = min(self._nprobe, len(centroids))
+        probes = np.argpartition(centroids @ query, -nprobe)[-nprobe:]
+        parts = [order[offsets[c]:offsets[c + 1]] for c in probes]
+        # Строки, дописанные после последней перестройки, сканируем целиком
+        parts.append(np.arange(int(self._ivf["rows"]), rows, dtype=np.int32))
+        candidates = np.concatenate(parts)
+        candidates.sort()
+        return candidates
+
+    def nearest(self, row: int, k: int) -> list[str]:
+        """
+        Track IDs of the k rows most cosine-similar to `row`, best first.
+        """
+        self._refresh()
+        rows = len(self._vectors)
+        if row >= rows or k <= 0:
+            return []
+        query = np.asarray(self._vectors[row])
+        candidates = self._candidates(query, rows)
+        if candidates is None:
+            candidates = np.arange(rows)
+            scores = self._vectors @ query
+        else:
+            scores = self._vectors[candidates] @ query
+        scores[candidates == row] = -np.inf
+        k = min(k, len(candidates) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = candidates[top[np.argsort(scores[top])[::-1]]]
+        return [track_id.decode("ascii") for track_id in self._ids[top]]
+
+
+similarity_index = FeatureIndex(settings.SIMILARITY_INDEX_DIR, settings.SIMILARITY_NPROBE)
+
+
+async def get_similar_tracks(track_id: str, limit: int, db: AsyncSession) -> list[Track]:
+    """
+    Get tracks that sound similar to the given one.
+    """
+    track = await db.get(Track, track_id)
+    if not track:
+        raise HTTPException(404, "Track not found")
+    if track.feature_row is None:
+        return []
+
+    # Берём с запасом: часть кандидатов может оказаться удалёнными треками
+    candidates = await asyncio.to_thread(similarity_index.nearest, track.feature_row, limit * 2 + 5)
+    if not candidates:
+        return []
+    result = await db.execute(select(Track).where(Track.id.in_(candidates)))
+    by_id = {t.id: t for t in result.scalars().all()}
+    return [by_id[c] for c in candidates if c in by_id][:limit]
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, union, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import _async_session
+from app.minio_async import get_minio_client
+from app.models import Track, UserStorageUsage
+
+logger = logging.getLogger(__name__)
+
+
+async def get_storage_usage(user_id: str, db: AsyncSession) -> UserStorageUsage:
+    usage = await db.get(UserStorageUsage, user_id)
+    if usage is None:
+        usage = UserStorageUsage(user_id=user_id, bytes_used=0, object_count=0)
+    return usage
+
+
+async def check_quota(user_id: str, incoming_bytes: int) -> None:
+    """
+    Reject an upload that would take the user over STORAGE_QUOTA_BYTES.
+
+    Reads in a session of its own, so the caller's session does not hold
+    a connection through the upload that follows.
+    """
+    async with _async_session() as db:
+        usage = await get_storage_usage(user_id, db)
+    if usage.bytes_used + incoming_bytes > settings.STORAGE_QUOTA_BYTES:
+        raise HTTPException(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            "Storage quota exceeded"
+        )
+
+
+async def add_storage_usage(user_id: str, delta_bytes: int, delta_objects: int, db: AsyncSession) -> None:
+    """
+    Adjust the user's counters inside the caller's transaction.
+    """
+    stmt = insert(UserStorageUsage).values(
+        user_id=user_id,
+        bytes_used=max(delta_bytes, 0),
+        object_count=max(delta_objects, 0),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[UserStorageUsage.user_id],
+        set_={
+            "bytes_used": UserStorageUsage.bytes_used + delta_bytes,
+            "object_count": UserStorageUsage.object_count + delta_objects,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _list_prefix(client, prefix: str) -> dict[str, int]:
+    sizes = {}
+    paginator = client.get_paginator("list_objects_v2")
+    async for page in paginator.paginate(Bucket=settings.MINIO_BUCKET, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            sizes[obj["Key"]] = obj["Size"]
+    return sizes
+
+
+async def reconcile_user(client, user_id: str) -> None:
+    """
+    Reset a user's counters to the sizes of their objects in MinIO and
+    fill `storage_bytes` of tracks stored before it was recorded.
+    """
+    sizes = await _list_prefix(client, f"{user_id}/")
+    async with _async_session() as db:
+        tracks = (await db.execute(
+            select(Track.id, Track.file_key, Track.cover_key)
+            .where(Track.user_id == user_id, Track.storage_bytes.is_(None))
+        )).all()
+        cover_sizes: dict[str, int] = {}
+        for key, size in sizes.items():
+            prefix = key.rpartition("/")[0]
+            cover_sizes[prefix] = cover_sizes.get(prefix, 0) + size
+        backfill = [
+            {
+                "id": track.id,
+                "storage_bytes": sizes.get(track.file_key, 0) + cover_sizes.get(track.cover_key, 0),
+            }
+            for track in tracks
+        ]
+        if backfill:
+            await db.execute(update(Track), backfill)
+
+        stmt = insert(UserStorageUsage).values(
+            user_id=user_id,
+            bytes_used=sum(sizes.values()),
+            object_count=len(sizes),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserStorageUsage.user_id],
+            set_={
+                "bytes_used": stmt.excluded.bytes_used,
+                "object_count": stmt.excluded.object_count,
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(stmt)
+        await db.commit()
+
+
+async def reconcile_storage_usage() -> None:
+    """
+    Recount every known user's usage from the actual object sizes.
+    """
+    async with _async_session() as db:
+        user_ids = (await db.execute(
+            union(select(Track.user_id), select(UserStorageUsage.user_id))
+        )).scalars().all()
+    async with get_minio_client() as client:
+        for user_id in user_ids:
+            try:
+                await reconcile_user(client, user_id)
+            except Exception:
+                logger.exception("Storage reconciliation failed for %s", user_id)
+
+
+async def run_storage_reconcile_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.STORAGE_RECONCILE_INTERVAL_SECONDS)
+        try:
+            await reconcile_storage_usage()
+        except Exception:
+            logger.exception("Storage reconciliation failed")
@@ -0,0 +1,121 @@
+"""
+Feed of track creations and deletions for services that keep a local
+set of live tracks (PlaylistService validates playlist entries with it).
+
+A replica loads a snapshot of live track ids with `list_track_ids`,
+then follows `list_track_events` from the snapshot's cursor. Events
+are written in the same transaction as the track itself.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import _async_session
+from app.models import Track, TrackEvent
+
+logger = logging.getLogger(__name__)
+
+
+def _settled_before() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.TRACK_EVENT_FEED_LAG_SECONDS)
+
+
+async def _settled_cursor(db: AsyncSession) -> int:
+    """
+    A cursor below every event that may still be uncommitted.
+    """
+    settled = (await db.execute(
+        select(func.max(TrackEvent.id)).where(TrackEvent.created_at < _settled_before())
+    )).scalar_one()
+    if settled is not None:
+        return settled
+    # Ни одно событие ещё не устоялось — повторяем все оставшиеся
+    oldest = (await db.execute(select(func.min(TrackEvent.id)))).scalar_one()
+    return oldest - 1 if oldest is not None else 0
+
+
+async def list_track_ids(after: str, limit: int, db: AsyncSession) -> dict:
+    """
+    One page of live tracks as [id, duration_seconds] in id order, and
+    the feed cursor to follow once every page is loaded. Only the
+    cursor of the first page matters: events after it are replayed on
+    top of the snapshot, so changes between pages are not lost.
+    """
+    cursor = await _settled_cursor(db)
+    result = await db.execute(
+        select(Track.id, Track.duration_seconds)
+        .where(Track.id > after)
+        .order_by(Track.id)
+        .limit(limit)
+    )
+    return {"cursor": cursor, "tracks": [list(row) for row in result.all()]}
+
+
+async def list_track_events(since: int, limit: int, db: AsyncSession) -> dict:
+    """
+    Events with id > since, in id order.
+
+    Ids come from a sequence, so a transaction that commits late can
+    make a smaller id visible after a larger one. Events are inserted
+    right before their commit and stamped with clock_timestamp(), so
+    the returned cursor stops before events younger than
+    TRACK_EVENT_FEED_LAG_SECONDS; those are sent again on the next poll.
+    Raises 410 if events after `since` may have been purged; the replica
+    then reloads the snapshot.
+    """
+    oldest = (await db.execute(select(func.min(TrackEvent.id)))).scalar_one()
+    if oldest is not None and since < oldest - 1:
+        raise HTTPException(status_code=410, detail="Cursor is too old, reload the snapshot")
+    rows = (await db.execute(
+        select(TrackEvent)
+        .where(TrackEvent.id > since)
+        .order_by(TrackEvent.id)
+        .limit(limit)
+    )).scalars().all()
+    settled_before = _settled_before()
+    cursor = since
+    for row in rows:
+        if row.created_at >= settled_before:
+            break
+        cursor = row.id
+    return {
+        "cursor": cursor,
+        "events": [
+            {"id": row.id, "track_id": row.track_id, "op": row.op, "duration_seconds": row.duration_seconds}
+            for row in rows
+        ],
+    }
+
+
+async def purge_track_events(db: AsyncSession) -> int:
+    """
+    Drop events older than TRACK_EVENT_RETENTION_DAYS. The newest event
+    is always kept, so the feed can tell a stale cursor from an idle one.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.TRACK_EVENT_RETENTION_DAYS)
+    result = await db.execute(
+        delete(TrackEvent)
+        .where(
+            TrackEvent.created_at < cutoff,
+            TrackEvent.id < select(func.max(TrackEvent.id)).scalar_subquery(),
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def run_track_event_purge_loop() -> None:
+    while True:
+        await asyncio.sleep(settings.TRACK_EVENT_PURGE_INTERVAL_SECONDS)
+        try:
+            async with _async_session() as db:
+                purged = await purge_track_events(db)
+            if purged:
+                logger.info("Purged %d track events", purged)
+        except Exception:
+            logger.exception("Track event purge failed")
@@ -1,19 +1,32 @@
+import asyncio
+import logging
 import uuid, io
+from dataclasses import dataclass
+import numpy as np
+import ulid
 from pydub import AudioSegment
 from fastapi import HTTPException, status, UploadFile
 import re
+from pathlib import PurePath
 from urllib.parse import urlparse, urlunparse
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
 from fastapi import Request
 
 from sqlalchemy import select, delete, update, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.minio_async import get_minio_client
 
-from app.models import Track
+from app.models import Track, TrackTrendingScore, TrackEvent
 from app.schemas import TrackCreate, TrackUpdate
 from app.config import settings
+from app.services.trending_service import trending
+from app.services.audio_analysis import Loudness, analyze_loudness, segment_to_pcm
+from app.services.audio_features import extract_features
+from app.services.similarity_service import similarity_index
+from app.services.audio_tags import AudioTags, read_tags, make_thumbnails
+from app.services.storage_service import check_quota, add_storage_usage
 
+logger = logging.getLogger(__name__)
     
 async def ensure_bucket_exists():
     """
@@ -25,7 +38,18 @@ async def ensure_bucket_exists():
         if settings.MINIO_BUCKET not in existing:
             await client.create_bucket(Bucket=settings.MINIO_BUCKET)
 
-async def upload_file_to_minio(user_id: str, file: UploadFile) -> tuple[str, int]:
+@dataclass
+class UploadedAudio:
+    key: str
+    duration_seconds: int
+    loudness: Loudness
+    features: np.ndarray | None
+    tags: AudioTags
+    cover_key: str | None
+    stored_bytes: int
+    stored_objects: int
+
+async def upload_file_to_minio(user_id: str, file: UploadFile) -> UploadedAudio:
     data = await file.read()
     if not data:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "Empty file")
@@ -38,25 +62,72 @@ async def upload_file_to_minio(user_id: str, file: UploadFile) -> tuple[str, int
         out_buf = io.BytesIO()
         audio.export(out_buf, format="mp3", bitrate="192k")
         out_buf.seek(0)
+        pcm = await asyncio.to_thread(segment_to_pcm, audio)
+        loudness, features, tags = await asyncio.gather(
+            asyncio.to_thread(analyze_loudness, audio, pcm),
+            asyncio.to_thread(extract_features, audio, pcm),
+            asyncio.to_thread(read_tags, data),
+            return_exceptions=True,
+        )
+        if isinstance(tags, Exception):
+            raise tags
     except Exception as e:
         raise HTTPException(
             status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
             f"Cannot process audio file: {e}"
         )
+    del pcm
+
+    # Файл уже декодирован — сбой анализа не повод отклонять загрузку,
+    # громкость потом досчитает backfill_loudness
+    if isinstance(loudness, Exception):
+        logger.warning("Loudness analysis failed, storing the track without it: %s", loudness)
+        loudness = Loudness(integrated_lufs=None, true_peak_dbtp=None)
+    # Без вектора трек просто не попадёт в индекс похожих
+    if isinstance(features, Exception):
+        logger.warning("Feature extraction failed, storing the track without them: %s", features)
+        features = None
+
+    thumbnails = {}
+    if tags.cover:
+        thumbnails = await asyncio.to_thread(
+            make_thumbnails, tags.cover, settings.COVER_SIZES, settings.COVER_WEBP_QUALITY
+        )
 
     key = f"{user_id}/{uuid.uuid4()}.mp3"
+    cover_key = f"{user_id}/covers/{uuid.uuid4()}" if thumbnails else None
 
 
     async with get_minio_client() as client:
-        await client.put_object(
-            Bucket=settings.MINIO_BUCKET,
-            Key=key,
-            Body=out_buf,
-            ContentType="audio/mpeg",
-            ContentLength=len(out_buf.getbuffer()),
-        )
+        uploads = [
+            client.put_object(
+                Bucket=settings.MINIO_BUCKET,
+                Key=key,
+                Body=out_buf,
+                ContentType="audio/mpeg",
+                ContentLength=len(out_buf.getbuffer()),
+            )
+        ]
+        for size, image in thumbnails.items():
+            uploads.append(client.put_object(
+                Bucket=settings.MINIO_BUCKET,
+                Key=f"{cover_key}/{size}.webp",
+                Body=io.BytesIO(image),
+                ContentType="image/webp",
+                ContentLength=len(image),
+            ))
+        await asyncio.gather(*uploads)
 
-    return key, duration_sec
+    return UploadedAudio(
+        key=key,
+        duration_seconds=duration_sec,
+        loudness=loudness,
+        features=features,
+        tags=tags,
+        cover_key=cover_key,
+        stored_bytes=len(out_buf.getbuffer()) + sum(len(image) for image in thumbnails.values()),
+        stored_objects=1 + len(thumbnails),
+    )
 
 async def create_track(
     user_id: str,
@@ -65,17 +136,41 @@ async def create_track(
     db: AsyncSession
 ) -> Track:
 
-    key, duration = await upload_file_to_minio(user_id, file)
+    # Квоту проверяем до декодирования и загрузки в MinIO
+    await check_quota(user_id, file.size or 0)
+
+    uploaded = await upload_file_to_minio(user_id, file)
+
+    track_id = ulid.new().str
+    feature_row = None
+    if uploaded.features is not None:
+        feature_row = await asyncio.to_thread(similarity_index.append, track_id, uploaded.features)
 
-    # Создаём запись с duration_seconds
+    # Пустые поля формы заполняем из тегов файла
+    tags = uploaded.tags
+    title = data.title or tags.title or PurePath(file.filename or "").stem or "Untitled"
+    description = data.description
+    if not description and tags.artist:
+        description = " — ".join(filter(None, [tags.artist, tags.album]))
+
+    # Создаём запись с duration_seconds и громкостью
     track = Track(
+        id=track_id,
         user_id=user_id,
-        title=data.title,
-        description=data.description,
-        file_key=key,
-        duration_seconds=duration
+        title=title[:200],
+        description=description[:1000] if description else description,
+        file_key=uploaded.key,
+        duration_seconds=uploaded.duration_seconds,
+        loudness_lufs=uploaded.loudness.integrated_lufs,
+        true_peak_dbtp=uploaded.loudness.true_peak_dbtp,
+        feature_row=feature_row,
+        cover_key=uploaded.cover_key,
+        storage_bytes=uploaded.stored_bytes,
     )
     db.add(track)
+    await add_storage_usage(user_id, uploaded.stored_bytes, uploaded.stored_objects, db)
+    # Событие вставляется последним, перед самым коммитом
+    db.add(TrackEvent(track_id=track_id, op="create", duration_seconds=uploaded.duration_seconds))
     await db.commit()
     await db.refresh(track)
 
@@ -101,6 +196,16 @@ async def get_track(track_id: str, db: AsyncSession) -> Track:
     track.file_url = public_url
     return track
 
+async def get_tracks_by_ids(track_ids: list[str], db: AsyncSession) -> list[Track]:
+    """
+    Metadata of many tracks in one query, for other services; unknown
+    ids are left out. No presigned URLs are made here.
+    """
+    if not track_ids:
+        return []
+    result = await db.execute(select(Track).where(Track.id.in_(set(track_ids))))
+    return result.scalars().all()
+
 async def update_track(
     track_id: str, data: TrackUpdate, db: AsyncSession
 ) -> Track:
@@ -117,9 +222,46 @@ async def delete_track(track_id: str, db: AsyncSession) -> None:
     track = await db.get(Track, track_id)
     if not track:
         raise HTTPException(404, "Track not found")
-    # можно в фоне удалить объект из MinIO, но опустим
+    keys = [track.file_key]
+    if track.cover_key:
+        keys += [f"{track.cover_key}/{size}.webp" for size in settings.COVER_SIZES]
     await db.execute(delete(Track).filter_by(id=track_id))
+    await db.execute(delete(TrackTrendingScore).filter_by(track_id=track_id))
+    await add_storage_usage(track.user_id, -(track.storage_bytes or 0), -len(keys), db)
+    db.add(TrackEvent(track_id=track_id, op="delete"))
     await db.commit()
+    trending.discard(track_id)
+
+    # Объекты удаляем после коммита: если это не удастся, трек уже
+    # удалён, а сверка квот вернёт размер объектов в счётчик пользователя
+    try:
+        async with get_minio_client() as client:
+            await client.delete_objects(
+                Bucket=settings.MINIO_BUCKET,
+                Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True},
+            )
+    except Exception:
+        logger.exception("Deleting objects of track %s from MinIO failed: %s", track_id, keys)
+
+async def get_cover_thumbnail(track_id: str, size: int, db: AsyncSession) -> Response:
+    track = await db.get(Track, track_id)
+    if not track or not track.cover_key or size not in settings.COVER_SIZES:
+        raise HTTPException(404, "Cover not found")
+    async with get_minio_client() as client:
+        try:
+            s3_obj = await client.get_object(
+                Bucket=settings.MINIO_BUCKET, Key=f"{track.cover_key}/{size}.webp"
+            )
+        except client.exceptions.NoSuchKey:
+            # Загрузка обложки могла оборваться на полпути
+            raise HTTPException(404, "Cover not found")
+        body = await s3_obj["Body"].read()
+    # Ключ обложки уникален и не меняется, поэтому кэшируем надолго
+    return Response(
+        content=body,
+        media_type="image/webp",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
 
 async def stream_track_service(request: Request, db: AsyncSession, track_id: str):
     track: Track | None = await db.get(Track, track_id)
@@ -144,6 +286,9 @@ async def stream_track_service(request: Request, db: AsyncSession, track_id: str
                 raise HTTPException(status_code=500, detail=f"Error reading file: {e}")
 
     range_header = request.headers.get("range")
+    # Прослушиванием считаем только запрос с начала файла, а не перемотку
+    if not range_header or range_header.startswith("bytes=0-"):
+        trending.record_play(track_id)
     if range_header:
         async with get_minio_client() as client:
             s3_obj = await client.head_object(
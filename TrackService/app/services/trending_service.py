@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import math
+from collections import Counter
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import _async_session
+from app.models import Track, TrackTrendingScore
+
+logger = logging.getLogger(__name__)
+
+# Скорость затухания (1/сек), выведенная из периода полураспада
+_DECAY_RATE = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+
+def _decayed_score():
+    """
+    SQL expression for a stored score decayed to the current time.
+    """
+    age = func.extract("epoch", func.now() - TrackTrendingScore.updated_at)
+    return TrackTrendingScore.score * func.exp(-_DECAY_RATE * age)
+
+
+class TrendingBoard:
+    """
+    In-process trending state of a worker.
+
+    Plays are counted in memory and flushed to `track_trending_scores`
+    in one upsert per interval; the top of the ranking is kept as a
+    pre-sorted snapshot, so reads never touch the database.
+    """
+
+    def __init__(self) -> None:
+        self._pending: Counter[str] = Counter()
+        self._snapshot: list[Track] = []
+
+    def record_play(self, track_id: str) -> None:
+        self._pending[track_id] += 1
+
+    def discard(self, track_id: str) -> None:
+        self._pending.pop(track_id, None)
+        self._snapshot = [t for t in self._snapshot if t.id != track_id]
+
+    def top(self, limit: int, offset: int) -> list[Track]:
+        return self._snapshot[offset:offset + limit]
+
+    async def flush(self, db: AsyncSession) -> None:
+        """
+        Fold the pending play counts into the stored decayed scores.
+        """
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, Counter()
+        stmt = insert(TrackTrendingScore).values(
+            [{"track_id": track_id, "score": float(plays)} for track_id, plays in batch.items()]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TrackTrendingScore.track_id],
+            set_={
+                "score": _decayed_score() + stmt.excluded.score,
+                "updated_at": func.now(),
+            },
+        )
+        try:
+            await db.execute(stmt)
+            # Треки, которые давно никто не слушает, из таблицы убираем
+            await db.execute(
+                delete(TrackTrendingScore).where(_decayed_score() < settings.TRENDING_MIN_SCORE)
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            self._pending.update(batch)
+            raise
+
+    async def refresh(self, db: AsyncSession) -> None:
+        """
+        Reload the top `TRENDING_POOL_SIZE` tracks by decayed score.
+        """
+        score = _decayed_score()
+        result = await db.execute(
+            select(Track)
+            .join(TrackTrendingScore, TrackTrendingScore.track_id == Track.id)
+            .order_by(score.desc())
+            .limit(settings.TRENDING_POOL_SIZE)
+        )
+        self._snapshot = list(result.scalars().all())
+
+
+trending = TrendingBoard()
+
+
+async def run_trending_loop() -> None:
+    """
+    Periodically flush play counts and refresh the trending snapshot.
+    """
+    while True:
+        try:
+            async with _async_session() as db:
+                await trending.flush(db)
+                await trending.refresh(db)
+        except Exception:
+            logger.exception("Trending refresh failed")
+        await asyncio.sleep(settings.TRENDING_REFRESH_INTERVAL_SECONDS)
+
+
+async def flush_trending() -> None:
+    async with _async_session() as db:
+        await trending.flush(db)
+
+
+async def get_trending_tracks(limit: int, offset: int) -> list[Track]:
+    """
+    Get trending tracks from the in-memory snapshot.
+    """
+    return trending.top(limit, offset)